@@ -0,0 +1,64 @@
+"""
+Startup-time benchmark of the seleniumUp package.
+
+Every scenario is run in a fresh interpreter several times, the median import time and the heavy
+third-party modules it loaded are printed.
+
+    python benchmarks/import_time.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCENARIOS = {
+    "import seleniumUp": "import seleniumUp",
+    "ParseToolKit": "from seleniumUp import ParseToolKit",
+    "SaveToolKit": "from seleniumUp import SaveToolKit",
+    "DriverAction": "from seleniumUp import DriverAction",
+    "DriverInit": "from seleniumUp import DriverInit",
+    "Workflow": "from seleniumUp import Workflow",
+}
+
+_HEAVY_MODULES = ("selenium", "yagmail", "prettytable")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": len(sys.modules),
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(statement: str, runs: int) -> dict:
+    probe = _PROBE.format(statement=statement, heavy=_HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True)
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return {
+        "median_ms": statistics.median(sample["elapsed"] for sample in samples) * 1000,
+        "modules": samples[-1]["modules"],
+        "heavy": samples[-1]["heavy"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="interpreters started per scenario")
+    args = parser.parse_args()
+    print(f"{'scenario':<20}{'median ms':>12}{'modules':>10}  heavy imports")
+    for name, statement in _SCENARIOS.items():
+        result = measure(statement, args.runs)
+        print(f"{name:<20}{result['median_ms']:>12.1f}{result['modules']:>10}  {', '.join(result['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
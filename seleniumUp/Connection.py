@@ -1,8 +1,16 @@
-from typing import Literal, Union
+from typing import Literal, Union, List
 from selenium import webdriver
-from .main import logger
+from .main import logger, init_logger
 from os import path
-from .settings import CHROMIUM, FIREFOX
+from .settings import CHROMIUM, FIREFOX, STEALTH_JS, DRIVER_CACHE, DRIVER_VERSIONS, package_path
+from .DriverStore import DriverStore
+from .Network import resolve_block_resources, browser_prefs, resource_monitor, release_subscribers
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from threading import Lock
+import queue
+from urllib.parse import urlsplit
 
 from selenium.webdriver.chrome.service import Service as ChromeService
 
@@ -23,11 +31,43 @@ _EXPERIMENTAL_OPTIONS: dict = {
 }
 
 _RETRY_CONNECT_TIMES = 3
+
+_PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+
+@lru_cache(maxsize=None)
+def _read_stealth_js(filepath: str = STEALTH_JS) -> str:
+    """
+    Read the stealth script once per process, every later driver reuses the cached source.
+    A relative path is resolved against the package directory.
+    """
+    with open(package_path(filepath), 'r') as f:
+        return f.read()
+
+
+def _driver_executable(selenium_driver_type: Literal['Chrome', 'Firefox']) -> Union[str, None]:
+    """
+    The driver binary for this platform: the folder in settings first, then the shared DriverStore.
+    None lets Selenium Manager locate a driver.
+    """
+    binary = DriverStore.binary_name(selenium_driver_type)
+    local = path.join(package_path(CHROMIUM if selenium_driver_type == 'Chrome' else FIREFOX), binary)
+    if path.isfile(local):
+        return local
+    stored = DriverStore(DRIVER_CACHE).resolve(selenium_driver_type, DRIVER_VERSIONS.get(selenium_driver_type))
+    if stored is None:
+        logger.warning(f"No {binary} found in settings or the driver store, falling back to Selenium Manager")
+    return stored
+
+
 class _DriverCore:
     def __init__(self,
                  selenium_driver_type: Literal['Chrome', 'Firefox'] = 'Chrome',
                  driver_option_param: Union[None, list] = None,
                  headless: bool = False,
+                 block_resources: Union[str, list, dict, None] = None,
+                 page_load_strategy: Literal['normal', 'eager', 'none'] = 'normal',
+                 network_capture: bool = False,
                  ) -> None:
         """
         Initializes the Driver_core class with specified browser settings.
@@ -43,6 +83,18 @@ class _DriverCore:
         headless : bool, optional
             If set to True, the browser will run in headless mode. Defaults to False.
 
+        block_resources : Union[str, list, dict, None], optional
+            Resources the browser does not download: a preset('text-only', 'no-media'), resource types
+            ('image', 'font', 'media', 'stylesheet', 'tracker') and url patterns, see Network.resolve_block_resources.
+            Defaults to None.
+
+        page_load_strategy : Literal['normal', 'eager', 'none'], optional
+            When `driver.get` returns: after every subresource loaded('normal'), once the DOM is parsed('eager')
+            or right away('none'). Pair 'eager'/'none' with `DriverAction.navigate(url, ready=...)`. Defaults to 'normal'.
+
+        network_capture : bool, optional
+            Record the network of Chrome drivers, so NetworkCapture can read the XHR/fetch responses. Defaults to False.
+
         Attributes:
         -----------
         selenium_driverType : str
@@ -65,16 +117,35 @@ class _DriverCore:
         
         stealth_js : str
             JavaScript code read from 'stealth.min.js' for further fingerprint elimination.
+
+        block_types, block_patterns : list
+            The blocked resource types and the url patterns given to Network.setBlockedURLs.
+
+        prefs : dict
+            Browser preferences, used to block resource types.
+
+        performance_log : bool
+            Whether the Chrome performance log is enabled, the network reports are read from it.
         """
         
         self.selenium_driverType = selenium_driver_type
         self.DriverOption_param = driver_option_param
+        init_logger()
         self.headless = headless
-        self.opt_params = self.DriverOption_param + _STANDARD_DRIVER_OPTIONS if self.DriverOption_param else _STANDARD_DRIVER_OPTIONS
+        # copy the standard options, appending to the module level list would leak between drivers
+        self.opt_params = self.DriverOption_param + _STANDARD_DRIVER_OPTIONS if self.DriverOption_param else list(_STANDARD_DRIVER_OPTIONS)
         if headless:
             self.opt_params.append("--headless")
         # avoid repeated settings
         self.opt_params = list(set(self.opt_params))
+        if page_load_strategy not in _PAGE_LOAD_STRATEGIES:
+            raise ValueError(f"Unknown page load strategy {page_load_strategy}, choose from {_PAGE_LOAD_STRATEGIES}")
+        self.page_load_strategy = page_load_strategy
+        self.block_types, self.block_patterns = resolve_block_resources(block_resources)
+        self.prefs = browser_prefs(selenium_driver_type, self.block_types)
+        self.performance_log = (bool(self.block_patterns) or network_capture) and selenium_driver_type == 'Chrome'
+        if network_capture and selenium_driver_type != 'Chrome':
+            logger.warning("network_capture is only available for Chrome drivers")
 
 
         # for fingerprint elimination
@@ -92,15 +163,16 @@ class _DriverCore:
                     get: () => undefined
                     })
                 """
-        with open('../resources/stealth.min.js', 'r') as f:
-            self.stealth_js = f.read()
-        f.close()
+        self.stealth_js = _read_stealth_js()
 
     def __repr__(self) -> str:
         print("-" * 100)
         driver_info = """
             WebDriver: {}
-            DriverOptions: {}""".format(self.selenium_driverType, self.opt_params)
+            DriverOptions: {}
+            BlockedResources: {}
+            PageLoadStrategy: {}""".format(self.selenium_driverType, self.opt_params, self.block_types + self.block_patterns,
+                                           self.page_load_strategy)
         logger.info(f"Driver info: {driver_info}")
         return "-" * 100
 
@@ -115,14 +187,22 @@ class DriverInit(object):
                  selenium_driver_type: Literal['Chrome', 'Firefox'] = 'Chrome',
                  driver_option_param: Union[None, list] = None,
                  headless: bool = False,
+                 block_resources: Union[str, list, dict, None] = None,
+                 page_load_strategy: Literal['normal', 'eager', 'none'] = 'normal',
+                 network_capture: bool = False,
                  ) -> None:
-        self._driver_core = _DriverCore(selenium_driver_type, driver_option_param, headless)
+        self._driver_core = _DriverCore(selenium_driver_type, driver_option_param, headless, block_resources,
+                                        page_load_strategy, network_capture)
         self._selenium_driverType = self._driver_core.selenium_driverType
         self._opt_params = self._driver_core.opt_params
         self._script_func = self._driver_core.script_func
         self._CHR_mem_js = self._driver_core.CHR_mem_js
         self._stealth_js = self._driver_core.stealth_js
         self._undefined_js = self._driver_core.undefined_js
+        self._block_patterns = self._driver_core.block_patterns
+        self._prefs = self._driver_core.prefs
+        self._performance_log = self._driver_core.performance_log
+        self._page_load_strategy = self._driver_core.page_load_strategy
 
 
     """
@@ -152,12 +232,18 @@ class DriverInit(object):
         """
         if self._selenium_driverType == 'Chrome':
             options = webdriver.ChromeOptions()
-            # config your own driver loc in settings
-            service = ChromeService(executable_path=path.join(CHROMIUM, "chromedriver.exe"))
+            options.page_load_strategy = self._page_load_strategy
+            # config your own driver loc in settings, or add it to the DriverStore
+            service = ChromeService(executable_path=_driver_executable('Chrome'))
             for item in self._opt_params:
                 options.add_argument(item)
             for opt in _EXPERIMENTAL_OPTIONS:
                 options.add_experimental_option(opt, _EXPERIMENTAL_OPTIONS[opt])
+            if self._prefs:
+                options.add_experimental_option("prefs", self._prefs)
+            if self._performance_log:
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            driver = None
             for _ in range(_RETRY_CONNECT_TIMES):
                 try:
                     driver = webdriver.Chrome(service=service, options=options)
@@ -169,6 +255,10 @@ class DriverInit(object):
                 driver.execute_cdp_cmd(self._script_func, {"source": self._undefined_js})
                 # To deal with CHR memory fail
                 driver.execute_cdp_cmd(self._script_func, {"source": self._CHR_mem_js})
+                if self._block_patterns:
+                    driver.execute_cdp_cmd("Network.enable", {})
+                    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self._block_patterns})
+                    resource_monitor(driver, create=True)
                 logger.success("Selenium driver successfully initialized")
                 print(self._driver_core)
                 return driver
@@ -177,10 +267,17 @@ class DriverInit(object):
 
         elif self._selenium_driverType == 'Firefox':
             options = webdriver.FirefoxOptions()
-            # config your own binary loc in settings
-            service = FirefoxService(executable_path=path.join(FIREFOX, "geckodriver.exe"))
+            options.page_load_strategy = self._page_load_strategy
+            # config your own binary loc in settings, or add it to the DriverStore
+            service = FirefoxService(executable_path=_driver_executable('Firefox'))
             for item in self._opt_params:
                 options.add_argument(item)
+            # Firefox has no CDP url blocking, only the resource types covered by prefs are blocked
+            for pref, value in self._prefs.items():
+                options.set_preference(pref, value)
+            if self._block_patterns:
+                logger.warning("Firefox blocks images and fonts through prefs only and stops media autoplay, url patterns are ignored")
+            driver = None
             for _ in range(_RETRY_CONNECT_TIMES):
                 try:
                     driver = webdriver.Firefox(service=service, options=options)
@@ -194,5 +291,230 @@ class DriverInit(object):
 
     
 
+    @staticmethod
+    @logger.catch
+    def resource_report(driver: any, reset: bool = True) -> Union[dict, None]:
+        """
+        The requests of a Chrome driver started with block_resources since the last report:
+        url, requests, loaded, loaded_bytes, blocked and blocked_by_type. Call it after every page for per-page numbers.
+        The blocked requests are never sent, so only their number is known, not the bytes they would have cost.
+        None if the driver does not record its network.
+        """
+        monitor = resource_monitor(driver)
+        if monitor is None:
+            logger.warning("The driver was not started with block_resources on Chrome, no resource report")
+            return None
+        return monitor.report(reset)
+
     def __repr__(self) -> str:
         return self._driver_core.__repr__()
+
+
+# put in the idle queue once the pool has no driver left
+_POOL_EMPTY = object()
+
+_STORAGE_CLEAR_JS = """
+    try {
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+    } catch (e) {}
+"""
+
+
+class DriverPool(object):
+    """
+    A pool of warm drivers generated by DriverInit, made for jobs that are shorter than the browser startup.
+
+    Drivers are started in parallel once, then leased to a job and returned afterwards. A returned driver
+    is reset(extra windows, frames, cookies and storage) but keeps its process and the stealth scripts
+    installed by DriverInit, so the next job starts on a warm browser.
+
+    Usage:
+        with DriverPool(4, 'Chrome', headless=True) as pool:
+            with pool.lease() as driver:
+                driver.get(url)
+    """
+    def __init__(self,
+                 size: int = 2,
+                 selenium_driver_type: Literal['Chrome', 'Firefox'] = 'Chrome',
+                 driver_option_param: Union[None, list] = None,
+                 headless: bool = False,
+                 block_resources: Union[str, list, dict, None] = None,
+                 page_load_strategy: Literal['normal', 'eager', 'none'] = 'normal',
+                 network_capture: bool = False,
+                 ) -> None:
+        """
+        Parameters:
+        -----------
+        size : int, optional
+            The number of drivers started and kept in the pool. Defaults to 2.
+
+        selenium_driver_type, driver_option_param, headless, block_resources, page_load_strategy, network_capture :
+            Passed to DriverInit for every driver in the pool.
+        """
+        if size < 1:
+            raise ValueError("DriverPool size must be at least 1")
+        self._driver_params = (selenium_driver_type, driver_option_param, headless, block_resources, page_load_strategy,
+                               network_capture)
+        self._idle = queue.Queue()
+        self._drivers: List = []
+        # the first window of every driver, the one in which the CDP scripts were installed
+        self._home_handles: dict = {}
+        self._lock = Lock()
+        self._closed = False
+
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            for driver in executor.map(lambda _: self._new_driver(), range(size)):
+                if driver is not None:
+                    self._idle.put(driver)
+        if not self._drivers:
+            raise RuntimeError("DriverPool failed to initialize any driver")
+        logger.success(f"DriverPool initialized with {len(self._drivers)} drivers")
+
+    def _new_driver(self) -> any:
+        driver = DriverInit(*self._driver_params)
+        if driver is None:
+            logger.error("DriverPool failed to initialize a driver")
+            return None
+        with self._lock:
+            self._drivers.append(driver)
+            self._home_handles[id(driver)] = driver.current_window_handle
+        return driver
+
+    def _discard(self, driver: any) -> None:
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._home_handles.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Failed to quit driver: {e}")
+
+    def reset_driver(self, driver: any) -> None:
+        """
+        Bring a driver back to a blank state: close extra windows, leave frames,
+        clear cookies and storage, then navigate to about:blank.
+        The NetworkCapture of the previous job stop receiving the network events of the driver.
+
+        Chrome clears the cache and the storage(local storage, IndexedDB, cache storage...) of every origin
+        the windows navigated to, read from their navigation history. Firefox only clears the local and
+        session storage of the pages open in the windows, lease with reset=False and discard the driver
+        if the jobs need a stronger isolation there.
+        """
+        release_subscribers(driver)
+        home = self._home_handles.get(id(driver))
+        handles = driver.window_handles
+        if home not in handles:
+            raise RuntimeError("The initial window of the driver was closed, it can not be reused")
+        chrome = self._driver_params[0] == 'Chrome'
+        origins = set()
+        # the other windows are read before they are closed, the home window last
+        for handle in [handle for handle in handles if handle != home] + [home]:
+            driver.switch_to.window(handle)
+            if chrome:
+                origins.update(self._visited_origins(driver))
+            else:
+                driver.switch_to.default_content()
+                driver.execute_script(_STORAGE_CLEAR_JS)
+            if handle != home:
+                driver.close()
+        driver.switch_to.window(home)
+        driver.switch_to.default_content()
+        if chrome:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        else:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @staticmethod
+    def _visited_origins(driver: any) -> set:
+        history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+        origins = set()
+        for entry in history.get('entries', []):
+            parts = urlsplit(entry.get('url', ''))
+            if parts.scheme in ('http', 'https') and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+        return origins
+
+    def acquire(self, timeout: Union[float, None] = None) -> any:
+        """
+        Take a driver out of the pool, blocks until one is returned if all of them are leased.
+        Raises RuntimeError once the pool lost every driver and could not start new ones.
+        """
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No driver returned to the pool within {timeout} seconds")
+        if driver is _POOL_EMPTY:
+            # wake the next waiter as well
+            self._idle.put(_POOL_EMPTY)
+            raise RuntimeError("DriverPool has no driver left, every replacement failed to start")
+        return driver
+
+    def release(self, driver: any, reset: bool = True) -> None:
+        """
+        Return a leased driver to the pool. A driver that fails to reset is replaced by a new one,
+        if that fails too the pool shrinks and `acquire` raises once it is empty.
+        """
+        if self._closed:
+            self._discard(driver)
+            return
+        if reset:
+            try:
+                self.reset_driver(driver)
+            except Exception as e:
+                logger.warning(f"Failed to reset driver, replacing it with a new one: {e}")
+                self._discard(driver)
+                try:
+                    driver = self._new_driver()
+                except Exception as e:
+                    logger.error(f"DriverPool failed to initialize a driver: {e}")
+                    driver = None
+                if driver is None:
+                    with self._lock:
+                        empty = not self._drivers
+                    logger.error(f"DriverPool lost a driver, {len(self._drivers)} left")
+                    if empty:
+                        self._idle.put(_POOL_EMPTY)
+                    return
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout: Union[float, None] = None, reset: bool = True):
+        """
+        Context manager version of acquire/release.
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver, reset)
+
+    def close(self) -> None:
+        """
+        Quit every driver in the pool, leased drivers are quit when they are returned.
+        """
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not _POOL_EMPTY:
+                self._discard(driver)
+        logger.info("DriverPool closed")
+
+    def __len__(self) -> int:
+        return len(self._drivers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -1,9 +1,14 @@
 import os
+import io
+import bisect
+import urllib.error
 import urllib.request
 import zipfile
 import shutil
 import time
 import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Define URLs and expected SHA256 checksums
 chrome_files_info = [
@@ -45,70 +50,172 @@ firefox_files_info = [
 ]
 
 
+_CHUNK_SIZE = 1024 * 1024
+_PART_SUFFIX = ".part"
+
+
 # Function to calculate SHA256 checksum
 def calculate_sha256(file_path):
     sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        for byte_block in iter(lambda: f.read(_CHUNK_SIZE), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
 
-# Function to download files with retry logic
-def download_files(files_info, download_path, retries=3, delay=2):
+# Function to download a single part, resuming a previous partial download with a Range request
+def download_part(url, expected_sha256, file_name, timeout=60):
+    """
+    The data is hashed while it is written, a finished part is verified without reading it again.
+    Returns True if the part matches its checksum, a mismatching part is removed.
+    """
+    partial_name = file_name + _PART_SUFFIX
+    sha256_hash = hashlib.sha256()
+    offset = 0
+    if os.path.exists(partial_name):
+        # the bytes already on disk are hashed once, then the download continues after them
+        with open(partial_name, "rb") as f:
+            for byte_block in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                sha256_hash.update(byte_block)
+                offset += len(byte_block)
+    request = urllib.request.Request(url, headers={"Range": f"bytes={offset}-"} if offset else {})
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        # 416: nothing left after offset, the partial file is already complete
+        if e.code != 416:
+            raise
+        response = None
+    if response is not None:
+        with response:
+            if offset and response.status != 206:
+                # the server ignored the Range header and sends the whole file
+                print(f"Server does not support resuming {url}, downloading it again")
+                sha256_hash = hashlib.sha256()
+                offset = 0
+            with open(partial_name, "ab" if offset else "wb") as f:
+                for byte_block in iter(lambda: response.read(_CHUNK_SIZE), b""):
+                    sha256_hash.update(byte_block)
+                    f.write(byte_block)
+    if sha256_hash.hexdigest().lower() != expected_sha256.lower():
+        os.remove(partial_name)
+        return False
+    os.replace(partial_name, file_name)
+    return True
+
+
+# Function to download files concurrently with retry logic
+def download_files(files_info, download_path, retries=3, delay=2, max_workers=4):
     os.makedirs(download_path, exist_ok=True)
-    file_paths = []
-    for url, expected_sha256 in files_info:
+
+    def _download(url, expected_sha256):
         file_name = os.path.join(download_path, os.path.basename(url))
-        if os.path.exists(file_name) and calculate_sha256(file_name) == expected_sha256:
+        if os.path.exists(file_name) and calculate_sha256(file_name).lower() == expected_sha256.lower():
             print(
                 f"File {file_name} already exists and is complete. Skipping download."
             )
-            file_paths.append(file_name)
-            continue
-        success = False
+            return file_name
         for attempt in range(retries):
             try:
                 print(f"Downloading {url} to {file_name}... (Attempt {attempt + 1})")
-                urllib.request.urlretrieve(url, file_name)
-                if calculate_sha256(file_name) == expected_sha256:
-                    file_paths.append(file_name)
-                    success = True
-                    break
-                else:
-                    print(f"File {file_name} is incomplete. Retrying...")
+                if download_part(url, expected_sha256, file_name):
+                    return file_name
+                print(f"File {file_name} does not match its checksum. Retrying...")
             except Exception as e:
+                # the partial file is kept, the next attempt resumes it
                 print(f"Failed to download {url}: {e}. Retrying in {delay} seconds...")
                 time.sleep(delay)
-        if not success:
-            print(f"Failed to download {url} after {retries} attempts.")
-    return file_paths
-
-
-# Function to combine split zip files
-def combine_files(file_paths, combined_file_path):
-    with open(combined_file_path, "wb") as combined_file:
-        for file_path in file_paths:
-            with open(file_path, "rb") as part_file:
-                shutil.copyfileobj(part_file, combined_file)
-
-
-# Function to extract files
-def extract_file(file_path, extract_path):
+        print(f"Failed to download {url} after {retries} attempts.")
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda info: _download(*info), files_info))
+    # keep the order of the parts
+    return [file_name for file_name in results if file_name is not None]
+
+
+class _ConcatenatedReader(io.RawIOBase):
+    """
+    A seekable read-only file over the split parts, so the archive can be read without combining them.
+    """
+
+    def __init__(self, file_paths):
+        super().__init__()
+        self._files = [open(file_path, "rb") for file_path in file_paths]
+        self._starts = []
+        total = 0
+        for f in self._files:
+            self._starts.append(total)
+            total += os.fstat(f.fileno()).st_size
+        self._size = total
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def readinto(self, buffer):
+        # a read crossing the end of a part continues in the next one
+        view = memoryview(buffer).cast("B")
+        total = 0
+        while total < len(view) and self._position < self._size:
+            index = bisect.bisect_right(self._starts, self._position) - 1
+            f = self._files[index]
+            f.seek(self._position - self._starts[index])
+            read = f.readinto(view[total:])
+            if not read:
+                break
+            self._position += read
+            total += read
+        return total
+
+    def close(self):
+        for f in self._files:
+            f.close()
+        super().close()
+
+
+# Function to extract the split parts without writing a combined archive
+def extract_parts(file_paths, extract_path):
     os.makedirs(extract_path, exist_ok=True)
-    print(f"Extracting {file_path} to {extract_path}...")
-    with zipfile.ZipFile(file_path, "r") as zip_ref:
+    print(f"Extracting {len(file_paths)} parts to {extract_path}...")
+    with _ConcatenatedReader(file_paths) as reader, zipfile.ZipFile(io.BufferedReader(reader, _CHUNK_SIZE), "r") as zip_ref:
         zip_ref.extractall(extract_path)
-    os.remove(file_path)
+
+
+# Function to download, extract and clean up one browser
+def provision(name, files_info, download_path, extract_path):
+    file_paths = download_files(files_info, download_path)
+    if len(file_paths) != len(files_info):
+        print(f"Not all {name} files were downloaded completely. Please retry.")
+        return False
+    extract_parts(file_paths, extract_path)
+    shutil.rmtree(download_path)
+    return True
 
 
 # Function to get extraction paths
 def get_extraction_paths():
-    if os.path.exists("settings.py"):
+    if os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.py")):
         try:
-            from seleniumUp.settings import CHROMIUM, FIREFOX
+            from seleniumUp.settings import CHROMIUM, FIREFOX, package_path
 
-            return CHROMIUM, FIREFOX
+            return package_path(CHROMIUM), package_path(FIREFOX)
         except ImportError as e:
             print("Error importing settings:", e)
     print("Settings file not found or incomplete. Please enter extraction paths.")
@@ -123,33 +230,22 @@ def get_extraction_paths():
 
 
 def main():
+    if not sys.platform.startswith("win"):
+        # the published archives only hold Windows drivers
+        print("The bundled drivers are built for Windows. On this platform add your drivers to the shared store:")
+        print("    python -m seleniumUp.DriverStore add Chrome <version> <path to chromedriver>")
+        print("    python -m seleniumUp.DriverStore add Firefox <version> <path to geckodriver>")
+        return
     chromium_path, firefox_path = get_extraction_paths()
 
-    # Download and extract Chrome drivers
-    chrome_download_path = "./chrome_downloads"
-    chrome_files = download_files(chrome_files_info, chrome_download_path)
-    if len(chrome_files) == len(chrome_files_info):
-        combined_chrome_file = os.path.join(chrome_download_path, "chrome_combined.zip")
-        combine_files(chrome_files, combined_chrome_file)
-        extract_file(combined_chrome_file, chromium_path)
-        shutil.rmtree(chrome_download_path)
-    else:
-        print("Not all Chrome files were downloaded completely. Please retry.")
-
-    # Download and extract Firefox drivers
-    firefox_download_path = "./firefox_downloads"
-    firefox_files = download_files(firefox_files_info, firefox_download_path)
-    if len(firefox_files) == len(firefox_files_info):
-        combined_firefox_file = os.path.join(
-            firefox_download_path, "firefox_combined.zip"
-        )
-        combine_files(firefox_files, combined_firefox_file)
-        extract_file(combined_firefox_file, firefox_path)
-        shutil.rmtree(firefox_download_path)
-    else:
-        print("Not all Firefox files were downloaded completely. Please retry.")
-
-    print("All drivers downloaded and extracted successfully.")
+    # Download and extract Chrome and Firefox drivers at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        chrome = executor.submit(provision, "Chrome", chrome_files_info, "./chrome_downloads", chromium_path)
+        firefox = executor.submit(provision, "Firefox", firefox_files_info, "./firefox_downloads", firefox_path)
+        success = chrome.result() and firefox.result()
+
+    if success:
+        print("All drivers downloaded and extracted successfully.")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,31 @@
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from typing import Union, List, Callable
+from urllib.parse import urldefrag
 from .main import logger
 from .Log import CustomLog
-from selenium.webdriver.support import expected_conditions as ec
+from .Scripts import js_locator, _JS_BULK_EXTRACT, _JS_SCROLL_AND_SETTLE, _JS_NETWORK_IDLE
+from .WaitStrategy import get_wait_strategy
+from .Metrics import ActionMetrics, instrumented, add_wait, mark_retry, mark_error
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException, JavascriptException
 from functools import wraps
 import random
+import re
 import time
 
+_READY_CONDITIONS = ('locator', 'script', 'network_idle', 'predicate')
+_RETURN_STATEMENT = re.compile(r'^\s*return\b')
+# javascript errors raised because navigation replaced the document, not by the script itself
+_NAVIGATION_ERRORS = ('context was destroyed', 'document unloaded', 'navigated or closed')
+
+
 def wait_element_decorator(func: Callable) -> Callable:
     """
     Decorator to wait for a web element before executing the function.
+    The located element is passed to the function as `_element`, so it is not searched again.
+    If the element turns stale(the page navigated or re-rendered), it is located once more and the action is retried.
 
     Parameters:
     -----------
@@ -27,18 +40,22 @@ def wait_element_decorator(func: Callable) -> Callable:
     @wraps(func)
     def wrapper(self, value: str, *args, wait_time: int = 20, _decorator_log: bool = False, by: By = None, **kwargs):
         by = self._by if by is None else by
+        log = kwargs.pop('log', True)
+        element = self._cached_element(by, value)
+        from_cache = element is not None
+        if not from_cache:
+            element = self._locate_element(by, value, wait_time, _decorator_log)
         try:
-            element = WebDriverWait(self._driver, wait_time).until(
-                ec.presence_of_element_located((by, value))
-            )
-            if not element:
-                raise NoSuchElementException("Input element not found, please check By and make sure it is loaded correctly")
-            if _decorator_log:
-                logger.debug(f"Waited for element {value}")
-        except Exception as e:
-            logger.error(f"Error waiting for element {value}: {e}")
-            raise
-        return func(self, value, *args, log=kwargs.get('log', True), by=by, **kwargs)
+            return func(self, value, *args, log=log, by=by, _element=element, **kwargs)
+        except (StaleElementReferenceException, NoSuchElementException) as e:
+            if not from_cache and not isinstance(e, StaleElementReferenceException):
+                raise
+            logger.debug(f"Element {value} is stale, locating it again")
+            if self._metrics is not None:
+                mark_retry()
+            self.clear_element_cache()
+            element = self._locate_element(by, value, wait_time, _decorator_log)
+            return func(self, value, *args, log=log, by=by, _element=element, **kwargs)
     return wrapper
 
 class DriverAction(object):
@@ -53,6 +70,15 @@ class DriverAction(object):
         The method used to locate elements on the web page.
     contact, email_level : Union[dict, None], "CRITICAL"
         Made for customizing email contact whenever necessary.
+    element_cache : bool
+        Whether to keep located elements per locator, so repeated actions on the same element skip the wait.
+        The cache is cleared on navigate, window/frame switch and stale elements.
+    wait_strategy : Union[str, object]
+        How elements are waited for, 'webdriver'(WebDriverWait polling, default), 'observer'(MutationObserver inside the page)
+        or an instance from WaitStrategy.
+    metrics : Union[ActionMetrics, None]
+        Records wall time, wait time, round-trips, retries and errors of every action, see Metrics.
+        Disabled(None) by default.
 
     Methods:
     --------
@@ -68,41 +94,205 @@ class DriverAction(object):
     get_element_attribute(value: str, attribute: str, log: bool = True, by: By = None) -> str:
         Retrieves the value of a specified attribute from a web element and logs the action.
 
+    bulk_extract(fields: dict, row: str = None, by: By = None, wait_time: int = 20, log: bool = True) -> List[dict]:
+        Reads many fields(and rows) in a single script call and returns them as a list of dicts.
+
     input_keys(value: str, log: bool = True, *keys: any, by: By = None) -> None:
         Sends keys to a web element and logs the action.
 
     wait_element(value: str, wait_time: int = 20, log: bool = True, by: By = None) -> None:
         Waits for a web element to be present on the web page and logs the action.
+
+    wait_elements(values: List[str], wait_time: int = 20, log: bool = False, by: By = None) -> List[WebElement]:
+        Waits for several web elements at once.
         
     slide_horizontal(self, value: str, offset: int, log: bool = True, by: By = None, slowly:bool = True) -> None:
         Slides a web element horizontally by a specified offset and logs the action.
     
-    scroll_down(self, value:str = None, pixel:int = None, sleep_time:float = random.uniform(0.5, 1), log:bool = True, by: By = None)->None:
+    scroll_down(self, value:str = None, pixel:int = None, sleep_time:float = None, log:bool = True, by: By = None)->None:
         Scrolls the web page down and logs the action.
+
+    scroll_infinite(item_locator: str = None, max_items: int = None, max_height: int = None, idle_ms: int = 1500, timeout: float = 300, by: By = None, log: bool = True) -> dict:
+        Scrolls an infinite feed until the content stops loading or a stop condition is met.
+
+    navigate(url: str, log: bool = True, ready: any = None, wait_time: float = 20, by: By = None) -> bool:
+        Loads a new page, clears the element cache and waits for the readiness conditions.
+
+    wait_ready(ready: any, wait_time: float = 20, by: By = None) -> bool:
+        Waits until a locator is present, the network is idle or a JS predicate holds.
     """
 
     def __init__(self, driver, by: By = By.XPATH, contact:Union[dict, None] = None, 
-                 email_level = "CRITICAL") -> None:
+                 email_level = "CRITICAL", element_cache: bool = False, wait_strategy: any = 'webdriver',
+                 metrics: Union[ActionMetrics, None] = None) -> None:
         self._driver = driver
         self._by = by
+        self._element_cache = {} if element_cache else None
+        self._wait_strategy = get_wait_strategy(wait_strategy)
+        self._metrics = metrics
+        if metrics is not None:
+            metrics.instrument(driver)
         CustomLog.contact_setting(logger, email_level, contact)
+
+    def _cached_element(self, by: By, value: str) -> Union[WebElement, None]:
+        if self._element_cache is None:
+            return None
+        return self._element_cache.get((by, value))
+
+    def _locate_element(self, by: By, value: str, wait_time: int = 20, log: bool = False) -> WebElement:
+        """
+        Wait for an element and return it, the element is cached if the cache is enabled.
+        """
+        start = time.perf_counter() if self._metrics is not None else None
+        try:
+            element = self._wait_strategy.wait(self._driver, by, value, wait_time)
+            if not element:
+                raise NoSuchElementException("Input element not found, please check By and make sure it is loaded correctly")
+            if log:
+                logger.debug(f"Waited for element {value}")
+        except Exception as e:
+            logger.error(f"Error waiting for element {value}: {e}")
+            raise
+        finally:
+            if start is not None:
+                add_wait(time.perf_counter() - start)
+        if self._element_cache is not None:
+            self._element_cache[(by, value)] = element
+        return element
+
+    def clear_element_cache(self) -> None:
+        if self._element_cache:
+            self._element_cache.clear()
+
+    @instrumented()
+    @logger.catch(onerror=mark_error)
+    def navigate(self, url: str, log: bool = True, ready: any = None, wait_time: float = 20, by: By = None) -> bool:
+        """
+        ready: what has to be in the page before returning, see wait_ready. With the 'eager' or 'none'
+        page load strategy of DriverInit, `get` returns early and this is the only wait.
+        """
+        self.clear_element_cache()
+        new_document = ready is not None and self._page_load_strategy() == 'none' \
+            and urldefrag(url)[0] != urldefrag(self._driver.current_url)[0]
+        if new_document:
+            # 'none' returns before the new document exists, the mark tells the old one apart
+            self._driver.execute_script("window.__seleniumUpLeaving = true;")
+        self._driver.get(url)
+        if ready is not None:
+            self._wait_ready(ready, wait_time, by, new_document)
+        if log:
+            logger.debug(f"Navigated to {url}")
+        return True
+
+    def _page_load_strategy(self) -> str:
+        capabilities = getattr(self._driver, 'capabilities', None) or {}
+        return capabilities.get('pageLoadStrategy', 'normal')
+
+    @staticmethod
+    def _ready_conditions(ready: any) -> dict:
+        if isinstance(ready, str):
+            return {'locator': ready}
+        if callable(ready):
+            return {'predicate': ready}
+        if isinstance(ready, dict):
+            unknown = set(ready) - set(_READY_CONDITIONS)
+            if unknown:
+                raise ValueError(f"Unknown readiness conditions {unknown}, choose from {_READY_CONDITIONS}")
+            return ready
+        raise ValueError("ready must be a locator, a callable or a dict of conditions")
+
+    def _poll(self, condition: Callable, deadline: float, message: str) -> None:
+        def attempt(driver: any) -> any:
+            try:
+                return condition(driver)
+            except JavascriptException as e:
+                # an error in the script itself never goes away by polling again
+                if not any(error in str(e) for error in _NAVIGATION_ERRORS):
+                    raise
+            except WebDriverException:
+                pass
+            # navigation may replace the document under the script, such errors only mean "not yet"
+            return False
+
+        WebDriverWait(self._driver, max(deadline - time.monotonic(), 0), poll_frequency=0.1).until(attempt, message)
+
+    @instrumented()
+    @logger.catch(onerror=mark_error)
+    def wait_ready(self, ready: any, wait_time: float = 20, by: By = None) -> bool:
+        """
+        ready: a locator, a callable taking the driver, or a dict combining
+            'locator': a locator or a list of locators that must be present,
+            'script': a JS expression, or a function body starting with `return`(an error in it is raised at once),
+            'network_idle': milliseconds without any resource finishing loading,
+            'predicate': a callable taking the driver.
+        All the conditions share `wait_time`, a TimeoutException is raised(and logged) when it runs out.
+        """
+        return self._wait_ready(ready, wait_time, by)
+
+    def _wait_ready(self, ready: any, wait_time: float = 20, by: By = None, new_document: bool = False) -> bool:
+        by = self._by if by is None else by
+        conditions = self._ready_conditions(ready)
+        deadline = time.monotonic() + wait_time
+        if new_document:
+            self._timed(self._poll, lambda driver: driver.execute_script("return !window.__seleniumUpLeaving;"),
+                        deadline, "The new document did not load")
+        locators = conditions.get('locator')
+        for value in [locators] if isinstance(locators, str) else locators or []:
+            self._locate_element(by, value, max(deadline - time.monotonic(), 0))
+        if conditions.get('script'):
+            script = conditions['script']
+            script = script if _RETURN_STATEMENT.match(script) else f"return ({script});"
+            self._timed(self._poll, lambda driver: driver.execute_script(script), deadline, f"Script {script} never held")
+        if conditions.get('predicate'):
+            self._timed(self._poll, conditions['predicate'], deadline, "Ready predicate never held")
+        if conditions.get('network_idle'):
+            self._timed(self._wait_network_idle, conditions['network_idle'], deadline)
+        return True
+
+    def _timed(self, wait: Callable, *args: any) -> any:
+        """
+        Run a wait, its time is counted as wait time by the metrics.
+        """
+        start = time.perf_counter() if self._metrics is not None else None
+        try:
+            return wait(*args)
+        finally:
+            if start is not None:
+                add_wait(time.perf_counter() - start)
+
+    def _wait_network_idle(self, idle_ms: int, deadline: float) -> None:
+        script_timeout = self._driver.timeouts.script
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutException(f"Network not idle for {idle_ms}ms")
+                self._driver.set_script_timeout(remaining + 5)
+                try:
+                    if self._driver.execute_async_script(_JS_NETWORK_IDLE, idle_ms, int(remaining * 1000)):
+                        return
+                except WebDriverException:
+                    # the document was replaced while waiting, start over in the new one
+                    time.sleep(0.1)
+        finally:
+            self._driver.set_script_timeout(script_timeout)
     
 
+    @instrumented(locator=True)
     @wait_element_decorator
-    @logger.catch
-    def click_element(self, value:str, elementname:str, log:bool = True, by: By = None) -> List[str]:
-        by = self._by if by is None else by
-        element = self._driver.find_element(by, value)
+    @logger.catch(exclude=(StaleElementReferenceException, NoSuchElementException), onerror=mark_error)
+    def click_element(self, value:str, elementname:str, log:bool = True, by: By = None, _element: WebElement = None) -> List[str]:
+        element = _element
         element.click()
         if log:
             logger.debug(f"Clicked on element {elementname}")
         return self._driver.window_handles
     
+    @instrumented(locator=True)
     @wait_element_decorator
-    @logger.catch
-    def double_click(self, value: str, elementname: str, log:bool = True, by: By = None) -> List[str]:
-        by = self._by if by is None else by
-        element = self._driver.find_element(by, value)
+    @logger.catch(exclude=(StaleElementReferenceException, NoSuchElementException), onerror=mark_error)
+    def double_click(self, value: str, elementname: str, log:bool = True, by: By = None, _element: WebElement = None) -> List[str]:
+        element = _element
         actions = ActionChains(self._driver)
         actions.double_click(element).perform()
         
@@ -110,11 +300,11 @@ class DriverAction(object):
             logger.debug(f"Doubled clicked on element {elementname}")
         return self._driver.window_handles
 
+    @instrumented(locator=True)
     @wait_element_decorator
-    @logger.catch
-    def right_click(self, value: str, elementname: str, log:bool = True, by: By = None) -> List[str]:
-        by = self._by if by is None else by
-        element = self._driver.find_element(by, value)
+    @logger.catch(exclude=(StaleElementReferenceException, NoSuchElementException), onerror=mark_error)
+    def right_click(self, value: str, elementname: str, log:bool = True, by: By = None, _element: WebElement = None) -> List[str]:
+        element = _element
         actions = ActionChains(self._driver)
         actions.context_click(element).perform()
         
@@ -122,42 +312,86 @@ class DriverAction(object):
             logger.debug(f"Right clicked on element {elementname}")
         return self._driver.window_handles
 
+    @instrumented(locator=True)
     @wait_element_decorator
-    @logger.catch
-    def get_element_attribute(self, value:str, attribute:str, log:bool = True, by: By = None) -> str:
-        by = self._by if by is None else by
-        element = self._driver.find_element(by, value)
+    @logger.catch(exclude=(StaleElementReferenceException, NoSuchElementException), onerror=mark_error)
+    def get_element_attribute(self, value:str, attribute:str, log:bool = True, by: By = None, _element: WebElement = None) -> str:
+        element = _element
         result = element.get_attribute(attribute).strip()
         if log:
             logger.debug(f"Get attribute {attribute} on element, result: {result}")
         return result
     
-    @wait_element_decorator
-    @logger.catch
-    def input_keys(self, value:str, *keys:any, log:bool = True, by: By = None) -> None:
+    @instrumented()
+    @logger.catch(onerror=mark_error)
+    def bulk_extract(self, fields: dict, row: str = None, by: By = None, wait_time: int = 20, log: bool = True) -> List[dict]:
+        """
+        fields: field name -> locator, or field name -> (locator, attribute), the attribute defaults to 'text'
+        row: a locator for the repeated rows, field locators are then relative to the row(e.g. './/a' for XPATH)
+
+        Without a row locator, every field is matched on the whole page and the n-th matches form the n-th record.
+        Everything is read in one execute_script call, the result can be passed to SaveToolKit directly.
+        Empty fields extract nothing and return an empty list without touching the page.
+        """
+        if not fields:
+            return []
         by = self._by if by is None else by
-        element = self._driver.find_element(by, value)
+        field_list, locators = [], []
+        for name, field in fields.items():
+            locator, attribute = (field, 'text') if isinstance(field, str) else field
+            locators.append(locator)
+            field_list.append([name, list(js_locator(by, locator)), attribute])
+        if wait_time:
+            self._locate_element(by, row if row else locators[0], wait_time)
+        row_locator = list(js_locator(by, row)) if row else None
+        records = self._driver.execute_script(_JS_BULK_EXTRACT, row_locator, field_list)
+        if log:
+            logger.debug(f"Bulk extracted {len(records)} records with fields {list(fields)}")
+        return records
+
+    @instrumented(locator=True)
+    @wait_element_decorator
+    @logger.catch(exclude=(StaleElementReferenceException, NoSuchElementException), onerror=mark_error)
+    def input_keys(self, value:str, *keys:any, log:bool = True, by: By = None, _element: WebElement = None) -> None:
+        element = _element
         element.send_keys(*keys)
         if log:
             logger.debug(f"Input text {str(*keys)} into element{value}")
 
-    @logger.catch
+    @instrumented(locator=True)
+    @logger.catch(onerror=mark_error)
     def wait_element(self, value: str, wait_time: int = 20, log: bool = False, by: By = None) -> any:
         by = self._by if by is None else by
-        element = WebDriverWait(self._driver, wait_time).until(
-            ec.presence_of_element_located((by, value))
-        )
-        if not element:
-            raise NoSuchElementException("Input element not found, please check By and make sure it is loaded correctly")
+        element = self._cached_element(by, value) or self._locate_element(by, value, wait_time)
         if log:
             logger.debug(f"Wait for element {value}")
         return element
 
-    @wait_element_decorator
-    @logger.catch
-    def slide_horizontal(self, value: str, offset: int, log: bool = True, by: By = None, slowly: bool = True, slow_step:int = 10, slow_wait:float = 0.01) -> None:
+    @instrumented()
+    @logger.catch(onerror=mark_error)
+    def wait_elements(self, values: List[str], wait_time: int = 20, log: bool = False, by: By = None) -> List[WebElement]:
+        """
+        Waits for all the locators together, with the observer strategy this is a single round-trip.
+        """
         by = self._by if by is None else by
-        element = self._driver.find_element(by, value)
+        start = time.perf_counter() if self._metrics is not None else None
+        try:
+            elements = self._wait_strategy.wait_all(self._driver, [(by, value) for value in values], wait_time)
+        finally:
+            if start is not None:
+                add_wait(time.perf_counter() - start)
+        if self._element_cache is not None:
+            for value, element in zip(values, elements):
+                self._element_cache[(by, value)] = element
+        if log:
+            logger.debug(f"Wait for elements {values}")
+        return elements
+
+    @instrumented(locator=True)
+    @wait_element_decorator
+    @logger.catch(exclude=(StaleElementReferenceException, NoSuchElementException), onerror=mark_error)
+    def slide_horizontal(self, value: str, offset: int, log: bool = True, by: By = None, slowly: bool = True, slow_step:int = 10, slow_wait:float = 0.01, _element: WebElement = None) -> None:
+        element = _element
         actions = ActionChains(self._driver)
         if not slowly:
             actions.click_and_hold(element).move_by_offset(offset, 0).release().perform()
@@ -177,15 +411,18 @@ class DriverAction(object):
             logger.debug(f"Slide element {value} by offset {offset}")
 
 
-    @logger.catch
-    def scroll_down(self, value:str = None, pixel:int = None, sleep_time:float = random.uniform(0.5, 1), log:bool = True, by: By = None, slowly: bool = True, slow_step:int = 100) -> None:
+    @instrumented(locator=True)
+    @logger.catch(onerror=mark_error)
+    def scroll_down(self, value:str = None, pixel:int = None, sleep_time:float = None, log:bool = True, by: By = None, slowly: bool = True, slow_step:int = 100) -> None:
         """
         value: a By expression for element search, then driver will scroll until it is in view
         pixel: how many pixel to scroll down
+        sleep_time: the pause between two steps, a random value in [0.5, 1) is drawn on every call by default
 
         if none of the first two are provided, the page will be scrolled to the bottom gradually
         """
         by = self._by if by is None else by
+        sleep_time = random.uniform(0.5, 1) if sleep_time is None else sleep_time
         if pixel:
             """
             this option is rarely used and required to wait until the loading finishes
@@ -202,8 +439,7 @@ class DriverAction(object):
                 logger.debug(f"Scroll down {pixel} pixel")
 
         elif value:
-            self.wait_element(value, by=by)
-            element = self._driver.find_element(by, value)
+            element = self._locate_element(by, value)
 
             if slowly:
                 current_position = self._driver.execute_script("return window.pageYOffset;")
@@ -246,7 +482,52 @@ class DriverAction(object):
                 logger.debug(f"Scroll down to the bottom")
 
 
-    @logger.catch
+    @instrumented()
+    @logger.catch(exclude=ValueError, onerror=mark_error)
+    def scroll_infinite(self, item_locator: str = None, max_items: int = None, max_height: int = None,
+                        idle_ms: int = 1500, timeout: float = 300, by: By = None, log: bool = True) -> dict:
+        """
+        Scrolls an infinite feed to the bottom again and again, every round waits inside the page(MutationObserver
+        and resource timing) until nothing changed for idle_ms, instead of sleeping for a fixed time.
+
+        Stops when a round does not grow the page, when item_locator matches max_items elements,
+        when the page is max_height pixels high or after timeout seconds.
+
+        Returns a dict with the final height, item count(None without item_locator), rounds and stop reason.
+        """
+        if max_items and not item_locator:
+            raise ValueError("max_items needs an item_locator to count the items")
+        by = self._by if by is None else by
+        locator = list(js_locator(by, item_locator)) if item_locator else None
+        round_ms = max(idle_ms * 4, 5000)
+        script_timeout = self._driver.timeouts.script
+        self._driver.set_script_timeout(round_ms / 1000 + 5)
+        deadline = time.monotonic() + timeout
+        rounds = 0
+        try:
+            while True:
+                state = self._driver.execute_async_script(_JS_SCROLL_AND_SETTLE, locator, idle_ms, max_items, round_ms)
+                rounds += 1
+                if not state['grew']:
+                    reason = 'idle'
+                elif max_items and state['items'] >= max_items:
+                    reason = 'items'
+                elif max_height and state['height'] >= max_height:
+                    reason = 'height'
+                elif time.monotonic() >= deadline:
+                    reason = 'timeout'
+                else:
+                    continue
+                break
+        finally:
+            self._driver.set_script_timeout(script_timeout)
+        result = {'height': state['height'], 'items': state['items'], 'rounds': rounds, 'reason': reason}
+        if log:
+            logger.debug(f"Infinite scroll stopped by {reason} after {rounds} rounds, height: {state['height']}, items: {state['items']}")
+        return result
+
+    @instrumented()
+    @logger.catch(onerror=mark_error)
     def add_cookies(self, cookieinstance: Union[dict, List[dict]], log: bool = True) -> None:
         if isinstance(cookieinstance, dict):
             self._driver.add_cookie(cookieinstance)
@@ -263,7 +544,8 @@ class DriverAction(object):
                     logger.debug(f"Added cookie: {cookie}")
     
 
-    @logger.catch
+    @instrumented()
+    @logger.catch(onerror=mark_error)
     def window_switch(self, actionlist: List[Union[int, tuple]], log: bool = True) -> str:
         """
         This function works as a second layer for abstract workflow,
@@ -273,6 +555,7 @@ class DriverAction(object):
         for action in actionlist:
             if isinstance(action, int):
                 self._driver.switch_to.window(self._driver.window_handles[action])
+                self.clear_element_cache()
                 if log:
                     logger.debug(f"Switched to window {self._driver.title}")
             elif isinstance(action, tuple):
@@ -284,7 +567,8 @@ class DriverAction(object):
             logger.debug("Window switch completed")
         return self._driver.title
 
-    @logger.catch
+    @instrumented()
+    @logger.catch(onerror=mark_error)
     def frame_switch(self, actionlist: List[Union[str, tuple]], log: bool = True, by: By = None) -> None:
         """
         This function works as a second layer for abstract workflow,
@@ -294,9 +578,9 @@ class DriverAction(object):
         by = self._by if by is None else by
         for action in actionlist:
             if isinstance(action, str):
-                self.wait_element(action, by=by)
-                element = self._driver.find_element(by, action)
+                element = self._locate_element(by, action)
                 self._driver.switch_to.frame(element)
+                self.clear_element_cache()
                 if log:
                     logger.debug(f"Switched to frame {action}")
             elif isinstance(action, tuple):
@@ -309,7 +593,7 @@ class DriverAction(object):
 
     @staticmethod
     @logger.catch
-    def driver_signiture_validate(driver):
+    def driver_signiture_validate(driver, wait_strategy: any = 'webdriver'):
         """
         Validates the Selenium WebDriver's signature by navigating to bot.sannysoft.com,
         which is specially made for signiture test.
@@ -318,6 +602,8 @@ class DriverAction(object):
         -----------
         driver : WebDriver
             The Selenium WebDriver instance used to interact with the web browser.
+        wait_strategy : Union[str, object]
+            The strategy used to wait for the result table, see DriverAction.
 
         Returns:
         --------
@@ -328,7 +614,7 @@ class DriverAction(object):
         base_url = "https://bot.sannysoft.com/"
         driver.get(base_url)
         all_pass = True
-        WebDriverWait(driver, 10).until(ec.presence_of_element_located((By.XPATH, '//*[@id="fp2"]/tr[20]/td[2]')))
+        get_wait_strategy(wait_strategy).wait(driver, By.XPATH, '//*[@id="fp2"]/tr[20]/td[2]', 10)
         tds = driver.find_elements(by=By.XPATH, value='//*[@id="fp2"]/tr/td[2]')
         for td in tds:
             if td.text != "ok":
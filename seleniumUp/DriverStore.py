@@ -0,0 +1,306 @@
+from contextlib import contextmanager
+from typing import Literal, Union, List
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+
+"""
+A driver store shared by every project and worker of a host.
+Entries live under $XDG_CACHE_HOME/seleniumUp/drivers(or ~/.cache, %LOCALAPPDATA% on Windows) as
+<browser>/<platform>/<version>-<sha256 prefix>/ with the binary and a manifest.json, a binary is never modified
+once published. Population is serialized by lock files kept under locks/(never inside a directory that is
+replaced), so parallel workers install a driver only once.
+The manifest records the size and mtime the binary was verified with, later starts only compare them.
+
+    python -m seleniumUp.DriverStore add Chrome 130.0.6723.69 /path/to/chromedriver
+    python -m seleniumUp.DriverStore list
+"""
+
+_BINARY_NAMES = {
+    'Chrome': 'chromedriver',
+    'Firefox': 'geckodriver',
+}
+_MANIFEST = "manifest.json"
+_LOCKS_DIR = "locks"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _default_root() -> str:
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'seleniumUp', 'drivers')
+
+
+def current_platform() -> str:
+    machine = platform.machine().lower()
+    arm = machine in ('arm64', 'aarch64')
+    if sys.platform.startswith('win'):
+        return 'win64' if sys.maxsize > 2 ** 32 else 'win32'
+    if sys.platform == 'darwin':
+        return 'mac-arm64' if arm else 'mac-x64'
+    return 'linux-arm64' if arm else 'linux64'
+
+
+def _sha256(file_path: str) -> str:
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for byte_block in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha256_hash.update(byte_block)
+    return sha256_hash.hexdigest()
+
+
+def _version_key(version: str) -> tuple:
+    return tuple(int(number) for number in re.findall(r'\d+', version))
+
+
+@contextmanager
+def _locked(lock_path: str):
+    """
+    An exclusive lock between processes, fcntl on posix and msvcrt on Windows.
+    """
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a+b') as lock_file:
+        if sys.platform.startswith('win'):
+            import msvcrt
+            while True:
+                try:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 seconds, keep waiting for the other process
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _write_json(file_path: str, content: dict) -> None:
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(content, f, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+# manifest path -> (manifest mtime, manifest), a manifest is read once per process unless it changes
+_MANIFESTS = {}
+
+
+def _read_manifest(manifest_path: str) -> Union[dict, None]:
+    try:
+        mtime = os.stat(manifest_path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    cached = _MANIFESTS.get(manifest_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    _MANIFESTS[manifest_path] = (mtime, manifest)
+    return manifest
+
+
+class DriverStore(object):
+    """
+    Content-addressed store of browser drivers, see the module docstring for the layout.
+
+    Parameters:
+    - root (Union[str, None], optional): The store directory, defaults to the shared cache directory.
+    """
+    def __init__(self, root: Union[str, None] = None) -> None:
+        self.root = os.path.abspath(os.path.expanduser(root)) if root else _default_root()
+
+    @staticmethod
+    def binary_name(browser: Literal['Chrome', 'Firefox'], platform_key: Union[str, None] = None) -> str:
+        platform_key = platform_key or current_platform()
+        if browser not in _BINARY_NAMES:
+            raise ValueError(f"Unknown browser {browser}, choose from {list(_BINARY_NAMES)}")
+        return _BINARY_NAMES[browser] + ('.exe' if platform_key.startswith('win') else '')
+
+    def _platform_dir(self, browser: str, platform_key: str) -> str:
+        return os.path.join(self.root, browser.lower(), platform_key)
+
+    def _lock_path(self, *names: str) -> str:
+        """
+        locks/<browser>/<platform>[/<entry>].lock, the lock of an entry outlives the entry directory it guards.
+        """
+        return os.path.join(self.root, _LOCKS_DIR, *names[:-1], f"{names[-1]}.lock")
+
+    def entries(self, browser: Literal['Chrome', 'Firefox'], platform_key: Union[str, None] = None) -> List[dict]:
+        """
+        The manifests of the stored drivers, newest version first, `path` is added to every manifest.
+        """
+        platform_dir = self._platform_dir(browser, platform_key or current_platform())
+        if not os.path.isdir(platform_dir):
+            return []
+        entries = []
+        for name in os.listdir(platform_dir):
+            # skip the downloads and unfinished(.tmp-) entries
+            if name.startswith('.'):
+                continue
+            entry_dir = os.path.join(platform_dir, name)
+            manifest = _read_manifest(os.path.join(entry_dir, _MANIFEST))
+            if manifest is not None:
+                entries.append(dict(manifest, path=os.path.join(entry_dir, manifest['binary'])))
+        return sorted(entries, key=lambda entry: _version_key(entry['version']), reverse=True)
+
+    def _verify(self, entry: dict) -> bool:
+        """
+        Hash the binary only if it changed since it was last verified(size and mtime in the manifest),
+        so a driver is hashed once per host rather than on every start.
+        """
+        try:
+            stat = os.stat(entry['path'])
+        except FileNotFoundError:
+            return False
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        if entry.get('verified') == stamp:
+            return True
+        if _sha256(entry['path']) != entry['sha256']:
+            return False
+        entry_dir = os.path.dirname(entry['path'])
+        with _locked(self._lock_path(entry['browser'].lower(), entry['platform'], os.path.basename(entry_dir))):
+            manifest = dict(_read_manifest(os.path.join(entry_dir, _MANIFEST)), verified=stamp)
+            _write_json(os.path.join(entry_dir, _MANIFEST), manifest)
+        return True
+
+    def resolve(self, browser: Literal['Chrome', 'Firefox'], version: Union[str, None] = None,
+                platform_key: Union[str, None] = None) -> Union[str, None]:
+        """
+        Returns the path of a verified driver binary, the newest one unless `version` is given
+        (a prefix such as "130" matches "130.0.6723.69"). None if the store has no matching driver.
+        """
+        for entry in self.entries(browser, platform_key):
+            if version and not (entry['version'] == version or entry['version'].startswith(f"{version}.")):
+                continue
+            if self._verify(entry):
+                return entry['path']
+        return None
+
+    def add(self, browser: Literal['Chrome', 'Firefox'], version: str, source: Union[str, List[str]],
+            sha256: Union[str, None] = None, platform_key: Union[str, None] = None) -> str:
+        """
+        Put a driver into the store and return the path of the stored binary.
+
+        Parameters:
+        - browser (Literal['Chrome', 'Firefox']): The browser of the driver.
+        - version (str): The driver version.
+        - source (Union[str, List[str]]): The driver binary, a zip archive or the split parts of one.
+        - sha256 (Union[str, None], optional): The expected checksum of the binary.
+        - platform_key (Union[str, None], optional): The platform of the driver, defaults to the current one.
+
+        Returns:
+        - str: The stored binary, an identical driver already stored is reused.
+        """
+        platform_key = platform_key or current_platform()
+        binary = self.binary_name(browser, platform_key)
+        platform_dir = self._platform_dir(browser, platform_key)
+        os.makedirs(platform_dir, exist_ok=True)
+        with _locked(self._lock_path(browser.lower(), platform_key)):
+            tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=platform_dir)
+            try:
+                binary_path = self._unpack(source, binary, tmp_dir)
+                checksum = _sha256(binary_path)
+                if sha256 and checksum != sha256.lower():
+                    raise ValueError(f"Checksum of {binary} does not match, expected {sha256}, got {checksum}")
+                entry_dir = os.path.join(platform_dir, f"{version}-{checksum[:16]}")
+                existing = _read_manifest(os.path.join(entry_dir, _MANIFEST))
+                # an identical verified driver is kept, a damaged one is replaced
+                if existing is None or not self._verify(dict(existing, path=os.path.join(entry_dir, existing['binary']))):
+                    os.chmod(binary_path, 0o755)
+                    stat = os.stat(binary_path)
+                    _write_json(os.path.join(tmp_dir, _MANIFEST), {
+                        "browser": browser,
+                        "version": version,
+                        "platform": platform_key,
+                        "binary": os.path.relpath(binary_path, tmp_dir),
+                        "sha256": checksum,
+                        "verified": [stat.st_size, stat.st_mtime_ns],
+                    })
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    os.replace(tmp_dir, entry_dir)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        return os.path.join(entry_dir, _read_manifest(os.path.join(entry_dir, _MANIFEST))['binary'])
+
+    @staticmethod
+    def _unpack(source: Union[str, List[str]], binary: str, target: str) -> str:
+        from .DownloadDrivers import extract_parts
+        parts = [source] if isinstance(source, str) else list(source)
+        if len(parts) == 1 and not zipfile.is_zipfile(parts[0]):
+            binary_path = os.path.join(target, binary)
+            shutil.copyfile(parts[0], binary_path)
+            return binary_path
+        extract_parts(parts, target)
+        for directory, _, files in os.walk(target):
+            if binary in files:
+                return os.path.join(directory, binary)
+        raise FileNotFoundError(f"{binary} not found in {parts}")
+
+    def fetch(self, browser: Literal['Chrome', 'Firefox'], version: str, files_info: List[tuple],
+              sha256: Union[str, None] = None, platform_key: Union[str, None] = None) -> Union[str, None]:
+        """
+        Return the stored driver, downloading the archive parts(url, sha256 pairs as in DownloadDrivers) first
+        if it is missing. Concurrent callers wait for the first one instead of downloading again.
+        """
+        platform_key = platform_key or current_platform()
+        stored = self.resolve(browser, version, platform_key)
+        if stored:
+            return stored
+        from .DownloadDrivers import download_files
+        platform_dir = self._platform_dir(browser, platform_key)
+        download_path = os.path.join(platform_dir, '.downloads', version)
+        with _locked(self._lock_path(browser.lower(), f"{platform_key}.download")):
+            stored = self.resolve(browser, version, platform_key)
+            if stored:
+                return stored
+            file_paths = download_files(files_info, download_path)
+            if len(file_paths) != len(files_info):
+                return None
+            stored = self.add(browser, version, file_paths, sha256, platform_key)
+            shutil.rmtree(download_path, ignore_errors=True)
+        return stored
+
+
+def main() -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Manage the shared driver store.")
+    parser.add_argument('--root', default=None, help="store directory, defaults to the shared cache directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="add a driver binary, zip archive or split parts")
+    add.add_argument('browser', choices=list(_BINARY_NAMES))
+    add.add_argument('version')
+    add.add_argument('source', nargs='+')
+    add.add_argument('--sha256', default=None)
+    add.add_argument('--platform', default=None)
+    commands.add_parser('list', help="list the stored drivers of this platform")
+    args = parser.parse_args()
+
+    store = DriverStore(args.root)
+    if args.command == 'add':
+        print(store.add(args.browser, args.version, args.source, args.sha256, args.platform))
+    else:
+        for browser in _BINARY_NAMES:
+            for entry in store.entries(browser):
+                print(f"{browser:<8}{entry['version']:<20}{entry['sha256'][:16]}  {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,124 @@
 from loguru import logger
-import yagmail
+import atexit
+import os
 import sys
+import threading
+import time
+from collections import deque
 from typing import Union
 from datetime import datetime
 
+_SMTP_OPTIONS = ('host', 'port', 'smtp_ssl', 'smtp_starttls', 'smtp_skip_login')
+# sink key -> loguru handler id, every sink is added once per process
+_SINKS = {}
+_SINKS_LOCK = threading.Lock()
+# the default context of every record, workers override it with logger.bind / logger.contextualize
+_DEFAULT_EXTRA = {"worker": "main", "url": ""}
+
+
+class EmailAlertSink(object):
+    """
+    A loguru sink that sends log records by email without blocking the logging thread.
+
+    Records are only queued by the sink, a background thread sends them as one digest every `interval`
+    seconds with identical messages collapsed into a count. At most `max_per_hour` emails are sent,
+    records are kept(up to `max_pending` distinct messages) and retried while SMTP is down.
+
+    The contact param takes username, password and to, plus optional host, port, smtp_ssl,
+    smtp_starttls and smtp_skip_login passed to yagmail.
+    """
+    def __init__(self, param: dict, level: str = "CRITICAL", interval: float = 60,
+                 max_per_hour: int = 20, max_pending: int = 1000) -> None:
+        self.param = param
+        self.level = level
+        self.interval = interval
+        self.max_per_hour = max_per_hour
+        self.max_pending = max_pending
+        self.dropped = 0
+        # message -> [formatted record, count]
+        self._pending: dict = {}
+        self._sent_times = deque()
+        self._smtp = None
+        # _lock guards the pending records, _flush_lock lets one digest be built and sent at a time
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="email-alert-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __call__(self, message: any) -> None:
+        key = message.record["message"] if hasattr(message, "record") else str(message)
+        with self._lock:
+            if key in self._pending:
+                self._pending[key][1] += 1
+            elif len(self._pending) < self.max_pending:
+                self._pending[key] = [str(message), 1]
+            else:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def _connect(self) -> any:
+        if self._smtp is None:
+            import yagmail
+            options = {option: self.param[option] for option in _SMTP_OPTIONS if option in self.param}
+            self._smtp = yagmail.SMTP(user=self.param['username'], password=self.param.get('password'), **options)
+        return self._smtp
+
+    def flush(self) -> bool:
+        """
+        Send the pending records as one digest, returns whether an email was sent.
+        """
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                while self._sent_times and now - self._sent_times[0] > 3600:
+                    self._sent_times.popleft()
+                if not self._pending or len(self._sent_times) >= self.max_per_hour:
+                    return False
+                pending, self._pending = self._pending, {}
+                dropped, self.dropped = self.dropped, 0
+            total = sum(count for _, count in pending.values()) + dropped
+            contents = [f"[x{count}] {text}" if count > 1 else text for text, count in pending.values()]
+            if dropped:
+                contents.append(f"{dropped} more records were dropped")
+            try:
+                self._connect().send(
+                    to=self.param['to'],
+                    subject='Log {} Notification ({} records)'.format(self.level, total),
+                    contents="\n".join(contents)
+                )
+            except Exception as e:
+                # the logger is not used here, an email failure must not produce another email
+                sys.stderr.write(f"Failed to send log email, keeping {len(pending)} messages for the next try: {e}\n")
+                self._smtp = None
+                with self._lock:
+                    for key, (text, count) in pending.items():
+                        if key in self._pending:
+                            self._pending[key][1] += count
+                        elif len(self._pending) < self.max_pending:
+                            self._pending[key] = [text, count]
+                        else:
+                            self.dropped += count
+                    self.dropped += dropped
+                return False
+            with self._lock:
+                self._sent_times.append(now)
+            return True
+
+    def close(self) -> None:
+        """
+        Stop the thread and try to send what is left.
+        """
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.flush()
+
+
 class CustomLog(object):
     def __new__(cls, *args, **kwargs):
         instance = super(CustomLog, cls).__new__(cls)
@@ -12,67 +127,88 @@ class CustomLog(object):
     def __init__(self, filepath: str = f"./log-file/Log_{datetime.now().year}_{datetime.now().month}_{datetime.now().day}.log",
                      rotation: str = "00:00",
                      level: str = "DEBUG",
-                     log_format: str = "{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}",
+                     log_format: str = "{time:YYYY-MM-DD at HH:mm:ss} | {level} | {extra[worker]} | {message}",
                      contact_param: Union[dict, None] = None,
-                     new_terminal_level: str = "ERROR"
+                     new_terminal_level: str = "ERROR",
+                     enqueue: bool = True
                      ) -> None:
         """
         Initialize the Customized_Log class and set up the logger.
+        The sinks are registered once per process, creating CustomLog again with the same file or terminal level
+        does not add another handler.
 
             Args:
                 filepath (str): The log file path. Defaults to "./Log.log".
                 rotation (str): The log file rotation time. Defaults to "00:00".
                 level (str): The log level. Defaults to "DEBUG".
-                log_format (str): The log format string. Defaults to "{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}".
+                log_format (str): The log format string. Defaults to "{time:YYYY-MM-DD at HH:mm:ss} | {level} | {extra[worker]} | {message}".
                 contact_param (Union[dict, None], optional): Parameters for email notifications. Defaults to None.
+                new_terminal_level (str): The level of the stdout sink. Defaults to "ERROR".
+                enqueue (bool): Write the file and stdout sinks through loguru's queue, safe with threads and processes. Defaults to True.
         """
         self.custom_logger = logger
-        self.custom_logger.add(filepath, rotation=rotation, level=level, format=log_format)
+        self.enqueue = enqueue
+        with _SINKS_LOCK:
+            if not _SINKS:
+                self.custom_logger.configure(extra=_DEFAULT_EXTRA)
+        CustomLog.add_sink(self.custom_logger, ('file', os.path.abspath(filepath)), filepath,
+                           rotation=rotation, level=level, format=log_format, enqueue=enqueue)
         self._email_setting(param=contact_param)
         self._set_new_terminal_level(new_terminal_level)
 
+    @staticmethod
+    def add_sink(custom_logger: any, key: tuple, sink: any, lazy: bool = False, **kwargs: any) -> int:
+        """
+        Add a sink to the logger unless a sink with the same key is already registered,
+        returns the loguru handler id. With `lazy`, `sink` is a function creating the sink and is only called
+        when the sink is actually added.
+        """
+        with _SINKS_LOCK:
+            if key not in _SINKS:
+                if lazy:
+                    sink = sink()
+                _SINKS[key] = custom_logger.add(sink, **kwargs)
+            return _SINKS[key]
+
+    @staticmethod
+    def remove_sinks(custom_logger: any = logger) -> None:
+        """
+        Remove every sink registered by CustomLog, e.g. before configuring the logging again.
+        """
+        with _SINKS_LOCK:
+            for handler_id in _SINKS.values():
+                try:
+                    custom_logger.remove(handler_id)
+                except ValueError:
+                    pass
+            _SINKS.clear()
+
     def _email_setting(self, level:str = "CRITICAL", param:Union[dict, None] = None) -> None:
         """
         Send email to the contact specified in the 'contact_param' dictionary once an error occurs.
 
-        The function checks if the 'contact_param' is provided and contains a valid email address.
-        If the conditions are met, it extracts the email domain from the username, creates a notification handler
-        using the 'notifiers' library, and adds this handler to the logger with an error level.
+        The records are collected by an EmailAlertSink and sent as digests from a background thread,
+        so logging never waits for SMTP.
 
         Returns:
         None
         """
-        if param:
-            try:
-                yag = yagmail.SMTP(user=param['username'], password=param['password'])
-                def send_email(message):
-                    yag.send(
-                        to=param['to'],
-                        subject='Log {} Notification'.format(level),
-                        contents=message
-                    )
-                
-                # Add the email sending function as a loguru handler
-                self.custom_logger.add(send_email, level=level)
-            except Exception as e:
-                logger.error(f"Failed to set up email handler: {e}")
+        CustomLog.contact_setting(self.custom_logger, level, param)
+
     @staticmethod
-    def contact_setting(custom_logger:any, email_level: str = "CRITICAL", param:Union[dict, None] = None) -> None:
+    def contact_setting(custom_logger:any, email_level: str = "CRITICAL", param:Union[dict, None] = None,
+                        interval: float = 60, max_per_hour: int = 20) -> None:
         """
-        public API for email reciever setting
+        public API for email reciever setting, records are sent as digests every `interval` seconds
+        and at most `max_per_hour` emails, see EmailAlertSink.
+        A receiver and level pair is only registered once, so it can be called for every DriverAction.
         """
         if param:
             try:
-                yag = yagmail.SMTP(user=param['username'], password=param['password'])
-                def send_email(message):
-                    yag.send(
-                        to=param['to'],
-                        subject='Log {} Notification'.format(email_level),
-                        contents=message
-                    )
-                
-                # Add the email sending function as a loguru handler
-                custom_logger.add(send_email, level=email_level)
+                # Add the email sink as a loguru handler
+                CustomLog.add_sink(custom_logger, ('email', str(param['to']), email_level),
+                                   lambda: EmailAlertSink(param, email_level, interval, max_per_hour),
+                                   lazy=True, level=email_level)
             except Exception as e:
                 custom_logger.error(f"Failed to set up email handler: {e}")
 
@@ -80,6 +216,4 @@ class CustomLog(object):
         """
         Add a new terminal for higher level log processing
         """
-        self.custom_logger.add(sys.stdout, level=level)
-
-    
\ No newline at end of file
+        CustomLog.add_sink(self.custom_logger, ('stdout', level), sys.stdout, level=level, enqueue=self.enqueue)
@@ -0,0 +1,338 @@
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Union, List, Tuple
+import json
+import os
+import threading
+import time
+
+"""
+Latency instrumentation for DriverAction.
+An ActionMetrics instance passed to DriverAction(metrics=...) records every action, without it
+the instrumented methods only pay for one attribute check.
+"""
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_OTHER_LOCATOR = "__other__"
+# the frames of the actions running on the current thread, shared by every ActionMetrics
+_active = threading.local()
+
+
+class _Frame(object):
+    __slots__ = ('wait', 'round_trips', 'retries', 'error')
+
+    def __init__(self) -> None:
+        self.wait = 0.0
+        self.round_trips = 0
+        self.retries = 0
+        self.error = False
+
+
+def _current_frame() -> Union[_Frame, None]:
+    frames = getattr(_active, 'frames', None)
+    return frames[-1] if frames else None
+
+
+def add_wait(seconds: float) -> None:
+    frame = _current_frame()
+    if frame is not None:
+        frame.wait += seconds
+
+
+def mark_retry() -> None:
+    frame = _current_frame()
+    if frame is not None:
+        frame.retries += 1
+
+
+def mark_error(exception: BaseException = None) -> None:
+    """
+    Used as the `onerror` of logger.catch, the errors swallowed by the logger are still counted.
+    """
+    frame = _current_frame()
+    if frame is not None:
+        frame.error = True
+
+
+class _Histogram(object):
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Tuple[float]) -> None:
+        self.buckets = buckets
+        # the last count is the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: '_Histogram') -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        The upper bound of the bucket holding the q-quantile, the max for the +Inf bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> List[int]:
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "max": round(self.max, 6),
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.cumulative())),
+        }
+
+
+class _ActionStats(object):
+    __slots__ = ('wall', 'wait', 'work', 'calls', 'errors', 'retries', 'round_trips')
+
+    def __init__(self, buckets: Tuple[float]) -> None:
+        self.wall = _Histogram(buckets)
+        self.wait = _Histogram(buckets)
+        self.work = _Histogram(buckets)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.round_trips = 0
+
+    def merge(self, other: '_ActionStats') -> None:
+        self.wall.merge(other.wall)
+        self.wait.merge(other.wait)
+        self.work.merge(other.work)
+        self.calls += other.calls
+        self.errors += other.errors
+        self.retries += other.retries
+        self.round_trips += other.round_trips
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "round_trips": self.round_trips,
+            "wall": self.wall.to_dict(),
+            "wait": self.wait.to_dict(),
+            "action": self.work.to_dict(),
+        }
+
+
+def _label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path: str, text: str) -> None:
+    # a collector(e.g. the node_exporter textfile collector) must never read a half written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+
+
+class ActionMetrics(object):
+    """
+    Collects per-action metrics of DriverAction: wall time, the part of it spent waiting for elements,
+    the remaining action time, WebDriver round-trips, stale element retries and errors.
+
+    The metrics are aggregated into histograms per action and per(action, locator), at most `max_locators`
+    distinct locators are kept per action, the others are counted under "__other__".
+    One instance can be shared by several DriverAction(e.g. the workers of Workflow.run_concurrent).
+    """
+    def __init__(self, buckets: Tuple[float] = _DEFAULT_BUCKETS, max_locators: int = 200, prefix: str = "seleniumup") -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.max_locators = max_locators
+        self.prefix = prefix
+        self._stats = {}
+        self._locator_counts = {}
+        self._lock = threading.Lock()
+
+    def instrument(self, driver: any) -> any:
+        """
+        Wrap `driver.execute` to count the round-trips of the running action, the elements of the driver
+        go through it as well. Instrumenting the same driver twice has no effect.
+        """
+        if getattr(driver, '_metrics_execute', None) is None:
+            execute = driver.execute
+
+            @wraps(execute)
+            def counting_execute(*args, **kwargs):
+                frames = getattr(_active, 'frames', None)
+                if frames:
+                    frames[-1].round_trips += 1
+                return execute(*args, **kwargs)
+
+            driver.execute = counting_execute
+            driver._metrics_execute = execute
+        return driver
+
+    @contextmanager
+    def measure(self, action: str, locator: str = ""):
+        """
+        Record the block as one `action` call. The wall and wait time of nested actions are included in
+        the outer one, their round-trips and retries are only charged to the innermost action, so the counters
+        summed over the actions are the totals of the driver.
+        """
+        frames = getattr(_active, 'frames', None)
+        if frames is None:
+            frames = _active.frames = []
+        frame = _Frame()
+        frames.append(frame)
+        start = time.perf_counter()
+        try:
+            yield frame
+        except BaseException:
+            frame.error = True
+            raise
+        finally:
+            wall = time.perf_counter() - start
+            frames.pop()
+            if frames:
+                frames[-1].wait += frame.wait
+            self.record(action, locator, wall, frame.wait, frame.round_trips, frame.error, frame.retries)
+
+    def record(self, action: str, locator: str, wall: float, wait: float = 0.0,
+               round_trips: int = 0, error: bool = False, retries: int = 0) -> None:
+        wait = min(wait, wall)
+        with self._lock:
+            key = (action, locator or "")
+            stats = self._stats.get(key)
+            if stats is None:
+                if locator and self._locator_counts.get(action, 0) >= self.max_locators:
+                    key = (action, _OTHER_LOCATOR)
+                    stats = self._stats.get(key)
+                else:
+                    self._locator_counts[action] = self._locator_counts.get(action, 0) + bool(locator)
+                if stats is None:
+                    stats = self._stats[key] = _ActionStats(self.buckets)
+            stats.calls += 1
+            stats.errors += error
+            stats.retries += retries
+            stats.round_trips += round_trips
+            stats.wall.observe(wall)
+            stats.wait.observe(wait)
+            stats.work.observe(wall - wait)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._locator_counts.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Returns {"actions": {action: stats}, "locators": {action: {locator: stats}}}, the actions
+        are the sums over their locators.
+        """
+        with self._lock:
+            actions, locators = {}, {}
+            for (action, locator), stats in self._stats.items():
+                if action not in actions:
+                    actions[action] = _ActionStats(self.buckets)
+                actions[action].merge(stats)
+                if locator:
+                    locators.setdefault(action, {})[locator] = stats.to_dict()
+            return {
+                "actions": {action: stats.to_dict() for action, stats in actions.items()},
+                "locators": locators,
+            }
+
+    def to_json(self, path: str = None, indent: int = 2) -> str:
+        text = json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        if path:
+            _write_atomic(path, text)
+        return text
+
+    def to_prometheus(self, path: str = None) -> str:
+        """
+        Render the metrics in the Prometheus text format, written atomically to `path` if given
+        (suitable for the node_exporter textfile collector). Series are labelled by action and locator.
+        """
+        histograms = (
+            ("action_duration_seconds", "Wall time of DriverAction calls.", "wall"),
+            ("action_wait_seconds", "Time DriverAction calls spent waiting for elements.", "wait"),
+            ("action_work_seconds", "Time DriverAction calls spent outside of element waits.", "work"),
+        )
+        counters = (
+            ("action_calls_total", "DriverAction calls.", "calls"),
+            ("action_errors_total", "DriverAction calls that failed.", "errors"),
+            ("action_retries_total", "Stale element retries of DriverAction calls.", "retries"),
+            ("action_round_trips_total", "WebDriver round-trips made by DriverAction calls.", "round_trips"),
+        )
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+            for name, help_text, attribute in histograms:
+                metric = f"{self.prefix}_{name}"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for (action, locator), stats in items:
+                    histogram = getattr(stats, attribute)
+                    labels = f'action="{_label(action)}",locator="{_label(locator)}"'
+                    for bound, count in zip(bounds, histogram.cumulative()):
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum!r}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+            for name, help_text, attribute in counters:
+                metric = f"{self.prefix}_{name}"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                for (action, locator), stats in items:
+                    labels = f'action="{_label(action)}",locator="{_label(locator)}"'
+                    lines.append(f"{metric}{{{labels}}} {getattr(stats, attribute)}")
+        text = "\n".join(lines) + "\n"
+        if path:
+            _write_atomic(path, text)
+        return text
+
+
+def instrumented(locator: bool = False, action: str = None) -> Callable:
+    """
+    Decorator for DriverAction methods, the call is measured when the instance has metrics.
+    With `locator=True` the first argument(the element locator) labels the call.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = action or func.__name__
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            metrics = self._metrics
+            if metrics is None:
+                return func(self, *args, **kwargs)
+            label = ""
+            if locator:
+                value = args[0] if args else kwargs.get('value')
+                label = value if isinstance(value, str) else ""
+            with metrics.measure(name, label):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,236 @@
+from typing import Union, List, Tuple, Callable
+from .main import logger
+import json
+import threading
+import weakref
+
+"""
+Network helpers shared by DriverInit and the readers of the Chrome performance log.
+
+The performance log(`goog:loggingPrefs`) is drained by every `driver.get_log('performance')` call,
+so all its readers subscribe to one PerformanceLog per driver which dispatches every event to each of them.
+"""
+
+# resource type -> url patterns for Network.setBlockedURLs
+_RESOURCE_PATTERNS = {
+    'image': ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp", "*.avif"],
+    'font': ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    'media': ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.m4a", "*.mov", "*.m3u8", "*.mpd"],
+    'stylesheet': ["*.css"],
+    'tracker': ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+                "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*segment.io*", "*scorecardresearch.com*",
+                "*criteo.com*", "*adnxs.com*", "*taboola.com*", "*outbrain.com*"],
+}
+
+_BLOCK_PRESETS = {
+    'text-only': ('image', 'font', 'media', 'stylesheet', 'tracker'),
+    'no-media': ('image', 'media'),
+}
+
+# prefs blocking a resource type whatever its url looks like
+_CHROME_PREFS = {
+    'image': {"profile.managed_default_content_settings.images": 2},
+}
+_FIREFOX_PREFS = {
+    'image': {"permissions.default.image": 2},
+    'font': {"browser.display.use_document_fonts": 0},
+    # only stops autoplay, media the page preloads or the user plays is still downloaded
+    'media': {"media.autoplay.default": 5, "media.autoplay.blocking_policy": 2},
+}
+
+
+def resolve_block_resources(block_resources: Union[str, List[str], dict, None]) -> Tuple[List[str], List[str]]:
+    """
+    Turn the block_resources option of DriverInit into (resource types, url patterns).
+
+    block_resources can be a preset('text-only' or 'no-media'), a list mixing presets, resource types
+    ('image', 'font', 'media', 'stylesheet', 'tracker') and url patterns('*ads.example.com*'),
+    or a dict {'types': [...], 'patterns': [...]}.
+    """
+    if not block_resources:
+        return [], []
+    if isinstance(block_resources, dict):
+        items = list(block_resources.get('types', [])) + list(block_resources.get('patterns', []))
+    elif isinstance(block_resources, str):
+        items = [block_resources]
+    else:
+        items = list(block_resources)
+    types, patterns = [], []
+    for item in items:
+        if item in _BLOCK_PRESETS:
+            types.extend(resource_type for resource_type in _BLOCK_PRESETS[item] if resource_type not in types)
+        elif item in _RESOURCE_PATTERNS:
+            if item not in types:
+                types.append(item)
+        elif '*' in item or '.' in item or '/' in item:
+            patterns.append(item)
+        else:
+            raise ValueError(f"Unknown resource type or preset {item}, choose from "
+                             f"{list(_BLOCK_PRESETS) + list(_RESOURCE_PATTERNS)} or give a url pattern")
+    for resource_type in types:
+        for pattern in _RESOURCE_PATTERNS[resource_type]:
+            # a pattern matches the whole url, '*.css' misses 'style.css?v=3'
+            variants = (pattern, f"{pattern}?*") if pattern.startswith('*.') else (pattern,)
+            patterns.extend(variant for variant in variants if variant not in patterns)
+    return types, patterns
+
+
+def browser_prefs(selenium_driver_type: str, types: List[str]) -> dict:
+    table = _CHROME_PREFS if selenium_driver_type == 'Chrome' else _FIREFOX_PREFS
+    prefs = {}
+    for resource_type in types:
+        prefs.update(table.get(resource_type, {}))
+    return prefs
+
+
+class PerformanceLog(object):
+    """
+    Drains the Chrome performance log of a driver and hands each DevTools event to the subscribers,
+    a subscriber is called with (method, params). Use `performance_log(driver)` to get the instance of a driver.
+
+    A weak subscriber(a bound method) lasts as long as its object and is dropped by `release_weak`,
+    which DriverPool calls before a driver goes to the next job.
+    """
+    def __init__(self, driver: any) -> None:
+        self._driver = weakref.ref(driver)
+        self._subscribers: list = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber: Callable, weak: bool = False) -> Callable:
+        with self._lock:
+            self._subscribers.append(weakref.WeakMethod(subscriber) if weak else subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Callable) -> None:
+        with self._lock:
+            self._subscribers = [entry for entry in self._subscribers if _resolve(entry) not in (None, subscriber)]
+
+    def release_weak(self) -> None:
+        with self._lock:
+            self._subscribers = [entry for entry in self._subscribers if not isinstance(entry, weakref.WeakMethod)]
+
+    def poll(self) -> int:
+        """
+        Read the entries logged since the last poll and dispatch them, returns the number of events.
+        """
+        driver = self._driver()
+        if driver is None:
+            return 0
+        # one reader at a time, every entry is dispatched exactly once
+        with self._lock:
+            entries = driver.get_log('performance')
+            subscribers = [subscriber for subscriber in map(_resolve, self._subscribers) if subscriber is not None]
+            if len(subscribers) != len(self._subscribers):
+                self._subscribers = [entry for entry in self._subscribers if _resolve(entry) is not None]
+            for entry in entries:
+                message = json.loads(entry['message'])['message']
+                for subscriber in subscribers:
+                    try:
+                        subscriber(message['method'], message.get('params', {}))
+                    except Exception as e:
+                        logger.warning(f"Performance log subscriber failed on {message['method']}: {e}")
+        return len(entries)
+
+
+def _resolve(entry: any) -> Union[Callable, None]:
+    return entry() if isinstance(entry, weakref.WeakMethod) else entry
+
+
+_PERFORMANCE_LOGS = weakref.WeakKeyDictionary()
+_PERFORMANCE_LOGS_LOCK = threading.Lock()
+
+
+def release_subscribers(driver: any) -> None:
+    """
+    Drop the weak subscribers of a driver's performance log, if it has one.
+    """
+    with _PERFORMANCE_LOGS_LOCK:
+        log = _PERFORMANCE_LOGS.get(driver)
+    if log is not None:
+        log.release_weak()
+
+
+def performance_log(driver: any) -> PerformanceLog:
+    """
+    The PerformanceLog of a driver, the driver has to be started with the performance log enabled
+    (DriverInit does it when a feature needs it).
+    """
+    with _PERFORMANCE_LOGS_LOCK:
+        log = _PERFORMANCE_LOGS.get(driver)
+        if log is None:
+            log = _PERFORMANCE_LOGS[driver] = PerformanceLog(driver)
+        return log
+
+
+class ResourceMonitor(object):
+    """
+    Counts the requests of a driver from its performance log: loaded requests and their bytes on the wire,
+    and the requests blocked by DriverInit's block_resources, per resource type.
+
+    A blocked request is never sent, so its size is unknown and no bytes saved are reported,
+    compare `loaded_bytes` with a run without block_resources for that.
+    """
+    def __init__(self, driver: any) -> None:
+        self._driver = weakref.ref(driver)
+        self._types = {}
+        self._log = performance_log(driver)
+        self._log.subscribe(self._on_event)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.requests = 0
+        self.loaded = 0
+        self.loaded_bytes = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+
+    def _on_event(self, method: str, params: dict) -> None:
+        if method == 'Network.requestWillBeSent':
+            self._types[params['requestId']] = params.get('type', 'Other')
+            self.requests += 1
+        elif method == 'Network.loadingFinished':
+            self._types.pop(params['requestId'], None)
+            self.loaded += 1
+            self.loaded_bytes += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed':
+            resource_type = params.get('type') or self._types.get(params['requestId'], 'Other')
+            self._types.pop(params['requestId'], None)
+            # 'inspector' is the reason given for urls blocked by Network.setBlockedURLs
+            if params.get('blockedReason') == 'inspector':
+                self.blocked += 1
+                self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def report(self, reset: bool = True) -> dict:
+        """
+        The counts since the last report: url, requests, loaded(requests that finished), loaded_bytes,
+        blocked(requests not sent) and blocked_by_type. With reset, the next report starts from zero(e.g. one report per page).
+        """
+        self._log.poll()
+        driver = self._driver()
+        report = {
+            "url": driver.current_url if driver is not None else None,
+            "requests": self.requests,
+            "loaded": self.loaded,
+            "loaded_bytes": self.loaded_bytes,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+        if reset:
+            self._reset()
+        return report
+
+    def close(self) -> None:
+        self._log.unsubscribe(self._on_event)
+
+
+_RESOURCE_MONITORS = weakref.WeakKeyDictionary()
+
+
+def resource_monitor(driver: any, create: bool = False) -> Union[ResourceMonitor, None]:
+    with _PERFORMANCE_LOGS_LOCK:
+        monitor = _RESOURCE_MONITORS.get(driver)
+    if monitor is None and create:
+        monitor = ResourceMonitor(driver)
+        with _PERFORMANCE_LOGS_LOCK:
+            _RESOURCE_MONITORS[driver] = monitor
+    return monitor
@@ -0,0 +1,168 @@
+from typing import Union, List, Iterator, Iterable
+from .main import logger
+from .Network import performance_log
+from collections import deque
+import base64
+import json
+import re
+import threading
+import time
+
+_DEFAULT_MIME_TYPES = ('application/json', 'text/json', 'application/ld+json', 'application/vnd.api+json')
+_DEFAULT_RESOURCE_TYPES = ('XHR', 'Fetch')
+
+
+class NetworkCapture(object):
+    """
+    Captures the XHR/fetch responses of a Chrome driver from its performance log(start the driver with
+    `DriverInit(..., network_capture=True)`) and keeps the decoded bodies in a bounded buffer.
+
+    Bodies are fetched with Network.getResponseBody when their request finishes, Chrome only keeps them
+    for the current page, so poll(or iterate) before navigating away. The entries logged before the capture
+    was created are skipped. The capture follows the driver until `close`, it is garbage collected or
+    DriverPool resets the driver for another job.
+
+    Usage:
+        with NetworkCapture(driver, url_pattern=r'/api/search') as capture:
+            driver.get(url)
+            for payload in capture.json(timeout=5):
+                prices = list(ParseToolKit.dict_search(payload, 'price'))
+
+    Parameters:
+    - driver (any): A Chrome driver with the performance log enabled.
+    - url_pattern (Union[str, None], optional): A regex searched in the response url. Defaults to None(every url).
+    - mime_types (Iterable[str], optional): The accepted mime types, a prefix such as 'text/' accepts the whole family.
+      Defaults to the JSON types.
+    - resource_types (Union[Iterable[str], None], optional): The accepted CDP resource types, None accepts all of them.
+      Defaults to XHR and Fetch.
+    - max_buffer (int, optional): The number of responses kept, the oldest are dropped(and counted in `dropped`). Defaults to 1000.
+    - max_pending (int, optional): The number of unfinished requests followed(long polling, event streams...),
+      the oldest are given up and counted in `dropped`. Defaults to 1000.
+    - decode (bool, optional): Decode JSON bodies, otherwise the body text is kept(e.g. for ParseToolKit.stream_search). Defaults to True.
+    """
+    def __init__(self, driver: any, url_pattern: Union[str, None] = None,
+                 mime_types: Iterable[str] = _DEFAULT_MIME_TYPES,
+                 resource_types: Union[Iterable[str], None] = _DEFAULT_RESOURCE_TYPES,
+                 max_buffer: int = 1000, decode: bool = True, max_pending: int = 1000) -> None:
+        browser = (getattr(driver, 'capabilities', None) or {}).get('browserName', '')
+        if browser not in ('chrome', 'chrome-headless-shell', 'msedge'):
+            raise RuntimeError(f"NetworkCapture needs a Chrome driver, got {browser or 'an unknown browser'}")
+        self._driver = driver
+        self._url_pattern = re.compile(url_pattern) if url_pattern else None
+        self._mime_types = tuple(mime_types)
+        self._resource_types = set(resource_types) if resource_types else None
+        self._decode = decode
+        self._max_pending = max_pending
+        self._pending = {}
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self.captured = 0
+        self.dropped = 0
+        self.failed = 0
+        self._driver.execute_cdp_cmd('Network.enable', {})
+        self._log = performance_log(driver)
+        # the entries of earlier pages go to the other subscribers only, their bodies are gone
+        self._log.poll()
+        # a weak subscriber, a capture that is never closed does not outlive its last reference
+        self._log.subscribe(self._on_event, weak=True)
+
+    def _accepts(self, response: dict, resource_type: str) -> bool:
+        if self._resource_types is not None and resource_type not in self._resource_types:
+            return False
+        mime_type = response.get('mimeType', '')
+        if not any(mime_type.startswith(accepted) for accepted in self._mime_types):
+            return False
+        return self._url_pattern is None or self._url_pattern.search(response.get('url', '')) is not None
+
+    def _on_event(self, method: str, params: dict) -> None:
+        if method == 'Network.responseReceived':
+            response = params['response']
+            if self._accepts(response, params.get('type', '')):
+                if len(self._pending) >= self._max_pending:
+                    # requests that never finish must not grow the capture
+                    self._pending.pop(next(iter(self._pending)))
+                    self.dropped += 1
+                self._pending[params['requestId']] = {
+                    "url": response.get('url'),
+                    "status": response.get('status'),
+                    "mime_type": response.get('mimeType'),
+                    "type": params.get('type'),
+                }
+        elif method == 'Network.loadingFinished':
+            record = self._pending.pop(params['requestId'], None)
+            if record is not None:
+                self._capture(params['requestId'], record)
+        elif method == 'Network.loadingFailed':
+            self._pending.pop(params['requestId'], None)
+
+    def _capture(self, request_id: str, record: dict) -> None:
+        try:
+            result = self._driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = result['body']
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            if self._decode and 'json' in (record['mime_type'] or ''):
+                body = json.loads(body)
+        except Exception as e:
+            # the body is gone(the page navigated) or is not valid JSON
+            self.failed += 1
+            logger.debug(f"Failed to capture the response of {record['url']}: {e}")
+            return
+        record["body"] = body
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(record)
+            self.captured += 1
+
+    def poll(self) -> int:
+        """
+        Read the performance log and capture the finished responses, returns the number of buffered responses.
+        """
+        self._log.poll()
+        return len(self._buffer)
+
+    def drain(self) -> List[dict]:
+        """
+        Poll, then return and clear the buffered responses(dicts with url, status, mime_type, type and body).
+        """
+        self.poll()
+        with self._lock:
+            records = list(self._buffer)
+            self._buffer.clear()
+        return records
+
+    def responses(self, timeout: float = 5, poll_interval: float = 0.2) -> Iterator[dict]:
+        """
+        Yield the captured responses as they arrive, stops after `timeout` seconds without a new one.
+        """
+        last = time.monotonic()
+        while True:
+            records = self.drain()
+            if records:
+                last = time.monotonic()
+                yield from records
+            elif time.monotonic() - last >= timeout:
+                return
+            else:
+                time.sleep(poll_interval)
+
+    def json(self, timeout: float = 5, poll_interval: float = 0.2) -> Iterator[any]:
+        """
+        Yield only the bodies of the captured responses, ready for ParseToolKit.dict_search or query.
+        """
+        for record in self.responses(timeout, poll_interval):
+            yield record["body"]
+
+    def close(self) -> None:
+        self._log.unsubscribe(self._on_event)
+        self._pending.clear()
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.responses()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -1,6 +1,13 @@
 from .main import logger
-from typing import List, Iterator
-from prettytable import PrettyTable
+from typing import List, Iterator, Iterable, Tuple, Union
+from functools import lru_cache
+from difflib import SequenceMatcher
+from itertools import chain, islice
+from collections import deque
+from wcwidth import wcswidth, wcwidth
+import codecs
+import json
+import re
 
 _TABLE_COLORPLAN = {
     "title": "\033[95m",      # Magenta
@@ -9,10 +16,540 @@ _TABLE_COLORPLAN = {
     "default": "\033[0m"        
 }
 
+_PATH_TOKEN = re.compile(r"""
+    (?P<dots>\.\.?)
+  | \[\s*(?P<index>-?\d+)\s*\]
+  | \[\s*\*\s*\]
+  | \[\s*(?P<quote>['"])(?P<quoted>.*?)(?P=quote)\s*\]
+  | (?P<star>\*)
+  | (?P<name>[^.\[\]]+)
+""", re.VERBOSE)
+
+
+def _parse_path(path: str) -> Tuple[tuple, ...]:
+    """
+    Parse a path into steps (kind, argument, descendant), kind is 'key', 'index' or 'any'.
+
+    '$.a.b[0]' is anchored at the root, anything else is searched at any depth('price' == '$..price').
+    """
+    if path.startswith('$'):
+        rest = path[1:]
+    else:
+        rest = '..' + path
+    steps = []
+    descendant = False
+    position = 0
+    while position < len(rest):
+        match = _PATH_TOKEN.match(rest, position)
+        if not match:
+            raise ValueError(f"Invalid path {path} at position {position}")
+        position = match.end()
+        if match.group('dots'):
+            descendant = descendant or match.group('dots') == '..'
+            continue
+        if match.group('index') is not None:
+            step = ('index', int(match.group('index')))
+        elif match.group('quoted') is not None:
+            step = ('key', match.group('quoted'))
+        elif match.group('name') is not None:
+            step = ('key', match.group('name'))
+        else:
+            step = ('any', None)
+        steps.append(step + (descendant,))
+        descendant = False
+    return tuple(steps)
+
+
+# separators are consumed as whitespace, the tokenizer does not validate the document
+_JSON_TOKEN = re.compile(r"""
+    [ \t\n\r,:]*(?:
+        (?P<key>"(?:[^"\\]|\\.)*")[ \t\n\r]*:
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<number>-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<start_map>\{)
+      | (?P<end_map>\})
+      | (?P<start_array>\[)
+      | (?P<end_array>\])
+      | (?P<literal>true|false|null)
+    )
+""", re.VERBOSE)
+
+# everything up to the next string or bracket
+_JSON_SKIP = re.compile(r'[^"{}\[\]]*')
+
+# the rest of a string up to its closing quote, stops before a backslash ending the text
+_JSON_STRING_REST = re.compile(r'(?:[^"\\]+|\\.)*')
+
+_JSON_SPACE = re.compile(r'[ \t\n\r]*')
+
+_JSON_SEPARATORS = re.compile(r'[ \t\n\r,:]*')
+
+_JSON_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+def _text_chunks(source: any, chunk_size: int = 65536, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Text chunks from a file path, bytes, a binary or text file object, or an iterable of bytes/str chunks.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            yield from _text_chunks(f, chunk_size, encoding)
+        return
+    if isinstance(source, (bytes, bytearray)):
+        source = [source]
+    elif hasattr(source, 'read'):
+        read = source.read
+        source = iter(lambda: read(chunk_size), read(0))
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in source:
+        yield decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+class _JsonEvents(object):
+    """
+    Incremental JSON tokenizer, iterates (event, value) with event in start_map, end_map,
+    start_array, end_array, key and scalar. Only the current token is kept in memory.
+
+    Calling `skip()` right after a start event skips the container without decoding it,
+    the next event is its end event.
+    """
+    def __init__(self, chunks: Iterator[str]) -> None:
+        self._chunks = iter(chunks)
+        self._skip = False
+        self._events = self._tokenize()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        return next(self._events)
+
+    def skip(self) -> None:
+        self._skip = True
+
+    def _read_string(self, text: str) -> Tuple[str, bool]:
+        """
+        Reads chunks until the string `text` starts with is closed, only the new chunks are scanned.
+        Returns the text up to the end of the chunk holding the closing quote, and whether the input ended.
+        """
+        pieces = [text]
+        # only a trailing backslash stops the scan before the end of an unclosed string
+        escaped = _JSON_STRING_REST.match(text, 1).end() < len(text)
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            pieces.append(chunk)
+            end = _JSON_STRING_REST.match(chunk, 1 if escaped else 0).end()
+            if end < len(chunk) and chunk[end] == '"':
+                return ''.join(pieces), False
+            escaped = end < len(chunk)
+        return ''.join(pieces), True
+
+    def _skip_container(self, buffer: str, position: int) -> Tuple[str, int, str]:
+        """
+        Skips to the end of the container just started, the skipped text is dropped chunk by chunk.
+        Returns the buffer, the position after the closing bracket and the bracket.
+        """
+        depth, in_string = 1, False
+        while True:
+            if in_string:
+                position = _JSON_STRING_REST.match(buffer, position).end()
+                if position < len(buffer) and buffer[position] == '"':
+                    in_string = False
+                    position += 1
+                    continue
+            else:
+                position = _JSON_SKIP.match(buffer, position).end()
+                if position < len(buffer):
+                    char = buffer[position]
+                    position += 1
+                    if char == '"':
+                        in_string = True
+                    elif char in '{[':
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if not depth:
+                            return buffer, position, char
+                    continue
+            # the buffer is used up but for a trailing backslash
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                raise ValueError("Unexpected end of JSON")
+            buffer, position = buffer[position:] + chunk, 0
+
+    def _tokenize(self) -> Iterator[tuple]:
+        buffer, position, eof = '', 0, False
+        chunks = self._chunks
+        while True:
+            if self._skip:
+                self._skip = False
+                buffer, position, bracket = self._skip_container(buffer, position)
+                yield ('end_map' if bracket == '}' else 'end_array'), None
+                continue
+
+            match = _JSON_TOKEN.match(buffer, position)
+            # a token touching the end of the buffer may continue in the next chunk, so may a number
+            # cut before its fraction or exponent and a string which could be a key once the ':' arrives
+            if not eof and (match is None or match.end() == len(buffer)
+                            or (match.lastgroup == 'number' and buffer[match.end()] in '.eE')
+                            or (match.lastgroup == 'string' and _JSON_SPACE.match(buffer, match.end()).end() == len(buffer))):
+                start = _JSON_SEPARATORS.match(buffer, position).end()
+                if match is None and buffer.startswith('"', start):
+                    # an unclosed string, scanning it again for every chunk would be quadratic
+                    buffer, eof = self._read_string(buffer[start:])
+                    position = 0
+                    continue
+                chunk = next(chunks, None)
+                if chunk is None:
+                    eof = True
+                else:
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                continue
+            if match is None:
+                if buffer[position:].strip(' \t\n\r,:'):
+                    raise ValueError(f"Invalid JSON near: {buffer[position:position + 50]!r}")
+                return
+            position = match.end()
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == 'key' or kind == 'string':
+                yield ('key' if kind == 'key' else 'scalar'), text[1:-1] if '\\' not in text else json.loads(text)
+            elif kind == 'number':
+                yield 'scalar', int(text) if text.isdigit() or (text[0] == '-' and text[1:].isdigit()) else float(text)
+            elif kind == 'literal':
+                yield 'scalar', _JSON_LITERALS[text]
+            else:
+                # skip() during the yield of a start event skips that container
+                yield kind, None
+
+
+class _ValueBuilder(object):
+    """
+    Rebuilds one value from the events, fed until `done`.
+    """
+    def __init__(self) -> None:
+        self.containers = []
+        self.keys = []
+        self.value = None
+        self.done = False
+
+    def _add(self, value: any) -> None:
+        if not self.containers:
+            self.value = value
+            return
+        parent = self.containers[-1]
+        if isinstance(parent, dict):
+            parent[self.keys[-1]] = value
+        else:
+            parent.append(value)
+
+    def feed(self, event: str, value: any) -> None:
+        if event == 'key':
+            self.keys[-1] = value
+        elif event == 'scalar':
+            self._add(value)
+            self.done = not self.containers
+        elif event in ('start_map', 'start_array'):
+            container = {} if event == 'start_map' else []
+            self._add(container)
+            self.containers.append(container)
+            self.keys.append(None)
+        else:
+            self.containers.pop()
+            self.keys.pop()
+            self.done = not self.containers
+
+
+class CompiledQuery(object):
+    """
+    Several paths compiled together, `search` finds the matches of all of them in one traversal.
+    Get instances from ParseToolKit.compile_query, which caches them.
+    """
+    def __init__(self, paths: Tuple[str, ...], nested: bool = False) -> None:
+        self.paths = paths
+        self.nested = nested
+        self._steps = [_parse_path(path) for path in paths]
+
+    @staticmethod
+    def _step_matches(step: tuple, key: any, is_map: bool, length: Union[int, None]) -> bool:
+        kind, argument, _ = step
+        if kind == 'any':
+            return True
+        if kind == 'key':
+            return is_map and key == argument
+        if is_map:
+            return False
+        return key == argument or (argument < 0 and length is not None and key == argument + length)
+
+    def _advance(self, states: tuple, key: any, is_map: bool, length: Union[int, None]) -> Tuple[tuple, list]:
+        """
+        The states for a child and the queries the child completes.
+        """
+        next_states, matched = [], []
+        for query, position in states:
+            step = self._steps[query][position]
+            if step[2]:
+                next_states.append((query, position))
+            if self._step_matches(step, key, is_map, length):
+                if position + 1 == len(self._steps[query]):
+                    matched.append(query)
+                else:
+                    next_states.append((query, position + 1))
+        if matched and not self.nested:
+            next_states = [state for state in next_states if state[0] not in matched]
+        return tuple(dict.fromkeys(next_states)), matched
+
+    def search(self, items: any) -> Iterator[Tuple[str, any]]:
+        """
+        Yields (path, value) for every match, siblings are reported before the matches below them.
+        """
+        initial = []
+        for query, steps in enumerate(self._steps):
+            if steps:
+                initial.append((query, 0))
+            else:
+                yield self.paths[query], items
+        stack = [(items, tuple(initial))]
+        while stack:
+            current, states = stack.pop()
+            if isinstance(current, dict):
+                children = current.items()
+            elif isinstance(current, list):
+                children = enumerate(current)
+            else:
+                continue
+            is_map, length = isinstance(current, dict), len(current)
+            pending = []
+            for key, value in children:
+                next_states, matched = self._advance(states, key, is_map, length)
+                for query in matched:
+                    yield self.paths[query], value
+                if next_states:
+                    pending.append((value, next_states))
+            stack.extend(reversed(pending))
+
+    def search_events(self, events: Iterator[tuple]) -> Iterator[Tuple[str, any]]:
+        """
+        The streaming counterpart of `search`, consumes (event, value) pairs from _JsonEvents.
+        Only the matched values are built, negative indexes are not supported as list lengths are unknown.
+        """
+        if any(step[0] == 'index' and step[1] < 0 for steps in self._steps for step in steps):
+            raise ValueError("Negative indexes are not supported when streaming")
+        # [is_map, states for the children, next index, current key]
+        frames = []
+        builders = []
+        skip = getattr(events, 'skip', None)
+        root_states = tuple((query, 0) for query, steps in enumerate(self._steps) if steps)
+        for event, value in events:
+            if event == 'key':
+                frames[-1][3] = value
+            elif event in ('end_map', 'end_array'):
+                frames.pop()
+            else:
+                if frames:
+                    frame = frames[-1]
+                    if frame[0]:
+                        key = frame[3]
+                    else:
+                        key = frame[2]
+                        frame[2] += 1
+                    states, matched = self._advance(frame[1], key, frame[0], None) if frame[1] else ((), [])
+                else:
+                    states = root_states
+                    matched = [query for query, steps in enumerate(self._steps) if not steps]
+                if matched:
+                    builders.append((_ValueBuilder(), matched))
+                if event != 'scalar':
+                    frames.append([event == 'start_map', states, 0, None])
+                    if not states and not builders and skip is not None:
+                        # nothing inside can match, let the tokenizer jump to the end of the container
+                        skip()
+            if builders:
+                for builder, _ in builders:
+                    builder.feed(event, value)
+                finished = [(builder, matched) for builder, matched in builders if builder.done]
+                if finished:
+                    builders = [(builder, matched) for builder, matched in builders if not builder.done]
+                    # inner values complete first, report them in the order they started
+                    for builder, matched in reversed(finished):
+                        for query in matched:
+                            yield self.paths[query], builder.value
+
+    def collect(self, items: any) -> dict:
+        """
+        Returns path -> list of matched values.
+        """
+        result = {path: [] for path in self.paths}
+        for path, value in self.search(items):
+            result[path].append(value)
+        return result
+
+
+_MISSING = object()
+
+
+def _scalar_fingerprint(value: any) -> int:
+    try:
+        return hash((type(value).__name__, value))
+    except TypeError:
+        return hash((type(value).__name__, repr(value)))
+
+
+def _fingerprints(*roots: any) -> dict:
+    """
+    id -> subtree hash for every dict and list below the roots, computed bottom-up without recursion.
+    """
+    memo = {}
+    for root in roots:
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if not isinstance(node, (dict, list)) or id(node) in memo:
+                continue
+            values = node.values() if isinstance(node, dict) else node
+            if not ready:
+                stack.append((node, True))
+                stack.extend((value, False) for value in values if isinstance(value, (dict, list)))
+                continue
+            children = [memo[id(value)] if isinstance(value, (dict, list)) else _scalar_fingerprint(value)
+                        for value in values]
+            if isinstance(node, dict):
+                memo[id(node)] = hash(('dict', frozenset(zip(node.keys(), children))))
+            else:
+                memo[id(node)] = hash(('list', tuple(children)))
+    return memo
+
+
+def _align_lists(list1: list, list2: list, list_align: str, list_key: Union[str, None], fingerprint) -> List[tuple]:
+    """
+    (old or _MISSING, new or _MISSING, path label) for the elements to compare, equal elements are left out.
+    """
+    if list_align == 'key' and list_key is not None and all(
+            isinstance(item, dict) and list_key in item for item in list1 + list2):
+        index2 = {item[list_key]: item for item in list2}
+        keys1 = set()
+        pairs = []
+        for item in list1:
+            keys1.add(item[list_key])
+            pairs.append((item, index2.get(item[list_key], _MISSING), f"{list_key}={item[list_key]}"))
+        pairs.extend((_MISSING, item, f"{list_key}={item[list_key]}") for item in list2 if item[list_key] not in keys1)
+        return pairs
+    if list_align == 'index':
+        pairs = [(list1[i], list2[i], i) for i in range(min(len(list1), len(list2)))]
+        pairs.extend((list1[i], _MISSING, i) for i in range(len(list2), len(list1)))
+        pairs.extend((_MISSING, list2[i], i) for i in range(len(list1), len(list2)))
+        return pairs
+    pairs = []
+    matcher = SequenceMatcher(None, [fingerprint(item) for item in list1], [fingerprint(item) for item in list2], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            # equal fingerprints can still be a hash collision(hash(-1) == hash(-2)), confirm the elements
+            pairs.extend((list1[i1 + k], list2[j1 + k], i1 + k) for k in range(i2 - i1) if list1[i1 + k] != list2[j1 + k])
+            continue
+        common = min(i2 - i1, j2 - j1)
+        # replaced ranges are compared element by element, the rest is removed or added
+        pairs.extend((list1[i1 + k], list2[j1 + k], i1 + k) for k in range(common))
+        pairs.extend((list1[i], _MISSING, i) for i in range(i1 + common, i2))
+        pairs.extend((_MISSING, list2[j], f"+{j}") for j in range(j1 + common, j2))
+    return pairs
+
+
+def _display_width(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    width = wcswidth(text)
+    return width if width >= 0 else len(text)
+
+
+def _fit(text: str, width: int) -> str:
+    """
+    Truncate(with an ellipsis) and pad a cell to the display width.
+    """
+    text = text.replace('\r', ' ').replace('\n', ' ')
+    text_width = _display_width(text)
+    if text_width > width:
+        if text.isascii():
+            text = text[:width - 1] + '…'
+        else:
+            kept, kept_width = [], 0
+            for char in text:
+                char_width = max(wcwidth(char), 0)
+                if kept_width + char_width > width - 1:
+                    break
+                kept.append(char)
+                kept_width += char_width
+            text = ''.join(kept) + '…'
+        text_width = _display_width(text)
+    return text + ' ' * (width - text_width)
+
+
+def _render_table(title: str, columns: List[str], sample: List[List[str]], rest: Iterator[List[str]],
+                  max_width: int = 40, log: bool = False, log_header: str = "Info Table Output",
+                  render: bool = True, log_page_size: int = 50) -> None:
+    """
+    Print a table row by row, the column widths come from the header and the sample rows.
+    Cells are fitted once and shared by the colored console output and the plain log output,
+    which is logged every `log_page_size` rows so a long table is never held in memory.
+    """
+    widths = [min(max_width, max([_display_width(column)] + [_display_width(row[i]) for row in sample]))
+              for i, column in enumerate(columns)]
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    log_lines = [] if log else None
+    log_pages = 0
+
+    def flush_log() -> None:
+        nonlocal log_pages
+        if log_lines:
+            log_pages += 1
+            part = f" (part {log_pages})" if log_pages > 1 else ""
+            logger.info(f"\n{log_header}{part}:\n" + "\n".join(log_lines))
+            log_lines.clear()
+
+    def emit(cells: List[str], color: str) -> None:
+        if render:
+            print('| ' + ' | '.join(color + cell + _TABLE_COLORPLAN["default"] for cell in cells) + ' |', flush=True)
+        if log_lines is not None:
+            log_lines.append('| ' + ' | '.join(cells) + ' |')
+            if len(log_lines) >= log_page_size:
+                flush_log()
+
+    def emit_border(line: str = border) -> None:
+        if render:
+            print(line)
+        if log_lines is not None:
+            log_lines.append(line)
+
+    if title:
+        emit_border('+' + '-' * (len(border) - 2) + '+')
+        emit([_fit(title, len(border) - 4)], _TABLE_COLORPLAN["title"])
+    emit_border()
+    emit([_fit(column, width) for column, width in zip(columns, widths)], _TABLE_COLORPLAN["header"])
+    emit_border()
+    for row in chain(sample, rest):
+        emit([_fit(cell, width) for cell, width in zip(row, widths)], _TABLE_COLORPLAN["row"])
+    emit_border()
+    if log:
+        flush_log()
+
+
+def _render_differences(differences: dict, title: str, render: bool = True, log: bool = False,
+                        sample_size: int = 50, max_width: int = 40) -> None:
+    if not render and not log:
+        return
+    rows = ([str(field), str(val1), str(val2)] for field, (val1, val2) in differences.items())
+    sample = list(islice(rows, sample_size))
+    _render_table(title, ["Field", "Item1", "Item2"], sample, rows, max_width, log, "Differences found", render)
+
+
 class ParseToolKit:
     @staticmethod
     @logger.catch
-    def dict_search(items: dict, key: str, log: bool = False) -> Iterator:
+    def dict_search(items: dict, key: str, log: bool = False, nested: bool = False) -> Iterator:
         """
         Searches for a specified key in a nested dictionary or list structure and yields its values.
 
@@ -20,6 +557,7 @@ class ParseToolKit:
             items (dict): The dictionary or list to search within.
             key (str): The key to search for in the dictionary.
             log (bool): If True, logs the number of results found. Default is False.
+            nested (bool): If True, also searches inside the values of matched keys. Default is False.
 
         Yields:
             Iterator: An iterator over the values associated with the specified key.
@@ -33,6 +571,8 @@ class ParseToolKit:
                     if k == key:
                         yield v
                         result_num += 1
+                        if nested:
+                            stack.append(v)
                     # dict in dict
                     else:
                         stack.append(v)
@@ -40,12 +580,146 @@ class ParseToolKit:
                 for v in current:
                     stack.append(v)
         if log:
-            logger.info("dict search completed, result_num: {result_num}")
+            logger.info(f"dict search completed, result_num: {result_num}")
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_query(*paths: str, nested: bool = False) -> CompiledQuery:
+        """
+        Compiles keys or JSONPath-like paths into a reusable query, compiled queries are cached.
+
+        Paths:
+            'price'            the key at any depth, the same as dict_search
+            '$.data.items'     anchored at the root
+            '$.data.items[0]'  list index, negative indexes count from the end
+            '$.data.*.id'      '*' or '[*]' matches any key or index
+            '$..id'            '..' searches at any depth below
+            "$['a.b']"         quoted keys for keys containing dots or brackets
+
+        Args:
+            *paths (str): The paths to search for.
+            nested (bool): Whether to keep searching inside matched values. Default is False.
+
+        Returns:
+            CompiledQuery: The query, use `search` for (path, value) pairs or `collect` for a dict.
+        """
+        return CompiledQuery(paths, nested)
+
+    @staticmethod
+    @logger.catch
+    def query(items: any, *paths: str, nested: bool = False, log: bool = False) -> dict:
+        """
+        Extracts several keys or paths from a JSON-like structure in one traversal.
+
+        Args:
+            items (any): The dictionary or list to search within.
+            *paths (str): The keys or paths to search for, see compile_query.
+            nested (bool): Whether to keep searching inside matched values. Default is False.
+            log (bool): If True, logs the number of results found per path. Default is False.
+
+        Returns:
+            dict: path -> list of matched values.
+        """
+        result = ParseToolKit.compile_query(*paths, nested=nested).collect(items)
+        if log:
+            logger.info(f"query completed, result_num: { {path: len(values) for path, values in result.items()} }")
+        return result
+
+
+    @staticmethod
+    def stream_search(source: any, *paths: str, nested: bool = False, chunk_size: int = 65536,
+                      encoding: str = 'utf-8', log: bool = False) -> Iterator[Tuple[str, any]]:
+        """
+        Searches keys or paths in a JSON document while reading it, without loading the whole document.
+        Memory stays around the size of the largest matched value.
+
+        Args:
+            source (any): A file path, bytes, a binary or text file object, or an iterable of bytes/str chunks.
+            *paths (str): The keys or paths to search for, see compile_query(negative indexes are not supported).
+            nested (bool): Whether to keep searching inside matched values. Default is False.
+            chunk_size (int): The read size for files. Default is 64 KB.
+            encoding (str): The encoding of byte input. Default is 'utf-8'.
+            log (bool): If True, logs the number of results found. Default is False.
+
+        Yields:
+            Iterator: (path, value) for every match as soon as the value is complete.
+        """
+        query = ParseToolKit.compile_query(*paths, nested=nested)
+        result_num = 0
+        for match in query.search_events(_JsonEvents(_text_chunks(source, chunk_size, encoding))):
+            result_num += 1
+            yield match
+        if log:
+            logger.info(f"stream search completed, result_num: {result_num}")
+
+    @staticmethod
+    def iter_differences(item1: any, item2: any, list_align: str = 'lcs', list_key: Union[str, None] = None,
+                         max_depth: Union[int, None] = None, max_differences: Union[int, None] = None) -> Iterator[dict]:
+        """
+        Compare two JSON-like structures and lazily yield their differences.
+
+        Branches with different subtree hashes are compared, equal hashes are confirmed with == before a branch
+        is skipped. Lists are aligned before comparing,
+        so an inserted element is reported once instead of shifting every later element.
+
+        Args:
+            item1: First JSON-like structure (dict or list).
+            item2: Second JSON-like structure (dict or list).
+            list_align (str): 'lcs'(longest common subsequence of the elements), 'key'(match dict elements on list_key)
+                or 'index'(compare by position). Default is 'lcs'.
+            list_key (str): The field identifying list elements for 'key' alignment, lists without it fall back to 'lcs'.
+            max_depth (int): Branches deeper than this are reported as a whole instead of being compared. Default is None.
+            max_differences (int): Stop after this many differences. Default is None.
+
+        Yields:
+            Iterator: dicts with path, kind('changed', 'added', 'removed' or 'type'), old and new.
+        """
+        if list_align not in ('lcs', 'key', 'index'):
+            raise ValueError(f"Unknown list_align {list_align}, choose from 'lcs', 'key' and 'index'")
+        fingerprints = _fingerprints(item1, item2)
 
+        def fingerprint(value: any) -> int:
+            return fingerprints[id(value)] if isinstance(value, (dict, list)) else _scalar_fingerprint(value)
+
+        found = 0
+        # (old, new, path, depth), a missing side is _MISSING
+        stack = [(item1, item2, "", 0)]
+        while stack:
+            obj1, obj2, path, depth = stack.pop()
+            record = None
+            if obj1 is _MISSING:
+                record = {"path": path, "kind": "added", "old": None, "new": obj2}
+            elif obj2 is _MISSING:
+                record = {"path": path, "kind": "removed", "old": obj1, "new": None}
+            elif type(obj1) != type(obj2):
+                record = {"path": path, "kind": "type", "old": obj1, "new": obj2}
+            elif fingerprint(obj1) == fingerprint(obj2) and obj1 == obj2:
+                # different fingerprints prove a difference, equal ones are confirmed since hashes collide
+                continue
+            elif not isinstance(obj1, (dict, list)) or (max_depth is not None and depth >= max_depth):
+                record = {"path": path, "kind": "changed", "old": obj1, "new": obj2}
+            elif isinstance(obj1, dict):
+                children = []
+                for key, value in obj1.items():
+                    children.append((value, obj2.get(key, _MISSING), f"{path}.{key}" if path else str(key), depth + 1))
+                for key, value in obj2.items():
+                    if key not in obj1:
+                        children.append((_MISSING, value, f"{path}.{key}" if path else str(key), depth + 1))
+                stack.extend(reversed(children))
+            else:
+                pairs = _align_lists(obj1, obj2, list_align, list_key, fingerprint)
+                stack.extend((old, new, f"{path}[{label}]", depth + 1) for old, new, label in reversed(pairs))
+            if record is not None:
+                yield record
+                found += 1
+                if max_differences is not None and found >= max_differences:
+                    return
 
     @staticmethod
     @logger.catch
-    def spot_difference(item1, item2, title: str = "Difference Table", log: bool = False) -> dict:
+    def spot_difference(item1, item2, title: str = "Difference Table", log: bool = False, list_align: str = 'lcs',
+                        list_key: Union[str, None] = None, max_depth: Union[int, None] = None,
+                        max_differences: Union[int, None] = None, render: bool = True) -> dict:
         """
         Compare two JSON-like structures (dicts, lists) and output differences in table.
 
@@ -54,126 +728,68 @@ class ParseToolKit:
             item2: Second JSON-like structure (dict or list).
             title (str): Title for the difference table.
             log (bool): Whether to log the differences.
+            list_align, list_key, max_depth, max_differences: See iter_differences.
+            render (bool): Whether to print the table. Default is True.
 
         Returns:
             dict: A dictionary containing the differences.
         """
         differences = {}
+        for record in ParseToolKit.iter_differences(item1, item2, list_align, list_key, max_depth, max_differences):
+            differences[record["path"]] = (record["old"], record["new"])
 
-        def _compare(obj1, obj2, path=""):
-            if type(obj1) != type(obj2):
-                differences[path] = (obj1, obj2)
-            elif isinstance(obj1, dict):
-                keys1 = set(obj1.keys())
-                keys2 = set(obj2.keys())
-                all_keys = keys1.union(keys2)
-                for key in all_keys:
-                    new_path = f"{path}.{key}" if path else key
-                    if key not in obj1:
-                        differences[new_path] = (None, obj2[key])
-                    elif key not in obj2:
-                        differences[new_path] = (obj1[key], None)
-                    else:
-                        _compare(obj1[key], obj2[key], new_path)
-            elif isinstance(obj1, list):
-                len1 = len(obj1)
-                len2 = len(obj2)
-                min_len = min(len1, len2)
-                for index in range(min_len):
-                    new_path = f"{path}[{index}]"
-                    _compare(obj1[index], obj2[index], new_path)
-                if len1 > len2:
-                    for index in range(len2, len1):
-                        new_path = f"{path}[{index}]"
-                        differences[new_path] = (obj1[index], None)
-                elif len2 > len1:
-                    for index in range(len1, len2):
-                        new_path = f"{path}[{index}]"
-                        differences[new_path] = (None, obj2[index])
-            else:
-                if obj1 != obj2:
-                    differences[path] = (obj1, obj2)
-
-        _compare(item1, item2)
-
-        if differences:
-            # Non-log version with color
-            table = PrettyTable()
-            if title:
-                table.title = _TABLE_COLORPLAN["title"] + title + _TABLE_COLORPLAN["default"]
-            table.field_names = [
-                _TABLE_COLORPLAN["header"] + "Field" + _TABLE_COLORPLAN["default"],
-                _TABLE_COLORPLAN["header"] + "Item1" + _TABLE_COLORPLAN["default"],
-                _TABLE_COLORPLAN["header"] + "Item2" + _TABLE_COLORPLAN["default"],
-            ]
-            for field, (val1, val2) in differences.items():
-                table.add_row([
-                    _TABLE_COLORPLAN["row"] + field + _TABLE_COLORPLAN["default"],
-                    _TABLE_COLORPLAN["row"] + str(val1) + _TABLE_COLORPLAN["default"],
-                    _TABLE_COLORPLAN["row"] + str(val2) + _TABLE_COLORPLAN["default"],
-                ])
-            print(table)
-
-            # No color version for log
-            if log:
-                log_table = PrettyTable()
-                if title:
-                    log_table.title = title
-                log_table.field_names = ["Field", "Item1", "Item2"]
-                for field, (val1, val2) in differences.items():
-                    log_table.add_row([field, str(val1), str(val2)])
-                logger.info("\nDifferences found:\n" + log_table.get_string())
+        if differences and (render or log):
+            _render_differences(differences, title, render, log)
 
         return differences
 
     @staticmethod
     @logger.catch
-    def table_print(item_list: List[dict], title: str = "Info Table", log: bool = False) -> None:
+    def table_print(item_list: Iterable[dict], title: str = "Info Table", log: bool = False,
+                    columns: Union[List[str], None] = None, page: Union[str, int, None] = None, page_size: int = 50,
+                    sample_size: int = 50, max_width: int = 40) -> None:
         """
         Prints a table of items in a list of dictionaries.
 
-        This function takes a list of dictionaries, where each dictionary represents a row in the table.
-        It prints the table with optional title and logs the table to the console if the 'log' parameter is True.
+        This function takes an iterable of dictionaries, where each dictionary represents a row in the table.
+        Rows are printed as they are read, the column widths come from the first `sample_size` rows
+        and long cells are truncated. The same render is logged `page_size` lines at a time if the 'log' parameter is True.
 
         Parameters:
-        - item_list (List[dict]): A list of dictionaries, where each dictionary represents a row in the table.
+        - item_list (Iterable[dict]): Dictionaries, where each dictionary represents a row in the table. Generators are read lazily.
         - title (str): The title of the table. Default is "Info Table".
-        - log (bool): A flag indicating whether to log the table to the console. Default is False.
+        - log (bool): A flag indicating whether to log the table. Default is False.
+        - columns (List[str]): The columns to show, by default the sorted keys of the sample rows.
+        - page (Union[str, int, None]): 'head', 'tail', a page number starting from 0, or None for every row. Default is None.
+        - page_size (int): The number of rows per page. Default is 50.
+        - sample_size (int): The number of rows used for the columns and their widths. Default is 50.
+        - max_width (int): The maximum width of a column. Default is 40.
 
         Returns:
         - None
         """
-        if not item_list:
-            logger.warning("No items to display in table.")
-        all_keys = set()
-        for item in item_list:
-            all_keys.update(item.keys())
-        sorted_keys = sorted(all_keys)  
-        table = PrettyTable()
-        if title:
-            table.title = _TABLE_COLORPLAN["title"] + title + _TABLE_COLORPLAN["default"]
-        table.field_names = [_TABLE_COLORPLAN["header"] + key + _TABLE_COLORPLAN["default"] for key in sorted_keys]
-        for item in item_list:
-            row = []
-            for key in sorted_keys:
-                value = item.get(key, '')  
-                colored_value = f"{_TABLE_COLORPLAN['row']}{value}{_TABLE_COLORPLAN['default']}"
-                row.append(colored_value)
-            table.add_row(row)
-
-        print(table)
-        # No color version for log
-        if log:
-            log_table = PrettyTable()
-            if title:
-                log_table.title = title
-            log_table.field_names = sorted_keys  
-            for item in item_list:
-                log_table.add_row([str(item.get(key, '')) for key in sorted_keys])
-            logger.info("\nInfo Table Output:\n" + log_table.get_string())
-
-
-
+        rows = iter(item_list)
+        if page == 'head':
+            rows = islice(rows, page_size)
+        elif page == 'tail':
+            rows = iter(deque(rows, maxlen=page_size))
+        elif isinstance(page, int):
+            rows = islice(rows, page * page_size, (page + 1) * page_size)
+        elif page is not None:
+            raise ValueError(f"Unknown page {page}, use 'head', 'tail', a page number or None")
 
+        sample = list(islice(rows, sample_size))
+        if not sample:
+            logger.warning("No items to display in table.")
+            return
+        if columns is None:
+            all_keys = set()
+            for item in sample:
+                all_keys.update(item.keys())
+            columns = sorted(all_keys)
 
+        def cells(item: dict) -> List[str]:
+            return [str(item.get(key, '')) for key in columns]
 
+        _render_table(title, list(columns), [cells(item) for item in sample], (cells(item) for item in rows),
+                      max_width, log, log_page_size=page_size)
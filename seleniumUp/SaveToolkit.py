@@ -1,8 +1,13 @@
 from .main import logger
-from typing import List, Iterator
-from concurrent.futures import ThreadPoolExecutor
-from threading import Lock
+from typing import List, Iterator, Iterable, Union
+from itertools import islice
+import codecs
 import csv
+import gzip
+import io
+import json
+import os
+import time
 
 
 
@@ -26,57 +31,235 @@ def error_rollback(func):
             raise
 
     return wrapper
+def _batched(items: Iterable, batch_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _document_size():
+    try:
+        from bson import encode
+        return lambda document: len(encode(document))
+    except ImportError:
+        return lambda document: len(json.dumps(document, default=str).encode())
+
+
+def _batched_by_size(items: Iterable[dict], batch_size: int, max_bytes: int, size_of) -> Iterator[tuple]:
+    """
+    Yields (batch, batch bytes), a batch is closed by whichever of count or size is reached first.
+    """
+    batch, batch_bytes = [], 0
+    for item in items:
+        size = size_of(item)
+        if batch and (len(batch) >= batch_size or batch_bytes + size > max_bytes):
+            yield batch, batch_bytes
+            batch, batch_bytes = [], 0
+        batch.append(item)
+        batch_bytes += size
+    if batch:
+        yield batch, batch_bytes
+
+
+def _insert_sql(table_name: str, columns: List[str], rows: int = 1, placeholder: str = '%s',
+                update_columns: Union[List[str], None] = None) -> str:
+    """
+    INSERT statement with `rows` value groups, update_columns adds ON DUPLICATE KEY UPDATE.
+    """
+    group = '(' + ', '.join([placeholder] * len(columns)) + ')'
+    columns_joined = ', '.join(f"`{col}`" for col in columns)
+    sql = f"INSERT INTO `{table_name}` ({columns_joined}) VALUES " + ', '.join([group] * rows)
+    if update_columns:
+        sql += " ON DUPLICATE KEY UPDATE " + ', '.join(f"`{col}` = VALUES(`{col}`)" for col in update_columns)
+    return sql
+
+
+def _serializer(name: str):
+    if name == 'json':
+        return lambda value: json.dumps(value, ensure_ascii=False, default=str)
+    if name == 'msgpack':
+        import msgpack
+        return lambda value: msgpack.packb(value, use_bin_type=True, default=str)
+    raise ValueError(f"Unknown serializer {name}, choose from 'json' and 'msgpack'")
+
+
+def _redis_value(value: any, dumps) -> any:
+    """
+    Redis only stores flat values, nested values are serialized, None and bool become strings.
+    """
+    if isinstance(value, (str, bytes, int, float)) and not isinstance(value, bool):
+        return value
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value)
+    return dumps(value)
+
+
+def _rotated_name(filename: str, index: int) -> str:
+    """
+    data.csv -> data.1.csv, data.csv.gz -> data.1.csv.gz
+    """
+    if index == 0:
+        return filename
+    directory, name = os.path.split(filename)
+    base, dot, suffix = name.partition('.')
+    return os.path.join(directory, f"{base}.{index}{dot}{suffix}")
+
+
+class CsvSink(object):
+    """
+    A streaming CSV writer, rows are written in order through one buffered file handle.
+
+    The columns are either declared with `fieldnames` or collected from the first `lookahead` rows,
+    keys first seen after the lookahead are dropped with a warning. Supports gzip output and rotation by size.
+
+    Usage:
+        with CsvSink("items.csv.gz", max_bytes=100 * 1024 ** 2) as sink:
+            for item in items:
+                sink.write(item)
+    """
+    def __init__(self, filename: str, fieldnames: Union[List[str], None] = None, encoding: str = 'utf-8',
+                 lookahead: int = 100, compress: Union[bool, None] = None, max_bytes: Union[int, None] = None,
+                 buffer_size: int = 1024 * 1024) -> None:
+        self.filename = filename
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.encoding = encoding
+        self.lookahead = max(lookahead, 1)
+        self.compress = filename.endswith('.gz') if compress is None else compress
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.files: List[str] = []
+        self.count = 0
+        self._fields_set = set(self.fieldnames) if self.fieldnames else None
+        self._pending: List[dict] = []
+        self._dropped = set()
+        self._raw = None
+        self._binary = None
+        self._writer = None
+
+    def _open(self) -> None:
+        path = _rotated_name(self.filename, len(self.files))
+        self._raw = open(path, 'wb', buffering=self.buffer_size)
+        self._binary = gzip.GzipFile(fileobj=self._raw, mode='wb') if self.compress else self._raw
+        self._encoder = codecs.getincrementalencoder(self.encoding)()
+        self._line = io.StringIO()
+        self._writer = csv.DictWriter(self._line, fieldnames=self.fieldnames, extrasaction='ignore', restval='')
+        self._file_rows = 0
+        if self.fieldnames:
+            self._writer.writeheader()
+            self._binary.write(self._encoder.encode(self._take_line()))
+        self.files.append(path)
+
+    def _take_line(self) -> str:
+        line = self._line.getvalue()
+        self._line.seek(0)
+        self._line.truncate()
+        return line
+
+    def _close_file(self) -> None:
+        if self._binary is not None:
+            # closing the gzip stream does not close the raw file it writes to
+            self._binary.write(self._encoder.encode('', final=True))
+            if self._binary is not self._raw:
+                self._binary.close()
+            self._raw.close()
+            self._raw = self._binary = self._writer = None
+
+    def _write_row(self, item: dict) -> None:
+        if self._writer is None:
+            self._open()
+        extra = item.keys() - self._fields_set
+        if extra and extra - self._dropped:
+            logger.warning(f"Columns {sorted(extra - self._dropped)} are not in the csv schema of {self.filename} and are dropped")
+            self._dropped.update(extra)
+        self._writer.writerow(item)
+        line = self._take_line()
+        # the raw file counts its buffered bytes, so a plain file is rotated before a row would pass max_bytes
+        if (self.max_bytes and not self.compress and self._file_rows
+                and self._raw.tell() + len(line.encode(self.encoding)) > self.max_bytes):
+            self._close_file()
+            self._open()
+        self._binary.write(self._encoder.encode(line))
+        self._file_rows += 1
+        self.count += 1
+        # a gzip file is measured after the row, the compressor may still hold a few kilobytes
+        if self.max_bytes and self.compress and self._raw.tell() >= self.max_bytes:
+            self._close_file()
+
+    def _flush_pending(self) -> None:
+        if self.fieldnames is None:
+            fields = {}
+            for item in self._pending:
+                fields.update(dict.fromkeys(item))
+            self.fieldnames = list(fields)
+        self._fields_set = set(self.fieldnames)
+        pending, self._pending = self._pending, []
+        for item in pending:
+            self._write_row(item)
+
+    def write(self, item: dict) -> None:
+        if self._fields_set is not None:
+            self._write_row(item)
+            return
+        self._pending.append(item)
+        if len(self._pending) >= self.lookahead:
+            self._flush_pending()
+
+    def write_many(self, items: Iterable[dict]) -> int:
+        start = self.count + len(self._pending)
+        for item in items:
+            self.write(item)
+        return self.count + len(self._pending) - start
+
+    def close(self) -> None:
+        if self._fields_set is None:
+            self._flush_pending()
+        if not self.files:
+            # an empty input still creates the file
+            self._open()
+        self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
 class SaveToolKit:
 
     @staticmethod
     @logger.catch
-    def csv_save(filename: str, item_list: Iterator[dict], encoding: str = 'utf-8', 
-                 max_workers: int = 30, log: bool = True) -> None:
+    def csv_save(filename: str, item_list: Iterable[dict], encoding: str = 'utf-8', 
+                 max_workers: int = 30, log: bool = True, fieldnames: Union[List[str], None] = None,
+                 lookahead: int = 100, compress: Union[bool, None] = None, max_bytes: Union[int, None] = None) -> int:
         """
-        Saves a list of dictionaries to a CSV file using multithreading.
+        Streams dictionaries into a CSV file in one pass, rows keep their input order.
 
         Args:
             filename (str): The name of the CSV file to save the data.
-            item_list (Iterator[dict]): An iterator of dictionaries to be saved.
+            item_list (Iterable[dict]): Any iterable of dictionaries, generators are consumed lazily.
             encoding (str, optional): The encoding format for the CSV file. Defaults to 'utf-8'.
-            max_workers (int, optional): The maximum number of threads to use. Defaults to 30.
+            max_workers (int, optional): Kept for compatibility, rows are written by a single buffered writer.
             log (bool, optional): Whether to log the success message. Defaults to True.
+            fieldnames (List[str], optional): The declared columns, otherwise the union of keys of the first `lookahead` rows.
+            lookahead (int, optional): How many rows are buffered to collect the columns. Defaults to 100.
+            compress (bool, optional): Whether to write gzip, by default when the filename ends with '.gz'.
+            max_bytes (int, optional): Start a new file(name.1.csv, name.2.csv...) when a file reaches this size.
 
         Returns:
-            None
+            int: The number of rows written.
         """
-        lock = Lock()
-
-        def _single_item(s_item: dict, write_headers: bool = True) -> None:
-            """
-            Writes a single dictionary item to the CSV file.
-
-            Args:
-                s_item (dict): The dictionary item to write.
-                write_headers (bool, optional): Whether to write headers. Defaults to True.
-
-            Returns:
-                None
-            """
-            header = list(s_item.keys())
-            mode = 'w' if write_headers else 'a'
-            with lock:
-                with open(filename, mode, newline='', encoding=encoding) as f:
-                    writer = csv.DictWriter(f, fieldnames=header)
-                    if write_headers:
-                        writer.writeheader()
-                    writer.writerow(s_item)
-
-        first = True
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            for num, item in enumerate(item_list, start=1):
-                executor.submit(_single_item, item, first)
-                first = False
+        with CsvSink(filename, fieldnames=fieldnames, encoding=encoding, lookahead=lookahead,
+                     compress=compress, max_bytes=max_bytes) as sink:
+            num = sink.write_many(item_list)
         if log:
             logger.success(f"Inserted {num} records into {filename}.")
-        executor.shutdown()
-
-
+        return num
 
     @staticmethod
     @error_rollback
@@ -94,65 +277,181 @@ class SaveToolKit:
             None
         """
         if not item_list:
-            logger.warning("item list is empty for mysql_insert, table_name: {table_name}")
+            logger.warning(f"item list is empty for mysql_insert, table_name: {table_name}")
             return
 
-        columns = item_list[0].keys()
-        placeholders = ', '.join(['%s'] * len(columns))
-        columns_joined = ', '.join(f"`{col}`" for col in columns)
-        sql = f"INSERT INTO `{table_name}` ({columns_joined}) VALUES ({placeholders})"
+        columns = list(item_list[0].keys())
+        sql = _insert_sql(table_name, columns)
         values = [tuple(item[col] for col in columns) for item in item_list]
         cursor.executemany(sql, values)
         if log:
             logger.success(f"Inserted {len(item_list)} records into {table_name}.")
 
     @staticmethod
-    @logger.catch
-    def mongodb_insert(collection: any, item_list: List[dict], log: bool = True) -> None:
+    def mysql_bulk_insert(connection: any, table_name: str, item_list: Iterable[dict], batch_size: int = 1000,
+                          columns: Union[List[str], None] = None, multi_row: bool = False, upsert: bool = False,
+                          update_columns: Union[List[str], None] = None, rollback: bool = True,
+                          placeholder: str = '%s', log: bool = True) -> List[dict]:
         """
-        Inserts a list of dictionaries into a MongoDB collection.
+        Inserts any iterable of dictionaries into a MySQL table in batches, each batch is committed on its own.
 
         Args:
-            collection (any): The MongoDB collection to insert data into.
-            item_list (List[dict]): A list of dictionaries representing the records to insert.
+            connection (any): A DB-API connection, cursor() / commit() / rollback() are used.
+            table_name (str): The name of the table to insert data into.
+            item_list (Iterable[dict]): The records to insert, generators are consumed one batch at a time.
+            batch_size (int, optional): The number of records per batch. Defaults to 1000.
+            columns (List[str], optional): The columns to insert, otherwise the keys of the first record. Missing values are NULL.
+            multi_row (bool, optional): Send one multi-row VALUES statement per batch instead of executemany. Defaults to False.
+            upsert (bool, optional): Add ON DUPLICATE KEY UPDATE for `update_columns`(all columns by default). Defaults to False.
+            rollback (bool, optional): Whether to roll back the failing batch before raising. Defaults to True.
+            placeholder (str, optional): The parameter placeholder of the driver, e.g. '?' for sqlite3. Defaults to '%s'.
             log (bool, optional): Whether to log the success message. Defaults to True.
 
         Returns:
-            None
+            List[dict]: One report per batch with batch, rows, seconds and rows_per_second.
         """
-        if not item_list:
-            logger.warning("item list is empty for mongodb_insert.")
-            return
-        result = collection.insert_many(item_list)
+        report = []
+        cursor = connection.cursor()
+        sql = None
+        for index, batch in enumerate(_batched(item_list, batch_size)):
+            if columns is None:
+                columns = list(batch[0].keys())
+            updates = (update_columns or columns) if upsert else None
+            values = [tuple(item.get(col) for col in columns) for item in batch]
+            start = time.perf_counter()
+            try:
+                if multi_row:
+                    cursor.execute(_insert_sql(table_name, columns, len(batch), placeholder, updates),
+                                   [value for row in values for value in row])
+                else:
+                    sql = sql or _insert_sql(table_name, columns, 1, placeholder, updates)
+                    cursor.executemany(sql, values)
+                connection.commit()
+            except Exception:
+                if rollback:
+                    connection.rollback()
+                logger.error(f"Error inserting batch {index} into {table_name}"
+                             f"{', rollback is initiated' if rollback else ''}")
+                raise
+            seconds = time.perf_counter() - start
+            report.append({"batch": index, "rows": len(batch), "seconds": seconds,
+                           "rows_per_second": len(batch) / seconds if seconds else float('inf')})
         if log:
-            logger.success(f"Inserted {len(result.inserted_ids)} records into MongoDB collection.")
+            total = sum(batch["rows"] for batch in report)
+            if total:
+                logger.success(f"Inserted {total} records into {table_name} in {len(report)} batches.")
+            else:
+                logger.warning(f"item list is empty for mysql_bulk_insert, table_name: {table_name}")
+        return report
 
     @staticmethod
     @logger.catch
-    def redis_insert(redis_client: any, item_list: List[dict], key_field: str, 
-                     redis_hash: bool = True, log: bool = True) -> None:
+    def mongodb_insert(collection: any, item_list: Iterable[dict], log: bool = True, batch_size: int = 1000,
+                       max_batch_bytes: int = 8 * 1024 * 1024, ordered: bool = False,
+                       upsert_key: Union[str, None] = None) -> List[dict]:
         """
-        Inserts a list of dictionaries into a Redis database.
+        Inserts dictionaries into a MongoDB collection in batches limited by document count and size.
 
         Args:
-            redis_client (any): The Redis client to use for insertion.
-            item_list (List[dict]): A list of dictionaries representing the records to insert.
-            key_field (str): The field to use as the key in Redis.
-            redis_hash (bool, optional): Whether to use Redis hash for storage. Defaults to True.
+            collection (any): The MongoDB collection to insert data into.
+            item_list (Iterable[dict]): The records to insert, generators are consumed one batch at a time.
             log (bool, optional): Whether to log the success message. Defaults to True.
+            batch_size (int, optional): The maximum number of documents per batch. Defaults to 1000.
+            max_batch_bytes (int, optional): The maximum encoded size of a batch. Defaults to 8 MB.
+            ordered (bool, optional): Whether a batch stops at its first error. Defaults to False, duplicates do not fail the batch.
+            upsert_key (str, optional): Replace the document with the same value in this field instead of inserting.
 
         Returns:
-            None
+            List[dict]: One report per batch with documents, bytes, inserted, updated, duplicates, errors and seconds.
         """
-        if not item_list:
-            logger.warning("item list is empty for redis_insert.")
-            return
-        for item in item_list:
-            key = item.get(key_field)
-            if key:
-                redis_client.hset(key, mapping=item) if redis_hash else redis_client.set(key, item)
+        document_size = _document_size()
+        report = []
+        for index, batch in enumerate(_batched_by_size(item_list, batch_size, max_batch_bytes, document_size)):
+            documents, size = batch
+            result = {"batch": index, "documents": len(documents), "bytes": size,
+                      "inserted": 0, "updated": 0, "duplicates": 0, "errors": 0}
+            start = time.perf_counter()
+            # the documents sent to the server, the others are already counted as errors
+            attempted = len(documents)
+            try:
+                if upsert_key:
+                    from pymongo import ReplaceOne
+                    requests = [ReplaceOne({upsert_key: doc[upsert_key]}, doc, upsert=True)
+                                for doc in documents if upsert_key in doc]
+                    attempted = len(requests)
+                    result["errors"] = len(documents) - attempted
+                    # bulk_write refuses an empty list of requests
+                    if requests:
+                        write = collection.bulk_write(requests, ordered=ordered)
+                        result["inserted"] = write.upserted_count
+                        result["updated"] = write.matched_count
+                else:
+                    write = collection.insert_many(documents, ordered=ordered)
+                    result["inserted"] = len(write.inserted_ids)
+            except Exception as e:
+                # BulkWriteError keeps the partial result in details
+                details = getattr(e, 'details', None)
+                if not isinstance(details, dict):
+                    logger.error(f"Error inserting batch {index} into MongoDB collection: {e}")
+                    result["errors"] += attempted
+                else:
+                    write_errors = details.get('writeErrors', [])
+                    result["duplicates"] = sum(1 for error in write_errors if error.get('code') == 11000)
+                    result["errors"] += len(write_errors) - result["duplicates"]
+                    result["inserted"] = details.get('nInserted', 0) + details.get('nUpserted', 0)
+                    result["updated"] = details.get('nMatched', 0)
+            result["seconds"] = time.perf_counter() - start
+            report.append(result)
         if log:
-            logger.success(f"Inserted {len(item_list)} records into Redis.")
+            if report:
+                totals = {field: sum(batch[field] for batch in report) for field in ("inserted", "updated", "duplicates", "errors")}
+                logger.success(f"Inserted {totals['inserted']} records into MongoDB collection in {len(report)} batches, "
+                               f"updated: {totals['updated']}, duplicates: {totals['duplicates']}, errors: {totals['errors']}.")
+            else:
+                logger.warning("item list is empty for mongodb_insert.")
+        return report
 
+    @staticmethod
+    @logger.catch
+    def redis_insert(redis_client: any, item_list: Iterable[dict], key_field: str, 
+                     redis_hash: bool = True, log: bool = True, batch_size: int = 500,
+                     ttl: Union[int, None] = None, serializer: str = 'json') -> dict:
+        """
+        Inserts dictionaries into a Redis database through a pipeline, one round-trip per batch.
 
+        Args:
+            redis_client (any): The Redis client to use for insertion.
+            item_list (Iterable[dict]): The records to insert, generators are consumed lazily.
+            key_field (str): The field to use as the key in Redis, records without it are skipped.
+            redis_hash (bool, optional): Whether to use Redis hash for storage, otherwise the serialized record is set. Defaults to True.
+            log (bool, optional): Whether to log the success message. Defaults to True.
+            batch_size (int, optional): The number of records sent per pipeline execution. Defaults to 500.
+            ttl (int, optional): The expiry of every key in seconds. Defaults to None.
+            serializer (str, optional): 'json' or 'msgpack', used for nested hash values and whole records. Defaults to 'json'.
 
+        Returns:
+            dict: The number of written and skipped records.
+        """
+        dumps = _serializer(serializer)
+        written = skipped = 0
+        pipe = redis_client.pipeline(transaction=False)
+        for batch in _batched(item_list, batch_size):
+            for item in batch:
+                key = item.get(key_field)
+                if key is None or key == '':
+                    skipped += 1
+                    continue
+                if redis_hash:
+                    pipe.hset(key, mapping={field: _redis_value(value, dumps) for field, value in item.items()})
+                    if ttl:
+                        pipe.expire(key, ttl)
+                else:
+                    pipe.set(key, dumps(item), ex=ttl)
+                written += 1
+            pipe.execute()
+        if log:
+            if written or skipped:
+                logger.success(f"Inserted {written} records into Redis, skipped {skipped} records without {key_field}.")
+            else:
+                logger.warning("item list is empty for redis_insert.")
+        return {"written": written, "skipped": skipped}
@@ -0,0 +1,239 @@
+from selenium.webdriver.common.by import By
+from typing import Tuple
+
+"""
+JavaScript shared by the actions that run inside the page, together with the translation
+from selenium locators to locators the scripts understand: ['css', selector] or ['xpath', expression].
+"""
+
+_JS_FIND_ALL = """
+function __seleniumUpFindAll(locator, root) {
+    root = root || document;
+    if (locator[0] === 'css') {
+        return Array.prototype.slice.call(root.querySelectorAll(locator[1]));
+    }
+    var snapshot = document.evaluate(locator[1], root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var found = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) {
+        found.push(snapshot.snapshotItem(i));
+    }
+    return found;
+}
+"""
+
+_JS_READ = """
+function __seleniumUpRead(el, attribute) {
+    if (!el) {
+        return null;
+    }
+    var value;
+    if (attribute === null || attribute === 'text') {
+        value = el.innerText !== undefined ? el.innerText : el.textContent;
+    } else if (attribute in el && typeof el[attribute] !== 'function' && typeof el[attribute] !== 'object') {
+        // properties first, the same as WebElement.get_attribute
+        value = el[attribute];
+    } else {
+        value = el.getAttribute(attribute);
+    }
+    return typeof value === 'string' ? value.trim() : value;
+}
+"""
+
+"""
+arguments[0]: row locator or null, arguments[1]: [[name, locator, attribute], ...]
+without a row locator, every field is matched on the whole page and the n-th matches form the n-th row
+"""
+_JS_BULK_EXTRACT = _JS_FIND_ALL + _JS_READ + """
+var rowLocator = arguments[0], fields = arguments[1];
+if (rowLocator) {
+    return __seleniumUpFindAll(rowLocator).map(function (row) {
+        var record = {};
+        fields.forEach(function (field) {
+            record[field[0]] = __seleniumUpRead(__seleniumUpFindAll(field[1], row)[0], field[2]);
+        });
+        return record;
+    });
+}
+var columns = fields.map(function (field) {
+    return __seleniumUpFindAll(field[1]).map(function (el) { return __seleniumUpRead(el, field[2]); });
+});
+var size = columns.reduce(function (m, column) { return Math.max(m, column.length); }, 0);
+var records = [];
+for (var i = 0; i < size; i++) {
+    var record = {};
+    fields.forEach(function (field, j) {
+        record[field[0]] = i < columns[j].length ? columns[j][i] : null;
+    });
+    records.push(record);
+}
+return records;
+"""
+
+
+"""
+Asynchronous, resolves with the first match of every locator as soon as all of them are present,
+or with null after timeoutMs. The locators are checked again on every DOM mutation instead of polling.
+arguments: [locator, ...], timeoutMs, callback
+"""
+_JS_WAIT_LOCATORS = _JS_FIND_ALL + """
+var locators = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var found = new Array(locators.length), pending = locators.length;
+var observer = null, timer = null, finished = false;
+function finish(result) {
+    finished = true;
+    clearTimeout(timer);
+    if (observer) {
+        observer.disconnect();
+    }
+    done(result);
+}
+function check() {
+    if (finished) {
+        return true;
+    }
+    for (var i = 0; i < locators.length; i++) {
+        if (!found[i]) {
+            var matches = __seleniumUpFindAll(locators[i]);
+            if (matches.length) {
+                found[i] = matches[0];
+                pending--;
+            }
+        }
+    }
+    if (pending === 0) {
+        finish(found);
+        return true;
+    }
+    return false;
+}
+if (!check()) {
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(function () { finish(null); }, timeoutMs);
+}
+"""
+
+"""
+Asynchronous, scrolls to the bottom and resolves once the page stays quiet(no DOM mutation and no new resource)
+for idleMs, when the item count is reached or after roundMs at most.
+arguments: item locator or null, idleMs, maxItems or null, roundMs, callback
+"""
+_JS_SCROLL_AND_SETTLE = _JS_FIND_ALL + """
+var itemLocator = arguments[0], idleMs = arguments[1], maxItems = arguments[2], roundMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var root = document.scrollingElement || document.documentElement;
+var startHeight = root.scrollHeight;
+var idleTimer = null, roundTimer = null, finished = false, observer = null, resources = null;
+function count() {
+    return itemLocator ? __seleniumUpFindAll(itemLocator).length : null;
+}
+function finish() {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    clearTimeout(idleTimer);
+    clearTimeout(roundTimer);
+    observer.disconnect();
+    if (resources) {
+        resources.disconnect();
+    }
+    done({height: root.scrollHeight, grew: root.scrollHeight > startHeight, items: count()});
+}
+function activity() {
+    clearTimeout(idleTimer);
+    if (maxItems && count() >= maxItems) {
+        finish();
+        return;
+    }
+    idleTimer = setTimeout(finish, idleMs);
+}
+observer = new MutationObserver(activity);
+observer.observe(document.body || document.documentElement, {childList: true, subtree: true});
+if (window.PerformanceObserver) {
+    try {
+        resources = new PerformanceObserver(activity);
+        resources.observe({entryTypes: ['resource']});
+    } catch (e) {
+        resources = null;
+    }
+}
+roundTimer = setTimeout(finish, roundMs);
+window.scrollTo(0, root.scrollHeight);
+activity();
+"""
+
+
+# resolves true once no resource finished loading for idleMs(and the DOM is parsed), false after timeoutMs.
+# Resource entries are only written when a request ends, a single request longer than idleMs is not seen.
+_JS_NETWORK_IDLE = """
+var idleMs = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var idleTimer = null, timeoutTimer = null, finished = false, resources = null;
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    clearTimeout(idleTimer);
+    clearTimeout(timeoutTimer);
+    if (resources) {
+        resources.disconnect();
+    }
+    document.removeEventListener('DOMContentLoaded', activity);
+    done(result);
+}
+function activity() {
+    clearTimeout(idleTimer);
+    if (document.readyState !== 'loading') {
+        idleTimer = setTimeout(function () { finish(true); }, idleMs);
+    }
+}
+if (window.PerformanceObserver) {
+    try {
+        resources = new PerformanceObserver(activity);
+        resources.observe({entryTypes: ['resource']});
+    } catch (e) {
+        resources = null;
+    }
+}
+document.addEventListener('DOMContentLoaded', activity);
+timeoutTimer = setTimeout(function () { finish(false); }, timeoutMs);
+activity();
+"""
+
+
+def _xpath_literal(text: str) -> str:
+    if '"' not in text:
+        return f'"{text}"'
+    if "'" not in text:
+        return f"'{text}'"
+    parts = text.split('"')
+    return "concat(" + ", '\"', ".join(f'"{part}"' for part in parts) + ")"
+
+
+def _css_string(text: str) -> str:
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def js_locator(by: By, value: str) -> Tuple[str, str]:
+    """
+    Translate a selenium locator into the ('css' | 'xpath', expression) pair used by the page scripts.
+    """
+    if by == By.XPATH:
+        return 'xpath', value
+    if by == By.CSS_SELECTOR:
+        return 'css', value
+    if by == By.ID:
+        return 'css', f'[id={_css_string(value)}]'
+    if by == By.NAME:
+        return 'css', f'[name={_css_string(value)}]'
+    if by == By.CLASS_NAME:
+        return 'css', f'.{value}'
+    if by == By.TAG_NAME:
+        return 'css', value
+    if by == By.LINK_TEXT:
+        return 'xpath', f'.//a[normalize-space(.)={_xpath_literal(value)}]'
+    if by == By.PARTIAL_LINK_TEXT:
+        return 'xpath', f'.//a[contains(., {_xpath_literal(value)})]'
+    raise ValueError(f"Locator type {by} is not supported in page scripts")
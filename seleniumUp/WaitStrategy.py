@@ -0,0 +1,93 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as ec
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from typing import List, Tuple
+from .main import logger
+from .Scripts import js_locator, _JS_WAIT_LOCATORS
+import time
+import weakref
+
+"""
+Wait strategies used by DriverAction to wait for elements.
+A strategy only needs `wait` and `wait_all`, any object providing them can be passed to DriverAction.
+"""
+
+
+class WebDriverWaitStrategy(object):
+    """
+    The classic client side polling, every poll is a round-trip to the driver.
+    """
+    def __init__(self, poll_frequency: float = 0.5) -> None:
+        self.poll_frequency = poll_frequency
+
+    def wait(self, driver: any, by: By, value: str, wait_time: float = 20) -> WebElement:
+        return WebDriverWait(driver, wait_time, poll_frequency=self.poll_frequency).until(
+            ec.presence_of_element_located((by, value))
+        )
+
+    def wait_all(self, driver: any, locators: List[Tuple[By, str]], wait_time: float = 20) -> List[WebElement]:
+        deadline = time.monotonic() + wait_time
+        return [self.wait(driver, by, value, max(deadline - time.monotonic(), 0)) for by, value in locators]
+
+
+class ObserverWaitStrategy(object):
+    """
+    Waits inside the page with a MutationObserver, resolves as soon as the locators match
+    and costs a single round-trip however long the wait is.
+
+    The page script can not survive a navigation, the wait then falls back to WebDriverWaitStrategy
+    for the remaining time.
+    """
+    def __init__(self, fallback: any = None) -> None:
+        self.fallback = fallback if fallback is not None else WebDriverWaitStrategy()
+        # the script timeout known for each driver, avoids a round-trip per wait
+        self._script_timeouts = weakref.WeakKeyDictionary()
+
+    def _ensure_script_timeout(self, driver: any, wait_time: float) -> None:
+        # only ever raises the timeout, a longer one set elsewhere(None is no timeout) is kept
+        required = wait_time + 5
+        current = self._script_timeouts.get(driver)
+        if current is None:
+            current = driver.timeouts.script
+            current = float('inf') if current is None else current
+        if current < required:
+            driver.set_script_timeout(required)
+            current = required
+        self._script_timeouts[driver] = current
+
+    def wait(self, driver: any, by: By, value: str, wait_time: float = 20) -> WebElement:
+        return self.wait_all(driver, [(by, value)], wait_time)[0]
+
+    def wait_all(self, driver: any, locators: List[Tuple[By, str]], wait_time: float = 20) -> List[WebElement]:
+        start = time.monotonic()
+        try:
+            self._ensure_script_timeout(driver, wait_time)
+            elements = driver.execute_async_script(_JS_WAIT_LOCATORS,
+                                                   [list(js_locator(by, value)) for by, value in locators],
+                                                   int(wait_time * 1000))
+        except WebDriverException as e:
+            remaining = max(wait_time - (time.monotonic() - start), 0)
+            logger.debug(f"Observer wait failed, falling back for {remaining:.1f}s: {e.msg}")
+            return self.fallback.wait_all(driver, locators, remaining)
+        if elements is None:
+            raise TimeoutException(f"Elements {[value for _, value in locators]} not present after {wait_time}s")
+        return elements
+
+
+_WAIT_STRATEGIES = {
+    'webdriver': WebDriverWaitStrategy,
+    'observer': ObserverWaitStrategy,
+}
+
+
+def get_wait_strategy(strategy: any = 'webdriver') -> any:
+    """
+    Resolve a strategy name('webdriver' or 'observer') into an instance, instances are returned as they are.
+    """
+    if isinstance(strategy, str):
+        if strategy not in _WAIT_STRATEGIES:
+            raise ValueError(f"Unknown wait strategy {strategy}, choose from {list(_WAIT_STRATEGIES)}")
+        return _WAIT_STRATEGIES[strategy]()
+    return strategy
@@ -1,13 +1,115 @@
-from .main import logger
-from .Connection import DriverInit
+from .main import logger, init_logger
+from .Connection import DriverInit, DriverPool
 from .DriverAction import DriverAction, By
+from .Metrics import ActionMetrics
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union, List
+import inspect
+import threading
+import types
+import queue
+import time
+
+_SAVER_STOP = object()
+
+
+def _uncaught(method: callable) -> callable:
+    """
+    The bound method without its outer `@logger.catch` layers, so the exceptions of a flow reach the caller.
+    """
+    func = getattr(method, "__func__", method)
+    while getattr(getattr(func, "__code__", None), "co_name", None) == "catch_wrapper" and hasattr(func, "__wrapped__"):
+        func = func.__wrapped__
+    owner = getattr(method, "__self__", None)
+    return types.MethodType(func, owner) if owner is not None else func
+
+
+class BackgroundSaver(object):
+    """
+    Runs a save function on a background thread fed by a bounded queue, so the browser can go on
+    while the previous result is written. A full queue blocks `submit`(backpressure),
+    `close` waits until everything submitted is saved.
+
+    Errors raised by the save function are logged and kept in `errors` instead of stopping the thread,
+    so are the errors a `@logger.catch` save function(the Workflow convention) swallows on the saver thread.
+    """
+    def __init__(self, save_func: callable, queue_size: int = 100, name: str = "background-saver") -> None:
+        self._save_func = save_func
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._caught = None
+        self.errors: List[str] = []
+        self.saved = 0
+        self._thread = threading.Thread(target=self._drain, name=name, daemon=True)
+        self._handler_id = logger.add(self._record_caught, level="ERROR", format="{message}",
+                                      filter=lambda record: record["exception"] is not None
+                                      and record["thread"].id == self._thread.ident)
+        self._thread.start()
+
+    def _record_caught(self, message: any) -> None:
+        exception = message.record["exception"]
+        self._caught = f"{exception.type.__name__}: {exception.value}"
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _SAVER_STOP:
+                break
+            self._caught = None
+            try:
+                self._save_func(item)
+            except Exception as e:
+                logger.error(f"Background save failed: {e}")
+                self.errors.append(f"{type(e).__name__}: {e}")
+                continue
+            if self._caught is not None:
+                self.errors.append(self._caught)
+            else:
+                self.saved += 1
+
+    def submit(self, item: any, timeout: Union[float, None] = None) -> None:
+        if self._closed:
+            raise RuntimeError("BackgroundSaver is closed")
+        self._queue.put(item, timeout=timeout)
+
+    def close(self, timeout: Union[float, None] = None) -> List[str]:
+        """
+        Flush the queue, stop the thread and return the save errors.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_SAVER_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"BackgroundSaver did not finish within {timeout} seconds")
+        elif self._handler_id is not None:
+            logger.remove(self._handler_id)
+            self._handler_id = None
+        return self.errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
 
 """
 Notice: This class is working as an experimental frame, feel free to ignore it.
 """
 class Workflow(ABC):
+    # the number of items per save_flow call when the flows are generators
+    save_batch_size: int = 100
+    # an ActionMetrics shared by every DriverAction of the workflow, None disables the instrumentation
+    metrics: Union[ActionMetrics, None] = None
+    # 'normal', 'eager' or 'none', see DriverInit, the drivers of the workflow are started with it
+    page_load_strategy: str = 'normal'
+    # record the network of Chrome drivers for NetworkCapture, see DriverInit
+    network_capture: bool = False
+    # the readiness conditions `navigate` waits for by default, see DriverAction.wait_ready
+    ready: any = None
+
     def __init__(self, urls: Union[str, List[str]], by:By = By.XPATH, contact:Union[dict, None] = None, 
                  email_level = "CRITICAL",*driver_params:any) -> None:
         """
@@ -21,14 +123,83 @@ class Workflow(ABC):
         - email_level (str, optional): The minimum severity level for sending email notifications. Defaults to "CRITICAL".
         - *driver_params:any: Additional parameters to be passed to DriverInit class.
 
+        The flows can also be generators: `main_driver_flow` may yield pages or records, `parse_flow` is then called
+        per yielded page(or, as a generator function, receives the whole stream and yields items) and `save_flow`
+        receives lists of at most `save_batch_size` items while the crawl goes on.
+
+        The driver is started on first access of `self.driver` or `self.driver_action`, 
+        `run_concurrent` gives every worker its own driver instead.
+
         Returns:
         - None
         """
         super().__init__()
-        self.driver = DriverInit(*driver_params)
+        init_logger()
         self.by = by
-        self.driver_action = DriverAction(self.driver, self.by, contact, email_level)
+        self.contact = contact
+        self.email_level = email_level
         self.urls = urls
+        self._driver_params = driver_params
+        self._driver = None
+        self._driver_action = None
+        self._saver = None
+        # worker threads of run_concurrent keep their own driver and DriverAction here
+        self._local = threading.local()
+
+    @property
+    def driver(self) -> any:
+        driver = getattr(self._local, 'driver', None)
+        if driver is not None:
+            return driver
+        if self._driver is None:
+            self._driver = DriverInit(**self._driver_kwargs())
+        return self._driver
+
+    def _driver_kwargs(self) -> dict:
+        """
+        The DriverInit arguments, `*driver_params` are matched to its parameters by position and the
+        class attributes(page_load_strategy, network_capture) fill the parameters they leave out.
+        """
+        names = list(inspect.signature(DriverInit.__init__).parameters)[1:]
+        if len(self._driver_params) > len(names):
+            raise TypeError(f"DriverInit takes at most {len(names)} driver params, got {len(self._driver_params)}")
+        kwargs = {'page_load_strategy': self.page_load_strategy, 'network_capture': self.network_capture}
+        kwargs.update(zip(names, self._driver_params))
+        return kwargs
+
+    @driver.setter
+    def driver(self, driver: any) -> None:
+        self._driver = driver
+        self._driver_action = None
+
+    @property
+    def driver_action(self) -> DriverAction:
+        driver_action = getattr(self._local, 'driver_action', None)
+        if driver_action is not None:
+            return driver_action
+        if self._driver_action is None:
+            self._driver_action = DriverAction(self.driver, self.by, self.contact, self.email_level,
+                                               metrics=self.metrics)
+        return self._driver_action
+
+    @driver_action.setter
+    def driver_action(self, driver_action: DriverAction) -> None:
+        self._driver_action = driver_action
+
+    def navigate(self, url: str, ready: any = None, wait_time: float = 20) -> bool:
+        """
+        Load a url with the current DriverAction and wait for `ready`(defaults to `self.ready`),
+        made for `main_driver_flow` with the 'eager' or 'none' page load strategy.
+
+        Parameters:
+        - url (str): The url to load.
+        - ready (any, optional): The readiness conditions, see DriverAction.wait_ready. Defaults to None(`self.ready`).
+        - wait_time (float, optional): The time allowed for the conditions. Defaults to 20.
+
+        Returns:
+        - bool: True once the page is ready, None if the conditions failed(the error is logged).
+        """
+        return self.driver_action.navigate(url, ready=self.ready if ready is None else ready, wait_time=wait_time)
 
     @logger.catch
     @abstractmethod
@@ -77,11 +248,188 @@ class Workflow(ABC):
         """
         logger.success(f"result successfully saved")
 
+    def _save(self, parse_result: any, save_flow: Union[callable, None] = None) -> None:
+        if self._saver is not None:
+            self._saver.submit(parse_result)
+        else:
+            (save_flow or self.save_flow)(parse_result)
+
+    def _save_stream(self, items: any, save_flow: Union[callable, None] = None) -> int:
+        """
+        Save a stream of parsed items in micro-batches, the last partial batch is saved even if the stream fails.
+        """
+        count = 0
+        batch = []
+        try:
+            for item in items:
+                batch.append(item)
+                if len(batch) >= self.save_batch_size:
+                    # the batch is taken first, a failing save is not retried by the finally below
+                    pending, batch = batch, []
+                    self._save(pending, save_flow)
+                    count += len(pending)
+        finally:
+            if batch:
+                self._save(batch, save_flow)
+                count += len(batch)
+        return count
+
+    def _parse_and_save(self, output: any, parse_flow: Union[callable, None] = None,
+                        save_flow: Union[callable, None] = None) -> any:
+        """
+        Returns the parse result, or the number of saved items for generator flows.
+        """
+        parse_flow = parse_flow or self.parse_flow
+        if inspect.isgenerator(output):
+            if inspect.isgeneratorfunction(parse_flow):
+                return self._save_stream(parse_flow(output), save_flow)
+            return self._save_stream((parse_flow(page) for page in output), save_flow)
+        parse_result = parse_flow(output)
+        if inspect.isgenerator(parse_result):
+            return self._save_stream(parse_result, save_flow)
+        self._save(parse_result, save_flow)
+        return parse_result
+
+    def _start_saver(self, background_save: bool, save_queue_size: int) -> None:
+        self._saver = BackgroundSaver(self.save_flow, save_queue_size) if background_save else None
+
+    def _stop_saver(self) -> List[str]:
+        saver, self._saver = self._saver, None
+        return saver.close() if saver is not None else []
+
     @logger.catch
-    def run(self):
+    def run(self, background_save: bool = False, save_queue_size: int = 100) -> List[str]:
         """
         The main executing function of the crawler.
+
+        Parameters:
+        - background_save (bool, optional): Hand the results of parse_flow to a BackgroundSaver thread, 
+          so save_flow does not block the browser. Defaults to False.
+        - save_queue_size (int, optional): The bound of the save queue. Defaults to 100.
+
+        Returns:
+        - List[str]: The errors raised by save_flow in the background.
+        """
+        self._start_saver(background_save, save_queue_size)
+        try:
+            self._parse_and_save(self.main_driver_flow())
+        finally:
+            save_errors = self._stop_saver()
+        return save_errors
+
+    def _url_list(self) -> List[str]:
+        return [self.urls] if isinstance(self.urls, str) else list(self.urls)
+
+    def run_url(self, url: str, raise_errors: bool = False) -> any:
+        """
+        Run the three flows for a single url, used by `run_concurrent`.
+        `main_driver_flow` receives the url as its first argument.
+        With `raise_errors` the `@logger.catch` layers of the flows are skipped, so their exceptions reach the caller.
+        Returns the parse result, or the number of saved items for generator flows.
+        """
+        if not raise_errors:
+            return self._parse_and_save(self.main_driver_flow(url))
+        return self._parse_and_save(_uncaught(self.main_driver_flow)(url), _uncaught(self.parse_flow),
+                                    _uncaught(self.save_flow))
+
+    def run_concurrent(self, workers: int = 4, pool: Union[DriverPool, None] = None,
+                       reset_between: bool = False, log: bool = True, background_save: bool = False,
+                       save_queue_size: int = 100) -> dict:
         """
-        output = self.main_driver_flow()
-        parse_result = self.parse_flow(output)
-        self.save_flow(parse_result)
+        Run the workflow for every url in `self.urls` with several workers.
+
+        Every worker leases its own driver and DriverAction(reachable via `self.driver` and
+        `self.driver_action` inside the flows) and pulls urls from a shared queue.
+        A failed url is recorded and does not stop the others. The flows run without their `@logger.catch` layers
+        (see `run_url`), so a url fails exactly when one of its flows raises, whatever the flows log or return.
+        Duplicate urls are run once, `total` counts the distinct urls and equals `succeeded + failed`.
+
+        Parameters:
+        - workers (int, optional): The number of concurrent workers. Defaults to 4.
+        - pool (Union[DriverPool, None], optional): An existing pool to lease drivers from, 
+          otherwise a pool is created with `*driver_params` and closed afterwards.
+        - reset_between (bool, optional): Whether to reset the driver between two urls of the same worker. Defaults to False.
+        - log (bool, optional): Whether to log the summary. Defaults to True.
+        - background_save (bool, optional): Save through a BackgroundSaver thread shared by the workers. Defaults to False.
+        - save_queue_size (int, optional): The bound of the save queue. Defaults to 100.
+
+        Returns:
+        - dict: The summary with keys total, succeeded, failed, elapsed, results(url -> parse result), 
+          errors(url -> message) and save_errors(errors raised by save_flow in the background).
+        """
+        given = self._url_list()
+        urls = list(dict.fromkeys(given))
+        if len(urls) < len(given):
+            logger.warning(f"{len(given) - len(urls)} duplicate urls skipped")
+        start = time.perf_counter()
+        results, errors = {}, {}
+        if not urls:
+            return {"total": 0, "succeeded": 0, "failed": 0, "elapsed": time.perf_counter() - start,
+                    "results": results, "errors": errors, "save_errors": []}
+        url_queue = queue.Queue()
+        for url in urls:
+            url_queue.put(url)
+        result_lock = threading.Lock()
+
+        own_pool = pool is None
+        workers = max(1, min(workers, len(urls)))
+        if own_pool:
+            pool = DriverPool(workers, **self._driver_kwargs())
+        workers = min(workers, len(pool))
+
+        def _worker(worker_id: int) -> None:
+            # every record logged by the worker(DriverAction included) carries its id and current url
+            with logger.contextualize(worker=worker_id), pool.lease() as driver:
+                self._local.driver = driver
+                self._local.driver_action = DriverAction(driver, self.by, self.contact, self.email_level,
+                                                         metrics=self.metrics)
+                try:
+                    first = True
+                    while True:
+                        try:
+                            url = url_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        reset, first = reset_between and not first, False
+                        try:
+                            with logger.contextualize(url=url):
+                                if reset:
+                                    pool.reset_driver(driver)
+                                result = self.run_url(url, raise_errors=True)
+                            with result_lock:
+                                results[url] = result
+                        except Exception as e:
+                            logger.error(f"Worker {worker_id} failed on {url}: {e}")
+                            with result_lock:
+                                errors[url] = f"{type(e).__name__}: {e}"
+                finally:
+                    self._local.driver = None
+                    self._local.driver_action = None
+
+        self._start_saver(background_save, save_queue_size)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(_worker, i) for i in range(workers)]:
+                    future.result()
+        finally:
+            save_errors = self._stop_saver()
+            if own_pool:
+                pool.close()
+
+        summary = {
+            "total": len(urls),
+            "succeeded": len(results),
+            "failed": len(errors),
+            "elapsed": time.perf_counter() - start,
+            "results": {url: results[url] for url in urls if url in results},
+            "errors": {url: errors[url] for url in urls if url in errors},
+            "save_errors": save_errors,
+        }
+        if log:
+            logger.success(f"Concurrent run finished: {summary['succeeded']}/{summary['total']} succeeded, "
+                           f"{summary['failed']} failed in {summary['elapsed']:.2f}s")
+            for url, message in summary["errors"].items():
+                logger.warning(f"Failed url {url}: {message}")
+            if save_errors:
+                logger.warning(f"{len(save_errors)} results failed to save in the background")
+        return summary
@@ -1,14 +1,80 @@
-from .Connection import DriverInit
-from .ParseToolkit import ParseToolKit
-from .SaveToolkit import SaveToolKit
-from .DriverAction import DriverAction
-from .Workflow import Workflow
-from .Log import CustomLog
+import importlib
+import sys
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Connection import DriverInit, DriverPool
+    from .DriverStore import DriverStore
+    from .ParseToolkit import ParseToolKit
+    from .SaveToolkit import SaveToolKit
+    from .DriverAction import DriverAction
+    from .WaitStrategy import WebDriverWaitStrategy, ObserverWaitStrategy
+    from .Workflow import Workflow, BackgroundSaver
+    from .Metrics import ActionMetrics
+    from .NetworkCapture import NetworkCapture
+    from .Log import CustomLog
+    from .main import init_logger
+
+"""
+The submodules are imported on first access of their names, so a job using ParseToolKit or SaveToolKit
+never imports selenium.
+"""
+_LAZY_ATTRIBUTES = {
+    'DriverInit': 'Connection',
+    'DriverPool': 'Connection',
+    'DriverStore': 'DriverStore',
+    'ParseToolKit': 'ParseToolkit',
+    'SaveToolKit': 'SaveToolkit',
+    'DriverAction': 'DriverAction',
+    'WebDriverWaitStrategy': 'WaitStrategy',
+    'ObserverWaitStrategy': 'WaitStrategy',
+    'Workflow': 'Workflow',
+    'BackgroundSaver': 'Workflow',
+    'ActionMetrics': 'Metrics',
+    'NetworkCapture': 'NetworkCapture',
+    'CustomLog': 'Log',
+    'init_logger': 'main',
+}
+
+
+def __getattr__(name: str) -> any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+    value = globals()[name] = getattr(module, name)
+    return value
+
+
+class _Package(ModuleType):
+    """
+    The import system binds every loaded submodule on the package once it has run. DriverAction, Workflow and
+    NetworkCapture share their names with the classes they export, so their class is bound instead.
+    """
+    def __setattr__(self, name: str, value: any) -> None:
+        if (isinstance(value, ModuleType) and _LAZY_ATTRIBUTES.get(name) == name
+                and value.__name__ == f"{__name__}.{name}"):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
 
 
 __all__ = ['DriverInit',
+           'DriverPool',
+           'DriverStore',
            'ParseToolKit',
            'SaveToolKit',
            'DriverAction',
+           'WebDriverWaitStrategy',
+           'ObserverWaitStrategy',
            'Workflow',
-           'CustomLog']
\ No newline at end of file
+           'BackgroundSaver',
+           'ActionMetrics',
+           'NetworkCapture',
+           'CustomLog',
+           'init_logger']
+
+sys.modules[__name__].__class__ = _Package
@@ -1,8 +1,6 @@
-import os
-from .Log import CustomLog
-
-current_directory = os.path.dirname(os.path.abspath(__file__))
-os.chdir(current_directory)
+from loguru import logger
+from threading import Lock
+from typing import Union
 
 _CONTACT_PARAM = {}
 """
@@ -12,13 +10,27 @@ _CONTACT_PARAM = {}
         "to": "test@gmail.com"
     }
 """
-logger = CustomLog(contact_param=_CONTACT_PARAM)
-
-
-
-
-    
-
-
-
-
+_INIT_LOCK = Lock()
+_initialized = False
+
+
+def init_logger(contact_param: Union[dict, None] = None, **log_params: any) -> any:
+    """
+    Add the CustomLog sinks(dated log file, stdout and email) to the shared logger, only the first call has an effect.
+    Importing the package does not touch the logger, DriverInit, DriverPool and Workflow call this on creation,
+    jobs using only the toolkits can call it themselves.
+
+    Parameters:
+    - contact_param (Union[dict, None], optional): The email contact, defaults to `_CONTACT_PARAM`.
+    - **log_params (any): Passed to CustomLog, e.g. filepath or level.
+
+    Returns:
+    - any: The logger.
+    """
+    global _initialized
+    with _INIT_LOCK:
+        if not _initialized:
+            from .Log import CustomLog
+            CustomLog(contact_param=_CONTACT_PARAM if contact_param is None else contact_param, **log_params)
+            _initialized = True
+    return logger
@@ -1,3 +1,18 @@
+from os import path
+
+# relative paths are resolved against the package directory, not the working directory
+_PACKAGE_DIRECTORY = path.dirname(path.abspath(__file__))
+
 CHROMIUM = "../resources/chrome/"
 FIREFOX = "../resources/firefox/"
+STEALTH_JS = "../resources/stealth.min.js"
+
+# the shared driver store(see DriverStore) used when CHROMIUM/FIREFOX hold no driver for this platform,
+# None is $XDG_CACHE_HOME/seleniumUp/drivers
+DRIVER_CACHE = None
+# pin a driver version per browser, e.g. {"Chrome": "130"}, the newest stored driver is used otherwise
+DRIVER_VERSIONS = {}
+
 
+def package_path(filepath: str) -> str:
+    return path.normpath(path.join(_PACKAGE_DIRECTORY, filepath))
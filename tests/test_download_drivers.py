@@ -0,0 +1,122 @@
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from seleniumUp.DownloadDrivers import _ConcatenatedReader, download_files, download_part, extract_parts
+
+PAYLOAD = os.urandom(300 * 1024)
+SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    ranges = True
+    requests = []
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        RangeHandler.requests.append(header)
+        start = int(header[len("bytes="):-1]) if header and self.ranges else 0
+        if start >= len(PAYLOAD):
+            self.send_response(416)
+            self.end_headers()
+            return
+        body = PAYLOAD[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RangeHandler.ranges = True
+    RangeHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_part_resumes_a_partial_file(server, tmp_path):
+    file_name = str(tmp_path / "driver.zip.001")
+    with open(file_name + ".part", "wb") as f:
+        f.write(PAYLOAD[:1000])
+    assert download_part(f"{server}/driver.zip.001", SHA256.upper(), file_name) is True
+    assert RangeHandler.requests == ["bytes=1000-"]
+    with open(file_name, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(file_name + ".part")
+
+
+def test_download_part_restarts_when_the_range_is_ignored(server, tmp_path):
+    RangeHandler.ranges = False
+    file_name = str(tmp_path / "driver.zip.001")
+    with open(file_name + ".part", "wb") as f:
+        f.write(b"stale bytes")
+    assert download_part(f"{server}/driver.zip.001", SHA256, file_name) is True
+    with open(file_name, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_download_part_accepts_a_complete_partial_file(server, tmp_path):
+    file_name = str(tmp_path / "driver.zip.001")
+    with open(file_name + ".part", "wb") as f:
+        f.write(PAYLOAD)
+    assert download_part(f"{server}/driver.zip.001", SHA256, file_name) is True
+    assert RangeHandler.requests == [f"bytes={len(PAYLOAD)}-"]
+
+
+def test_download_part_removes_a_mismatching_part(server, tmp_path):
+    file_name = str(tmp_path / "driver.zip.001")
+    assert download_part(f"{server}/driver.zip.001", "0" * 64, file_name) is False
+    assert not os.path.exists(file_name) and not os.path.exists(file_name + ".part")
+
+
+def test_download_files_keeps_the_order_of_the_parts(server, tmp_path):
+    files_info = [(f"{server}/part{i}", SHA256) for i in range(4)]
+    paths = download_files(files_info, str(tmp_path), retries=1, delay=0, max_workers=4)
+    assert [os.path.basename(path) for path in paths] == ["part0", "part1", "part2", "part3"]
+
+
+def _split_zip(tmp_path, files, parts):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    data = buffer.getvalue()
+    size = -(-len(data) // parts)
+    paths = []
+    for index in range(parts):
+        path = tmp_path / f"driver.zip.{index + 1:03d}"
+        path.write_bytes(data[index * size:(index + 1) * size])
+        paths.append(str(path))
+    return data, paths
+
+
+def test_concatenated_reader_reads_and_seeks_across_parts(tmp_path):
+    data, paths = _split_zip(tmp_path, {"chromedriver": os.urandom(50000)}, 3)
+    with _ConcatenatedReader(paths) as reader:
+        assert reader.read() == data
+        boundary = os.path.getsize(paths[0])
+        reader.seek(boundary - 5)
+        assert reader.read(10) == data[boundary - 5:boundary + 5]
+        reader.seek(-3, io.SEEK_END)
+        assert reader.read() == data[-3:]
+        assert reader.read() == b""
+
+
+def test_extract_parts_without_combining_them(tmp_path):
+    content = os.urandom(80000)
+    _, paths = _split_zip(tmp_path, {"chromedriver": content, "LICENSE": b"license"}, 4)
+    target = tmp_path / "out"
+    extract_parts(paths, str(target))
+    assert (target / "chromedriver").read_bytes() == content
+    assert (target / "LICENSE").read_bytes() == b"license"
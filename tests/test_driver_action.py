@@ -0,0 +1,91 @@
+import time
+import pytest
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from seleniumUp import DriverAction
+
+
+class FakeDriver(object):
+    capabilities = {'browserName': 'chrome', 'pageLoadStrategy': 'eager'}
+    current_url = "about:blank"
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.mark.parametrize("script", ["document.querySelector('.returns')", "window.returnUrl", "  returnValue > 1"])
+def test_script_expressions_mentioning_return_are_wrapped(script):
+    driver = FakeDriver([True])
+    assert DriverAction(driver)._wait_ready({'script': script}, wait_time=1) is True
+    assert driver.scripts == [f"return ({script});"]
+
+
+def test_function_bodies_are_run_as_given():
+    driver = FakeDriver([True])
+    script = "  return document.readyState === 'complete';"
+    DriverAction(driver)._wait_ready({'script': script}, wait_time=1)
+    assert driver.scripts == [script]
+
+
+def test_script_errors_are_raised_at_once():
+    driver = FakeDriver([JavascriptException("javascript error: Unexpected token ')'")])
+    start = time.monotonic()
+    with pytest.raises(JavascriptException):
+        DriverAction(driver)._wait_ready({'script': "document.querySelector('.a'))"}, wait_time=5)
+    assert time.monotonic() - start < 1
+
+
+def test_navigation_errors_only_mean_not_yet():
+    driver = FakeDriver([JavascriptException("javascript error: Execution context was destroyed."), False, True])
+    assert DriverAction(driver)._wait_ready({'script': "window.loaded"}, wait_time=5) is True
+    assert len(driver.scripts) == 3
+
+
+def test_a_condition_that_never_holds_times_out():
+    driver = FakeDriver([False])
+    with pytest.raises(TimeoutException):
+        DriverAction(driver)._wait_ready({'script': "window.loaded"}, wait_time=0.3)
+
+
+def test_bulk_extract_without_fields_returns_no_records():
+    driver = FakeDriver([[{'title': 'never read'}]])
+    assert DriverAction(driver).bulk_extract({}, wait_time=0) == []
+    assert driver.scripts == []
+
+
+class FakeScrollDriver(FakeDriver):
+    class timeouts(object):
+        script = 30
+
+    def __init__(self, states):
+        super().__init__([None])
+        self.states = list(states)
+        self.script_timeouts = []
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        return self.states.pop(0)
+
+
+def test_scroll_infinite_stops_at_max_items():
+    driver = FakeScrollDriver([{'grew': True, 'height': 900, 'items': 20},
+                               {'grew': True, 'height': 1800, 'items': 40}])
+    result = DriverAction(driver).scroll_infinite('.item', max_items=40, log=False)
+    assert result == {'height': 1800, 'items': 40, 'rounds': 2, 'reason': 'items'}
+    assert driver.script_timeouts[-1] == 30
+
+
+def test_scroll_infinite_max_items_needs_an_item_locator():
+    driver = FakeScrollDriver([{'grew': True, 'height': 900, 'items': None}])
+    with pytest.raises(ValueError):
+        DriverAction(driver).scroll_infinite(max_items=40, log=False)
+    assert driver.states and driver.script_timeouts == []
@@ -0,0 +1,146 @@
+import threading
+import pytest
+from seleniumUp import Connection
+from seleniumUp.Connection import DriverPool
+
+
+class FakeSwitch(object):
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+    def default_content(self):
+        pass
+
+
+class FakeDriver(object):
+    def __init__(self, browser='Chrome', history=None, fail_reset=False):
+        self.browser = browser
+        self.handles = ['home']
+        self.current = 'home'
+        self.current_window_handle = 'home'
+        self.switch_to = FakeSwitch(self)
+        self.history = history or {}
+        self.fail_reset = fail_reset
+        self.cdp = []
+        self.scripts = []
+        self.visited = []
+        self.quit_called = False
+
+    @property
+    def window_handles(self):
+        if self.fail_reset:
+            raise RuntimeError("invalid session id")
+        return list(self.handles)
+
+    def close(self):
+        self.handles.remove(self.current)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+        if command == 'Page.getNavigationHistory':
+            return {'entries': [{'url': url} for url in self.history.get(self.current, [])]}
+        return {}
+
+    def execute_script(self, script):
+        self.scripts.append(self.current)
+
+    def delete_all_cookies(self):
+        self.cdp.append(('delete_all_cookies', {}))
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    created = []
+    plan = []
+
+    def make(*args, **kwargs):
+        driver = plan.pop(0)() if plan else FakeDriver(args[0] if args else 'Chrome')
+        created.append(driver)
+        return driver
+
+    monkeypatch.setattr(Connection, 'DriverInit', make)
+    return created, plan
+
+
+def test_lease_returns_the_driver_to_the_pool(factory):
+    created, _ = factory
+    with DriverPool(2) as pool:
+        with pool.lease() as first:
+            with pool.lease() as second:
+                assert {first, second} == set(created)
+                with pytest.raises(TimeoutError):
+                    pool.acquire(timeout=0.05)
+        leased = pool.acquire(timeout=0.05)
+        assert leased in created
+    # close quits the idle drivers, a leased one is quit when it comes back
+    assert [driver.quit_called for driver in created] == [driver is not leased for driver in created]
+    pool.release(leased)
+    assert leased.quit_called
+
+
+def test_chrome_reset_clears_every_visited_origin(factory):
+    created, _ = factory
+    pool = DriverPool(1)
+    driver = pool.acquire()
+    driver.handles.append('popup')
+    driver.history = {'home': ['https://shop.test/a', 'https://shop.test/b', 'about:blank'],
+                      'popup': ['https://login.test/auth?x=1']}
+    pool.release(driver)
+    cleared = [params['origin'] for command, params in driver.cdp if command == 'Storage.clearDataForOrigin']
+    assert cleared == ['https://login.test', 'https://shop.test']
+    assert ('Network.clearBrowserCache', {}) in driver.cdp
+    assert driver.handles == ['home'] and driver.visited[-1] == 'about:blank'
+
+
+def test_firefox_reset_clears_storage_in_every_window(factory):
+    pool = DriverPool(1, 'Firefox')
+    driver = pool.acquire()
+    driver.handles.append('popup')
+    pool.release(driver)
+    assert driver.scripts == ['popup', 'home']
+    assert ('delete_all_cookies', {}) in driver.cdp
+
+
+def test_a_driver_failing_to_reset_is_replaced(factory):
+    created, plan = factory
+    pool = DriverPool(1)
+    broken = pool.acquire()
+    broken.fail_reset = True
+    pool.release(broken)
+    assert broken.quit_called
+    replacement = pool.acquire(timeout=0.05)
+    assert replacement is created[-1] and replacement is not broken
+    assert len(pool) == 1
+
+
+def test_acquire_raises_once_every_driver_is_lost(factory):
+    _, plan = factory
+    pool = DriverPool(1)
+    driver = pool.acquire()
+    waiter_errors = []
+
+    def waiter():
+        try:
+            pool.acquire(timeout=5)
+        except RuntimeError as e:
+            waiter_errors.append(e)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    driver.fail_reset = True
+    plan.append(lambda: None)
+    pool.release(driver)
+    thread.join(5)
+    assert len(waiter_errors) == 1
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0.05)
+    assert len(pool) == 0
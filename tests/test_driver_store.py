@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from seleniumUp.DriverStore import DriverStore
+
+
+def _binary(tmp_path, content=b"#!/bin/sh\necho driver\n"):
+    path = tmp_path / "chromedriver-src"
+    path.write_bytes(content)
+    return str(path)
+
+
+def _add(root, source):
+    return DriverStore(root).add("Chrome", "130.0.6723.69", source, platform_key="linux64")
+
+
+def test_add_and_resolve_by_version_prefix(tmp_path):
+    store = DriverStore(str(tmp_path / "store"))
+    stored = store.add("Chrome", "130.0.6723.69", _binary(tmp_path), platform_key="linux64")
+    assert os.path.basename(stored) == "chromedriver"
+    assert store.resolve("Chrome", "130", "linux64") == stored
+    assert store.resolve("Chrome", "13", "linux64") is None
+    assert store.resolve("Firefox", platform_key="linux64") is None
+
+
+def test_lock_files_live_outside_the_entry_directories(tmp_path):
+    root = str(tmp_path / "store")
+    store = DriverStore(root)
+    stored = store.add("Chrome", "130.0.6723.69", _binary(tmp_path), platform_key="linux64")
+    # damage the binary, the next add replaces the whole entry directory
+    with open(stored, "ab") as f:
+        f.write(b"garbage")
+    assert store.resolve("Chrome", platform_key="linux64") is None
+    assert store.add("Chrome", "130.0.6723.69", _binary(tmp_path), platform_key="linux64") == stored
+    # a touched binary is hashed again and its manifest updated under the entry lock
+    os.utime(stored, ns=(1, 1))
+    assert store.resolve("Chrome", platform_key="linux64") == stored
+    entry_dir = os.path.dirname(stored)
+    assert sorted(os.listdir(entry_dir)) == ["chromedriver", "manifest.json"]
+    assert not any(name.endswith(".lock") for name in os.listdir(os.path.dirname(entry_dir)))
+    assert os.path.isfile(os.path.join(root, "locks", "chrome", "linux64", f"{os.path.basename(entry_dir)}.lock"))
+
+
+def test_parallel_processes_install_one_entry(tmp_path):
+    root = str(tmp_path / "store")
+    source = _binary(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        paths = list(executor.map(_add, [root] * 8, [source] * 8))
+    assert len(set(paths)) == 1
+    assert len(DriverStore(root).entries("Chrome", "linux64")) == 1
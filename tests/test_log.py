@@ -0,0 +1,100 @@
+import sys
+import threading
+from types import ModuleType
+import pytest
+from seleniumUp.Log import EmailAlertSink
+
+
+class FakeSMTP(object):
+    sent = []
+    fail = False
+
+    def __init__(self, user=None, password=None, **options):
+        self.options = options
+
+    def send(self, to, subject, contents):
+        if FakeSMTP.fail:
+            raise ConnectionRefusedError("smtp down")
+        FakeSMTP.sent.append({"to": to, "subject": subject, "contents": contents})
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    module = ModuleType("yagmail")
+    module.SMTP = FakeSMTP
+    monkeypatch.setitem(sys.modules, "yagmail", module)
+    FakeSMTP.sent = []
+    FakeSMTP.fail = False
+    created = []
+
+    def make(**kwargs):
+        param = {"username": "bot@example.com", "password": "secret", "to": "ops@example.com", "host": "localhost"}
+        alert_sink = EmailAlertSink(param, interval=3600, **kwargs)
+        created.append(alert_sink)
+        return alert_sink
+
+    yield make
+    for alert_sink in created:
+        alert_sink.close()
+
+
+def test_duplicate_records_are_collapsed_into_one_digest(sink):
+    alert_sink = sink()
+    for _ in range(3):
+        alert_sink("driver crashed")
+    alert_sink("disk full")
+    assert alert_sink.flush() is True
+    assert len(FakeSMTP.sent) == 1
+    assert FakeSMTP.sent[0]["subject"] == "Log CRITICAL Notification (4 records)"
+    assert FakeSMTP.sent[0]["contents"] == "[x3] driver crashed\ndisk full"
+    assert alert_sink.flush() is False
+
+
+def test_pending_buffer_is_bounded(sink):
+    alert_sink = sink(max_pending=2)
+    for i in range(5):
+        alert_sink(f"error {i}")
+    alert_sink.flush()
+    assert FakeSMTP.sent[0]["contents"].endswith("3 more records were dropped")
+    assert "(5 records)" in FakeSMTP.sent[0]["subject"]
+
+
+def test_records_are_kept_while_smtp_is_down(sink):
+    alert_sink = sink()
+    alert_sink("driver crashed")
+    FakeSMTP.fail = True
+    assert alert_sink.flush() is False
+    FakeSMTP.fail = False
+    alert_sink("driver crashed")
+    assert alert_sink.flush() is True
+    assert FakeSMTP.sent[0]["contents"] == "[x2] driver crashed"
+
+
+def test_hourly_rate_limit(sink):
+    alert_sink = sink(max_per_hour=1)
+    alert_sink("first")
+    assert alert_sink.flush() is True
+    alert_sink("second")
+    assert alert_sink.flush() is False
+    assert len(FakeSMTP.sent) == 1
+
+
+def test_concurrent_flushes_send_every_record_once(sink):
+    alert_sink = sink(max_per_hour=10 ** 6, max_pending=10 ** 6)
+    stop = threading.Event()
+
+    def flusher():
+        while not stop.is_set():
+            alert_sink.flush()
+
+    threads = [threading.Thread(target=flusher) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for i in range(2000):
+        alert_sink(f"record {i}")
+    stop.set()
+    for thread in threads:
+        thread.join()
+    alert_sink.flush()
+    lines = [line for mail in FakeSMTP.sent for line in mail["contents"].splitlines()]
+    assert sorted(lines) == sorted(f"record {i}" for i in range(2000))
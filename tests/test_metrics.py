@@ -0,0 +1,112 @@
+import json
+from seleniumUp.Metrics import ActionMetrics, instrumented, add_wait, mark_retry
+
+
+class FakeDriver(object):
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append(command)
+        return {"value": None}
+
+
+class FakeAction(object):
+    def __init__(self, driver, metrics):
+        self._driver = metrics.instrument(driver)
+        self._metrics = metrics
+
+    @instrumented(locator=True)
+    def click(self, value):
+        mark_retry()
+        self._driver.execute("findElement")
+        self._driver.execute("clickElement")
+
+    @instrumented()
+    def fill_form(self, values):
+        add_wait(0.0)
+        self._driver.execute("getTitle")
+        for value in values:
+            self.click(value)
+
+
+def test_buckets_and_quantiles():
+    metrics = ActionMetrics(buckets=(0.1, 1, 10))
+    for wall in (0.05, 0.5, 0.5, 5, 50):
+        metrics.record("get", "", wall)
+    stats = metrics.to_dict()["actions"]["get"]["wall"]
+    assert stats["buckets"] == {"0.1": 1, "1": 3, "10": 4, "+Inf": 5}
+    assert stats["count"] == 5 and stats["max"] == 50
+    assert stats["p50"] == 1 and stats["p95"] == 50
+
+
+def test_wait_is_capped_by_the_wall_time():
+    metrics = ActionMetrics(buckets=(0.1, 1))
+    metrics.record("wait_element", "#a", 0.5, wait=2)
+    stats = metrics.to_dict()["actions"]["wait_element"]
+    assert stats["wait"]["sum"] == 0.5 and stats["action"]["sum"] == 0
+
+
+def test_locators_beyond_the_cap_are_counted_as_other():
+    metrics = ActionMetrics(max_locators=2)
+    for locator in ("#a", "#b", "#c", "#d", "#a"):
+        metrics.record("click", locator, 0.01)
+    locators = metrics.to_dict()["locators"]["click"]
+    assert set(locators) == {"#a", "#b", "__other__"}
+    assert locators["#a"]["calls"] == 2 and locators["__other__"]["calls"] == 2
+    assert metrics.to_dict()["actions"]["click"]["calls"] == 5
+
+
+def test_round_trips_are_charged_to_the_innermost_action():
+    driver, metrics = FakeDriver(), ActionMetrics()
+    action = FakeAction(driver, metrics)
+    action.fill_form(["#a", "#b"])
+    driver.execute("outsideOfActions")
+    actions = metrics.to_dict()["actions"]
+    assert actions["fill_form"]["round_trips"] == 1 and actions["fill_form"]["retries"] == 0
+    assert actions["click"]["round_trips"] == 4 and actions["click"]["retries"] == 2
+    assert sum(stats["round_trips"] for stats in actions.values()) == len(driver.commands) - 1
+    # the outer wall time includes the nested actions
+    assert actions["fill_form"]["wall"]["sum"] >= actions["click"]["wall"]["sum"]
+
+
+def test_a_driver_is_instrumented_once():
+    driver, metrics = FakeDriver(), ActionMetrics()
+    FakeAction(driver, metrics)
+    FakeAction(driver, metrics).click("#a")
+    assert metrics.to_dict()["actions"]["click"]["round_trips"] == 2
+
+
+def test_errors_are_counted_and_raised():
+    metrics = ActionMetrics()
+    try:
+        with metrics.measure("get"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert metrics.to_dict()["actions"]["get"]["errors"] == 1
+
+
+def test_to_json_writes_the_file(tmp_path):
+    metrics = ActionMetrics()
+    metrics.record("click", "#a", 0.2, round_trips=3)
+    path = tmp_path / "metrics.json"
+    text = metrics.to_json(str(path))
+    assert json.loads(path.read_text(encoding="utf-8")) == json.loads(text) == metrics.to_dict()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_to_prometheus_renders_histograms_and_counters(tmp_path):
+    metrics = ActionMetrics(buckets=(0.1, 1), prefix="test")
+    metrics.record("click", 'div[title="a"]', 0.5, wait=0.2, round_trips=3)
+    path = tmp_path / "metrics.prom"
+    text = metrics.to_prometheus(str(path))
+    assert path.read_text(encoding="utf-8") == text
+    labels = 'action="click",locator="div[title=\\"a\\"]"'
+    assert "# TYPE test_action_duration_seconds histogram" in text
+    assert f'test_action_duration_seconds_bucket{{{labels},le="0.1"}} 0' in text
+    assert f'test_action_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'test_action_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"test_action_duration_seconds_count{{{labels}}} 1" in text
+    assert f"test_action_round_trips_total{{{labels}}} 3" in text
+    assert f"test_action_calls_total{{{labels}}} 1" in text
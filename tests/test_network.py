@@ -0,0 +1,39 @@
+import re
+import pytest
+from seleniumUp.Network import resolve_block_resources
+
+
+def _blocked(url, patterns):
+    # Network.setBlockedURLs patterns match the whole url, '*' is the only wildcard
+    return any(re.fullmatch(re.escape(pattern).replace(r'\*', '.*'), url) for pattern in patterns)
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/static/style.css",
+    "https://example.com/static/style.css?v=3",
+    "https://cdn.example.com/img/logo.png?w=200&h=100",
+    "https://example.com/fonts/inter.woff2?display=swap",
+    "https://www.google-analytics.com/analytics.js",
+])
+def test_text_only_blocks_urls_with_query_strings(url):
+    _, patterns = resolve_block_resources('text-only')
+    assert _blocked(url, patterns)
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/api/items?format=json",
+    "https://example.com/page.html?ref=1",
+    "https://example.com/cssgrid",
+])
+def test_text_only_keeps_documents_and_data(url):
+    _, patterns = resolve_block_resources('text-only')
+    assert not _blocked(url, patterns)
+
+
+def test_presets_types_and_custom_patterns_are_merged():
+    types, patterns = resolve_block_resources(['no-media', 'font', '*ads.example.com*'])
+    assert types == ['image', 'media', 'font']
+    assert patterns[0] == '*ads.example.com*'
+    assert '*.png?*' in patterns and patterns.count('*.png') == 1
+    with pytest.raises(ValueError):
+        resolve_block_resources('pictures')
@@ -0,0 +1,134 @@
+import base64
+import gc
+import json
+import pytest
+from seleniumUp import NetworkCapture, ParseToolKit
+from seleniumUp.Network import performance_log, release_subscribers
+
+
+class FakeChrome(object):
+    capabilities = {'browserName': 'chrome'}
+
+    def __init__(self):
+        self.log = []
+        self.bodies = {}
+        self.body_requests = []
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.getResponseBody':
+            self.body_requests.append(params['requestId'])
+            if params['requestId'] not in self.bodies:
+                raise Exception("No resource with given identifier found")
+            return self.bodies[params['requestId']]
+        return {}
+
+    def respond(self, request_id, url, body=None, mime_type='application/json', kind='XHR', finished=True, base64_body=False):
+        self.log.append(_event('Network.responseReceived', requestId=request_id, type=kind,
+                               response={'url': url, 'status': 200, 'mimeType': mime_type}))
+        if body is not None:
+            encoded = base64.b64encode(body.encode()).decode() if base64_body else body
+            self.bodies[request_id] = {'body': encoded, 'base64Encoded': base64_body}
+        if finished:
+            self.log.append(_event('Network.loadingFinished', requestId=request_id))
+
+
+def _event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def test_only_matching_json_responses_are_captured():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver, url_pattern=r'/api/')
+    driver.respond('1', 'https://shop.test/api/items', json.dumps({'items': [{'price': 1}, {'price': 2}]}))
+    driver.respond('2', 'https://shop.test/api/logo.png', 'png', mime_type='image/png', kind='Image')
+    driver.respond('3', 'https://shop.test/other', '{"price": 9}')
+    driver.respond('4', 'https://shop.test/api/more', '{"price": 3}', kind='Fetch', base64_body=True)
+    payloads = capture.drain()
+    assert [record['url'] for record in payloads] == ['https://shop.test/api/items', 'https://shop.test/api/more']
+    assert [sorted(ParseToolKit.dict_search(record['body'], 'price')) for record in payloads] == [[1, 2], [3]]
+    assert driver.body_requests == ['1', '4']
+
+
+def test_undecodable_and_vanished_bodies_are_counted_as_failed():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver)
+    driver.respond('1', 'https://shop.test/api/a', '{"broken":')
+    driver.respond('2', 'https://shop.test/api/b')
+    assert capture.drain() == []
+    assert capture.failed == 2
+
+
+def test_decode_false_keeps_the_text_for_stream_search():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver, decode=False)
+    driver.respond('1', 'https://shop.test/api/a', '{"price": 5}')
+    assert capture.drain()[0]['body'] == '{"price": 5}'
+
+
+def test_buffer_drops_the_oldest_responses():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver, max_buffer=2)
+    for i in range(5):
+        driver.respond(str(i), f'https://shop.test/api/{i}', json.dumps({'i': i}))
+    assert [record['body']['i'] for record in capture.drain()] == [3, 4]
+    assert (capture.captured, capture.dropped) == (5, 3)
+
+
+def test_unfinished_requests_are_bounded():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver, max_pending=3)
+    for i in range(10):
+        driver.respond(str(i), f'https://shop.test/api/stream/{i}', finished=False)
+    capture.poll()
+    assert len(capture._pending) == 3 and capture.dropped == 7
+
+
+def test_entries_logged_before_the_capture_are_skipped():
+    driver = FakeChrome()
+    events = []
+    performance_log(driver).subscribe(lambda method, params: events.append(method))
+    driver.respond('old', 'https://shop.test/api/old', '{"a": 1}')
+    capture = NetworkCapture(driver)
+    assert capture.drain() == [] and capture.failed == 0
+    assert driver.body_requests == []
+    # the other subscribers still receive them
+    assert events == ['Network.responseReceived', 'Network.loadingFinished']
+
+
+def test_a_capture_that_is_not_closed_stops_with_its_last_reference():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver)
+    driver.respond('1', 'https://shop.test/api/a', '{"a": 1}')
+    assert len(list(capture.json(timeout=0))) == 1
+    del capture
+    gc.collect()
+    driver.respond('2', 'https://shop.test/api/b', '{"b": 1}')
+    performance_log(driver).poll()
+    assert driver.body_requests == ['1']
+
+
+def test_pool_reset_releases_the_captures_of_the_previous_job():
+    driver = FakeChrome()
+    capture = NetworkCapture(driver)
+    release_subscribers(driver)
+    driver.respond('1', 'https://shop.test/api/a', '{"a": 1}')
+    assert capture.drain() == [] and driver.body_requests == []
+
+
+def test_close_unsubscribes():
+    driver = FakeChrome()
+    with NetworkCapture(driver) as capture:
+        pass
+    driver.respond('1', 'https://shop.test/api/a', '{"a": 1}')
+    assert capture.drain() == [] and driver.body_requests == []
+
+
+def test_other_browsers_are_rejected():
+    driver = FakeChrome()
+    driver.capabilities = {'browserName': 'firefox'}
+    with pytest.raises(RuntimeError):
+        NetworkCapture(driver)
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import pytest
+
+
+def _run(code):
+    # a fresh interpreter, the import order is what is tested
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize("name", ["DriverAction", "Workflow", "NetworkCapture"])
+def test_exported_class_survives_importing_its_submodule_first(name):
+    _run(f"import seleniumUp.{name}\n"
+         f"from seleniumUp import {name}\n"
+         f"assert isinstance({name}, type), {name}\n"
+         f"import seleniumUp\n"
+         f"assert seleniumUp.{name} is {name}")
+
+
+def test_submodule_imported_by_another_submodule_does_not_shadow_its_class():
+    # Workflow imports seleniumUp.DriverAction
+    _run("from seleniumUp import Workflow\n"
+         "from seleniumUp import DriverAction\n"
+         "assert isinstance(Workflow, type) and isinstance(DriverAction, type)")
+
+
+def test_submodule_import_of_a_loaded_class():
+    _run("from seleniumUp import Workflow\n"
+         "import seleniumUp.Workflow\n"
+         "from seleniumUp.Workflow import BackgroundSaver\n"
+         "import seleniumUp\n"
+         "assert seleniumUp.Workflow is Workflow and isinstance(Workflow, type)")
+
+
+def test_parse_toolkit_does_not_import_selenium():
+    _run("from seleniumUp import ParseToolKit, SaveToolKit\n"
+         "import sys\n"
+         "assert not any(module.startswith('selenium.') for module in sys.modules)")
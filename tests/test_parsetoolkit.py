@@ -0,0 +1,176 @@
+import pytest
+import json
+import time
+from seleniumUp import ParseToolKit
+from seleniumUp.main import logger
+
+
+def test_colliding_scalar_hashes_are_still_differences():
+    # hash(-1) == hash(-2) and hash(2 ** 61 - 1) == hash(0) in CPython
+    assert hash(-1) == hash(-2)
+    assert ParseToolKit.spot_difference({'price': -1}, {'price': -2}, render=False) == {'price': (-1, -2)}
+    assert ParseToolKit.spot_difference({'a': 2 ** 61 - 1}, {'a': 0}, render=False) == {'a': (2 ** 61 - 1, 0)}
+
+
+def test_colliding_list_items_are_not_aligned_as_equal():
+    differences = ParseToolKit.spot_difference({'items': [1, -1, 3]}, {'items': [1, -2, 3]}, render=False)
+    assert differences == {'items[1]': (-1, -2)}
+    nested = ParseToolKit.spot_difference([{'v': [-1]}], [{'v': [-2]}], render=False)
+    assert nested == {'[0].v[0]': (-1, -2)}
+
+
+def test_equal_structures_have_no_differences():
+    item = {'a': [1, {'b': None}], 'c': 'text', 'd': 1.5}
+    copy = {'a': [1, {'b': None}], 'c': 'text', 'd': 1.5}
+    assert list(ParseToolKit.iter_differences(item, copy)) == []
+
+
+def test_inserted_list_element_is_reported_once():
+    records = list(ParseToolKit.iter_differences({'l': [1, 2, 3]}, {'l': [1, 9, 2, 3]}))
+    assert [(record['kind'], record['new']) for record in records] == [('added', 9)]
+
+
+def test_table_print_logs_each_page_as_it_is_rendered():
+    messages = []
+    handler_id = logger.add(lambda message: messages.append(message.record["message"]), level="INFO", format="{message}")
+    logged_before_end = []
+
+    def rows():
+        for i in range(25):
+            yield {"id": i}
+        logged_before_end.append(len(messages))
+
+    try:
+        ParseToolKit.table_print(rows(), log=True, page_size=10, sample_size=5)
+    finally:
+        logger.remove(handler_id)
+    tables = [message for message in messages if message.startswith("\nInfo Table Output")]
+    assert logged_before_end[0] >= 2
+    assert len(tables) == 4
+    logged_rows = [line for table in tables for line in table.splitlines() if line.startswith("| ") and "id" not in line]
+    assert len(logged_rows) == 25 + 1
+
+
+DOCUMENT = {
+    "data": {
+        "items": [
+            {"id": 1, "price": 10, "tags": ["a", "b"]},
+            {"id": 2, "price": 20, "tags": []},
+            {"id": 3, "price": 30, "detail": {"price": 31}},
+        ],
+        "a.b": "dotted",
+    },
+    "price": 0,
+}
+
+
+def test_unanchored_keys_match_at_any_depth_like_dict_search():
+    result = ParseToolKit.query(DOCUMENT, "price")
+    assert sorted(result["price"]) == sorted(ParseToolKit.dict_search(DOCUMENT, "price")) == [0, 10, 20, 30, 31]
+
+
+def test_nested_keeps_searching_inside_matches():
+    document = {"price": {"price": {"price": 1}}}
+    assert ParseToolKit.query(document, "price")["price"] == [{"price": {"price": 1}}]
+    assert ParseToolKit.query(document, "price", nested=True)["price"] == [
+        {"price": {"price": 1}}, {"price": 1}, 1]
+
+
+def test_anchored_paths_indexes_and_wildcards():
+    result = ParseToolKit.query(DOCUMENT, "$.data.items[0].id", "$.data.items[-1].id", "$.data.items[*].id",
+                                "$.data.*[1].price", "$.price")
+    assert result == {
+        "$.data.items[0].id": [1],
+        "$.data.items[-1].id": [3],
+        "$.data.items[*].id": [1, 2, 3],
+        "$.data.*[1].price": [20],
+        "$.price": [0],
+    }
+
+
+def test_recursive_descent_below_an_anchor():
+    assert ParseToolKit.query(DOCUMENT, "$.data..price")["$.data..price"] == [10, 20, 30, 31]
+    assert ParseToolKit.query(DOCUMENT, "$..tags[1]")["$..tags[1]"] == ["b"]
+
+
+def test_quoted_keys_may_contain_dots():
+    assert ParseToolKit.query(DOCUMENT, "$.data['a.b']", '$["data"]["a.b"]') == {
+        "$.data['a.b']": ["dotted"], '$["data"]["a.b"]': ["dotted"]}
+    assert ParseToolKit.query(DOCUMENT, "$.data.a.b")["$.data.a.b"] == []
+
+
+def test_paths_that_miss_are_empty():
+    result = ParseToolKit.query(DOCUMENT, "$.data.items[5].id", "$.data.items[-4]", "$.missing", "$.price.id")
+    assert all(values == [] for values in result.values()) and len(result) == 4
+
+
+def test_search_yields_pairs_and_collect_groups_them():
+    query = ParseToolKit.compile_query("$.data.items[*].id", "$.price")
+    assert list(query.search(DOCUMENT)) == [("$.price", 0), ("$.data.items[*].id", 1),
+                                           ("$.data.items[*].id", 2), ("$.data.items[*].id", 3)]
+    assert query.collect(DOCUMENT) == {"$.data.items[*].id": [1, 2, 3], "$.price": [0]}
+
+
+def test_compiled_queries_are_cached():
+    hits = ParseToolKit.compile_query.cache_info().hits
+    query = ParseToolKit.compile_query("$.cache.test", "id")
+    assert ParseToolKit.compile_query("$.cache.test", "id") is query
+    assert ParseToolKit.compile_query.cache_info().hits == hits + 1
+    assert ParseToolKit.compile_query("$.cache.test", "id", nested=True) is not query
+
+
+def test_invalid_paths_are_rejected():
+    with pytest.raises(ValueError):
+        ParseToolKit.compile_query("$.data[oops")
+
+
+STREAM_DOCUMENT = {
+    "skip": {"text": "a \"quoted\" } ] { [ value \\", "more": [[{"x": 1}], "é"]},
+    "data": {"items": [{"id": 1, "name": "café ☃ \U0001f600", "note": "tab\t \"q\" \\ \\u0041"},
+                       {"id": 2, "name": "line\nbreak", "price": -1.5e3}]},
+    "flag": True,
+}
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_stream_search_matches_query():
+    data = json.dumps(STREAM_DOCUMENT, ensure_ascii=False).encode('utf-8')
+    paths = ("$.data.items[*].name", "$.data.items[*].note", "price", "$.flag", "$.data.items[1]")
+    expected = [(path, value) for path, values in ParseToolKit.query(STREAM_DOCUMENT, *paths).items()
+                for value in values]
+    assert sorted(map(repr, ParseToolKit.stream_search(data, *paths))) == sorted(map(repr, expected))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7])
+def test_tokens_split_across_chunks(size):
+    # byte chunks cut escapes, numbers, keys and multi-byte characters anywhere
+    data = json.dumps(STREAM_DOCUMENT, ensure_ascii=False).encode('utf-8')
+    assert list(ParseToolKit.stream_search(_split(data, size), "$.data")) == [("$.data", STREAM_DOCUMENT["data"])]
+    text = json.dumps(STREAM_DOCUMENT)
+    assert list(ParseToolKit.stream_search(_split(text, size), "name")) == [
+        ("name", "café ☃ \U0001f600"), ("name", "line\nbreak")]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_skipped_containers_split_across_chunks(size):
+    text = json.dumps(STREAM_DOCUMENT)
+    assert list(ParseToolKit.stream_search(_split(text, size), "$.flag")) == [("$.flag", True)]
+
+
+def test_long_string_values_are_read_in_linear_time():
+    value = "x\\\"y" * 100000
+    text = json.dumps({"skipped": {"long": value}, "long": value, "after": 1})
+    start = time.perf_counter()
+    assert list(ParseToolKit.stream_search(_split(text, 16), "$.long", "after")) == [
+        ("$.long", value), ("after", 1)]
+    assert time.perf_counter() - start < 5
+
+
+def test_unterminated_documents_are_rejected():
+    with pytest.raises(ValueError):
+        list(ParseToolKit.stream_search(_split('{"a": "never closed', 4), "b"))
+    with pytest.raises(ValueError):
+        list(ParseToolKit.stream_search(_split('{"a": {"b": "x\\"}', 4), "$.c"))
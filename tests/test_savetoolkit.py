@@ -0,0 +1,238 @@
+import csv
+import gzip
+import os
+import sqlite3
+import sys
+from types import ModuleType, SimpleNamespace
+import pytest
+from seleniumUp.SaveToolkit import CsvSink, SaveToolKit
+
+
+def _rows(count):
+    return [{"id": i, "name": f"item-{i}", "price": i * 1.5} for i in range(count)]
+
+
+def test_csv_sink_rotated_files_stay_within_max_bytes(tmp_path):
+    filename = str(tmp_path / "items.csv")
+    with CsvSink(filename, max_bytes=2000) as sink:
+        sink.write_many(_rows(500))
+    assert len(sink.files) > 1
+    rows = []
+    for path in sink.files:
+        assert os.path.getsize(path) <= 2000
+        with open(path, newline='', encoding='utf-8') as f:
+            rows += list(csv.DictReader(f))
+    assert [row["id"] for row in rows] == [str(i) for i in range(500)]
+
+
+def test_csv_sink_gzip_keeps_every_row(tmp_path):
+    filename = str(tmp_path / "items.csv.gz")
+    with CsvSink(filename, max_bytes=1500) as sink:
+        sink.write_many(_rows(2000))
+    rows = []
+    for path in sink.files:
+        with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+            rows += list(csv.DictReader(f))
+    assert len(rows) == 2000
+
+
+def test_csv_sink_empty_input_writes_the_file(tmp_path):
+    filename = str(tmp_path / "empty.csv")
+    with CsvSink(filename, fieldnames=["a"]):
+        pass
+    with open(filename, newline='', encoding='utf-8') as f:
+        assert f.read() == "a\r\n"
+
+
+class FakeCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params):
+        self.connection.calls.append(("execute", sql, list(params)))
+        self.connection.maybe_fail()
+
+    def executemany(self, sql, values):
+        self.connection.calls.append(("executemany", sql, list(values)))
+        self.connection.maybe_fail()
+
+
+class FakeConnection(object):
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_on = fail_on
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def maybe_fail(self):
+        if self.fail_on is not None and len(self.calls) == self.fail_on:
+            raise RuntimeError("Duplicate entry")
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_mysql_bulk_insert_streams_batches_into_sqlite():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, price REAL)")
+    items = ({"id": i, "name": f"item-{i}", "price": i / 2} for i in range(2500))
+    report = SaveToolKit.mysql_bulk_insert(connection, "items", items, batch_size=1000, placeholder='?', log=False)
+    assert [batch["rows"] for batch in report] == [1000, 1000, 500]
+    assert connection.execute("SELECT COUNT(*), SUM(id) FROM items").fetchone() == (2500, sum(range(2500)))
+
+
+def test_mysql_bulk_insert_multi_row_statement_and_missing_columns():
+    connection = FakeConnection()
+    items = [{"id": 1, "name": "a"}, {"id": 2}, {"id": 3, "name": "c", "extra": True}]
+    SaveToolKit.mysql_bulk_insert(connection, "items", items, batch_size=2, multi_row=True, log=False)
+    (_, first_sql, first_params), (_, second_sql, second_params) = connection.calls
+    assert first_sql == "INSERT INTO `items` (`id`, `name`) VALUES (%s, %s), (%s, %s)"
+    assert first_params == [1, "a", 2, None]
+    assert second_sql == "INSERT INTO `items` (`id`, `name`) VALUES (%s, %s)"
+    assert second_params == [3, "c"]
+    assert connection.commits == 2
+
+
+def test_mysql_bulk_insert_upsert_sql():
+    connection = FakeConnection()
+    SaveToolKit.mysql_bulk_insert(connection, "items", [{"id": 1, "price": 2}], upsert=True,
+                                  update_columns=["price"], log=False)
+    assert connection.calls[0][1] == ("INSERT INTO `items` (`id`, `price`) VALUES (%s, %s) "
+                                      "ON DUPLICATE KEY UPDATE `price` = VALUES(`price`)")
+
+
+def test_mysql_bulk_insert_rolls_back_only_the_failing_batch():
+    connection = FakeConnection(fail_on=2)
+    items = [{"id": i} for i in range(5)]
+    with pytest.raises(RuntimeError):
+        SaveToolKit.mysql_bulk_insert(connection, "items", items, batch_size=2, log=False)
+    assert connection.commits == 1
+    assert connection.rollbacks == 1
+    assert len(connection.calls) == 2
+
+
+class FakePipeline(object):
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def hset(self, key, mapping):
+        self.commands.append(("hset", key, mapping))
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", key, ttl))
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value, ex))
+
+    def execute(self):
+        self.client.executed.append(self.commands)
+        self.commands = []
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.executed = []
+        self.transactions = []
+
+    def pipeline(self, transaction=True):
+        self.transactions.append(transaction)
+        return FakePipeline(self)
+
+
+def test_redis_insert_pipelines_one_round_trip_per_batch():
+    client = FakeRedis()
+    items = ({"id": f"k{i}", "tags": ["a", "b"], "ok": True, "missing": None} for i in range(5))
+    result = SaveToolKit.redis_insert(client, items, "id", batch_size=2, ttl=60, log=False)
+    assert result == {"written": 5, "skipped": 0}
+    assert client.transactions == [False]
+    assert [len(commands) for commands in client.executed] == [4, 4, 2]
+    command, key, mapping = client.executed[0][0]
+    assert (command, key) == ("hset", "k0")
+    assert mapping == {"id": "k0", "tags": '["a", "b"]', "ok": "True", "missing": ""}
+    assert client.executed[0][1] == ("expire", "k0", 60)
+
+
+def test_redis_insert_serializes_whole_records_and_skips_missing_keys():
+    client = FakeRedis()
+    items = [{"id": "a", "price": 1}, {"price": 2}, {"id": "", "price": 3}]
+    result = SaveToolKit.redis_insert(client, items, "id", redis_hash=False, ttl=5, log=False)
+    assert result == {"written": 1, "skipped": 2}
+    assert client.executed == [[("set", "a", '{"id": "a", "price": 1}', 5)]]
+
+
+def test_redis_insert_rejects_unknown_serializers():
+    # the ValueError is logged by logger.catch before anything is sent
+    client = FakeRedis()
+    assert SaveToolKit.redis_insert(client, [{"id": "a"}], "id", serializer="pickle", log=False) is None
+    assert client.executed == []
+
+
+class BulkWriteError(Exception):
+    def __init__(self, details):
+        super().__init__("batch op errors occurred")
+        self.details = details
+
+
+class FakeCollection(object):
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def insert_many(self, documents, ordered=True):
+        self.batches.append(list(documents))
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(inserted_ids=[i for i, _ in enumerate(documents)])
+
+    def bulk_write(self, requests, ordered=True):
+        if not requests:
+            raise RuntimeError("No operations to execute")
+        self.batches.append(list(requests))
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(upserted_count=len(requests) - 1, matched_count=1)
+
+
+@pytest.fixture
+def fake_pymongo(monkeypatch):
+    module = ModuleType("pymongo")
+    module.ReplaceOne = lambda filter, document, upsert=False: (filter, document, upsert)
+    monkeypatch.setitem(sys.modules, "pymongo", module)
+    return module
+
+
+def test_mongodb_insert_batches_by_count_and_size():
+    collection = FakeCollection()
+    documents = [{"id": i, "text": "x" * 100} for i in range(10)]
+    report = SaveToolKit.mongodb_insert(collection, iter(documents), batch_size=4, max_batch_bytes=300, log=False)
+    assert [len(batch) for batch in collection.batches] == [2, 2, 2, 2, 2]
+    assert sum(batch["inserted"] for batch in report) == 10
+    assert all(batch["bytes"] <= 300 for batch in report)
+
+
+def test_mongodb_insert_counts_duplicates_from_bulk_write_errors():
+    error = BulkWriteError({"nInserted": 2, "writeErrors": [{"code": 11000}, {"code": 121}]})
+    report = SaveToolKit.mongodb_insert(FakeCollection(error), [{"id": i} for i in range(4)], log=False)
+    assert (report[0]["inserted"], report[0]["duplicates"], report[0]["errors"]) == (2, 1, 1)
+
+
+def test_mongodb_insert_upsert_without_keys_counts_each_document_once(fake_pymongo):
+    collection = FakeCollection()
+    report = SaveToolKit.mongodb_insert(collection, [{"name": "a"}, {"name": "b"}], upsert_key="id", log=False)
+    assert collection.batches == []
+    assert report[0]["errors"] == 2
+
+
+def test_mongodb_insert_failed_upsert_counts_only_sent_documents(fake_pymongo):
+    collection = FakeCollection(RuntimeError("connection reset"))
+    documents = [{"id": 1}, {"id": 2}, {"name": "no key"}]
+    report = SaveToolKit.mongodb_insert(collection, documents, upsert_key="id", log=False)
+    assert report[0]["documents"] == 3
+    assert report[0]["errors"] == 3
@@ -0,0 +1,70 @@
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from seleniumUp.WaitStrategy import ObserverWaitStrategy
+
+
+class FakeTimeouts(object):
+    def __init__(self, script):
+        self.script = script
+
+
+class FakeDriver(object):
+    def __init__(self, script_timeout=30, result=None):
+        self.timeouts = FakeTimeouts(script_timeout)
+        self.result = result
+        self.script_timeouts = []
+        self.calls = 0
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+        self.timeouts.script = seconds
+
+    def execute_async_script(self, script, *args):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeFallback(object):
+    def __init__(self):
+        self.waits = []
+
+    def wait_all(self, driver, locators, wait_time):
+        self.waits.append((locators, wait_time))
+        return ["fallback element"]
+
+
+def test_script_timeout_is_raised_for_long_waits():
+    driver = FakeDriver(script_timeout=30, result=["element"])
+    strategy = ObserverWaitStrategy()
+    assert strategy.wait(driver, By.ID, "a", wait_time=60) == "element"
+    strategy.wait(driver, By.ID, "a", wait_time=40)
+    assert driver.script_timeouts == [65]
+
+
+@pytest.mark.parametrize("script_timeout", [300, None])
+def test_script_timeout_is_never_lowered(script_timeout):
+    driver = FakeDriver(script_timeout=script_timeout, result=["element"])
+    strategy = ObserverWaitStrategy()
+    strategy.wait(driver, By.ID, "a", wait_time=10)
+    strategy.wait(driver, By.ID, "a", wait_time=20)
+    assert driver.script_timeouts == [] and driver.timeouts.script == script_timeout
+
+
+def test_driver_errors_fall_back_for_the_remaining_time():
+    fallback = FakeFallback()
+    driver = FakeDriver(result=WebDriverException("javascript error: document unloaded"))
+    strategy = ObserverWaitStrategy(fallback)
+    assert strategy.wait_all(driver, [(By.ID, "a")], wait_time=10) == ["fallback element"]
+    locators, remaining = fallback.waits[0]
+    assert locators == [(By.ID, "a")] and 9 < remaining <= 10
+
+
+def test_a_page_timeout_is_not_retried_by_the_fallback():
+    fallback = FakeFallback()
+    strategy = ObserverWaitStrategy(fallback)
+    with pytest.raises(TimeoutException):
+        strategy.wait(FakeDriver(result=None), By.ID, "a", wait_time=1)
+    assert fallback.waits == []
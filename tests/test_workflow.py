@@ -0,0 +1,190 @@
+from contextlib import contextmanager
+import pytest
+from seleniumUp import Workflow, BackgroundSaver
+from seleniumUp.main import logger
+from selenium.webdriver.common.by import By
+
+
+class FakePool(object):
+    def __init__(self, fail_reset=False):
+        self.fail_reset = fail_reset
+        self.resets = 0
+
+    def __len__(self):
+        return 1
+
+    @contextmanager
+    def lease(self):
+        yield object()
+
+    def reset_driver(self, driver):
+        self.resets += 1
+        if self.fail_reset:
+            raise RuntimeError("session deleted")
+
+
+class EchoFlow(Workflow):
+    def main_driver_flow(self, url):
+        return url
+
+    def parse_flow(self, page):
+        return page.upper()
+
+    def save_flow(self, result):
+        pass
+
+
+class CaughtFlow(EchoFlow):
+    @logger.catch
+    def main_driver_flow(self, url):
+        if url.endswith("bad"):
+            raise ValueError("no table")
+        return url
+
+    @logger.catch
+    def parse_flow(self, page):
+        return page.upper() if page else None
+
+
+def test_run_concurrent_without_urls_starts_no_pool():
+    summary = EchoFlow([]).run_concurrent(log=False)
+    assert summary["total"] == 0 and summary["results"] == {} and summary["errors"] == {}
+
+
+def test_failed_reset_is_recorded_against_the_url():
+    pool = FakePool(fail_reset=True)
+    summary = EchoFlow(["a", "b", "c"]).run_concurrent(workers=1, pool=pool, reset_between=True, log=False)
+    assert summary["results"] == {"a": "A"}
+    assert set(summary["errors"]) == {"b", "c"}
+    assert summary["errors"]["b"].startswith("RuntimeError")
+
+
+def test_exceptions_swallowed_by_logger_catch_are_errors():
+    summary = CaughtFlow(["a", "x-bad"]).run_concurrent(workers=1, pool=FakePool(), log=False)
+    assert summary["results"] == {"a": "A"}
+    assert summary["errors"] == {"x-bad": "ValueError: no table"}
+
+
+class PartialFlow(EchoFlow):
+    @logger.catch
+    def parse_flow(self, page):
+        if page == "partial":
+            raise ValueError("half a table")
+        # an unrelated error logged while the url is contextualized is not a failure
+        logger.opt(exception=KeyError("cached")).error("cache miss")
+        return page.upper()
+
+
+def test_caught_error_with_a_partial_result_is_a_failure():
+    summary = PartialFlow(["a", "partial"]).run_concurrent(workers=1, pool=FakePool(), log=False)
+    assert summary["results"] == {"a": "A"}
+    assert summary["errors"] == {"partial": "ValueError: half a table"}
+
+
+def test_run_url_keeps_logger_catch_by_default():
+    assert PartialFlow([]).run_url("partial") is None
+    with pytest.raises(ValueError):
+        PartialFlow([]).run_url("partial", raise_errors=True)
+
+
+def test_duplicate_urls_are_run_once():
+    summary = EchoFlow(["a", "b", "a"]).run_concurrent(workers=2, pool=FakePool(), log=False)
+    assert summary["total"] == 2 == summary["succeeded"] + summary["failed"]
+    assert summary["results"] == {"a": "A", "b": "B"}
+
+
+def test_background_saver_reports_errors_swallowed_by_logger_catch():
+    @logger.catch
+    def save(item):
+        if item % 2:
+            raise IOError(f"disk full on {item}")
+
+    saver = BackgroundSaver(save, queue_size=2)
+    for item in range(4):
+        saver.submit(item)
+    errors = saver.close()
+    assert errors == ["OSError: disk full on 1", "OSError: disk full on 3"]
+    assert saver.saved == 2
+
+
+def test_background_saver_reports_raised_errors():
+    def save(item):
+        raise ValueError("bad row")
+
+    with BackgroundSaver(save) as saver:
+        saver.submit(1)
+    assert saver.errors == ["ValueError: bad row"] and saver.saved == 0
+
+
+class StreamFlow(EchoFlow):
+    save_batch_size = 2
+
+    def __init__(self, fail_save_on=None, fail_stream_after=None):
+        super().__init__([])
+        self.saved = []
+        self.attempts = 0
+        self.fail_save_on = fail_save_on
+        self.fail_stream_after = fail_stream_after
+
+    def main_driver_flow(self):
+        for page in range(5):
+            if page == self.fail_stream_after:
+                raise ConnectionError("browser gone")
+            yield page
+
+    def parse_flow(self, page):
+        return page
+
+    def save_flow(self, batch):
+        self.attempts += 1
+        if batch == self.fail_save_on:
+            raise IOError("write failed")
+        self.saved.append(batch)
+
+
+def test_save_stream_batches_generator_flows():
+    flow = StreamFlow()
+    assert flow._parse_and_save(flow.main_driver_flow()) == 5
+    assert flow.saved == [[0, 1], [2, 3], [4]]
+
+
+def test_save_stream_does_not_save_a_failed_batch_twice():
+    flow = StreamFlow(fail_save_on=[2, 3])
+    with pytest.raises(IOError):
+        flow._parse_and_save(flow.main_driver_flow())
+    assert flow.saved == [[0, 1]]
+    assert flow.attempts == 2
+
+
+def test_save_stream_saves_the_tail_when_the_stream_fails():
+    flow = StreamFlow(fail_stream_after=3)
+    with pytest.raises(ConnectionError):
+        flow._parse_and_save(flow.main_driver_flow())
+    assert flow.saved == [[0, 1], [2]]
+
+
+@pytest.mark.parametrize("driver_params, expected", [
+    ((), {'page_load_strategy': 'eager', 'network_capture': False}),
+    (('Firefox', None, True), {'selenium_driver_type': 'Firefox', 'driver_option_param': None, 'headless': True,
+                               'page_load_strategy': 'eager', 'network_capture': False}),
+    (('Chrome', None, True, 'text-only', 'none'), {'selenium_driver_type': 'Chrome', 'driver_option_param': None,
+                                                   'headless': True, 'block_resources': 'text-only',
+                                                   'page_load_strategy': 'none', 'network_capture': False}),
+])
+def test_driver_params_are_passed_as_keywords(driver_params, expected):
+    class EagerFlow(EchoFlow):
+        page_load_strategy = 'eager'
+
+    assert EagerFlow([], By.XPATH, None, "CRITICAL", *driver_params)._driver_kwargs() == expected
+
+
+def test_too_many_driver_params_are_rejected():
+    with pytest.raises(TypeError):
+        EchoFlow([], By.XPATH, None, "CRITICAL", *range(7))._driver_kwargs()
+
+
+def test_network_capture_attribute_reaches_the_drivers():
+    class CaptureFlow(EchoFlow):
+        network_capture = True
+
+    assert CaptureFlow([], By.XPATH, None, "CRITICAL", "Chrome")._driver_kwargs()["network_capture"] is True